@@ -1 +1,629 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Hyperparameter Sweep Runner untuk DQN VRP
+Trial dijalankan paralel di beberapa proses worker, trial yang buruk dihentikan lebih awal
+(successive halving / ASHA), dan sweep bisa dilanjutkan dari results store-nya.
+
+Usage:
+    python manual_hyperparameter_tuner.py --sweep sweep.yaml --dir sweeps/lr_batch --workers 3
+    python manual_hyperparameter_tuner.py --dir sweeps/lr_batch          # lanjutkan sweep
+
+Sweep file (YAML), semua key opsional kecuali space:
+    search: bayesian          # grid | random | bayesian
+    num_trials: 30            # jumlah trial (grid: semua kombinasi)
+    scheduler: asha           # asha | sha | none
+    min_episodes: 25          # budget rung pertama
+    max_episodes: 225         # budget trial terbaik
+    reduction_factor: 3       # 1/eta trial terbaik naik ke rung berikutnya
+    metric: total_reward      # metrik greedy evaluation
+    mode: max
+    base_config: config.yaml  # relatif ke vrp_rl_project/
+    space:
+      model.learning_rate: {type: loguniform, low: 0.0001, high: 0.003}
+      model.batch_size: {type: choice, values: [32, 64, 128]}
+      model.hidden_layers: {type: choice, values: [[128, 64], [256, 128]]}
+      training.max_steps: {type: int, low: 50, high: 150}
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vrp_rl_project')
+
+# Config sections a sweep may change (environment stays fixed so trials are comparable)
+TUNABLE_SECTIONS = ('model', 'training', 'advanced_dqn')
+
+# Env vars yang membatasi thread BLAS/TF di setiap worker (sama seperti actor distributed_training)
+WORKER_THREAD_ENV = {
+    'OMP_NUM_THREADS': '1',
+    'MKL_NUM_THREADS': '1',
+    'TF_NUM_INTRAOP_THREADS': '1',
+    'TF_NUM_INTEROP_THREADS': '1',
+}
+
+DEFAULT_SWEEP = {
+    'search': 'random',
+    'num_trials': 20,
+    'scheduler': 'asha',
+    'min_episodes': 25,
+    'max_episodes': 225,
+    'reduction_factor': 3,
+    'metric': 'total_reward',
+    'mode': 'max',
+    'eval_episodes': 1,
+    'seed': 0,
+    'base_config': 'config.yaml',
+    'space': {
+        'model.learning_rate': {'type': 'loguniform', 'low': 0.0001, 'high': 0.003},
+        'model.batch_size': {'type': 'choice', 'values': [32, 64, 128]},
+        'model.epsilon_decay': {'type': 'uniform', 'low': 0.99, 'high': 0.9995},
+        'model.hidden_layers': {'type': 'choice', 'values': [[128, 64], [256, 128], [512, 256, 128]]},
+    }
+}
+
+def validate_space(space: Dict):
+    """Check parameter specs and that only model/training/advanced_dqn keys are tuned."""
+    for key, spec in space.items():
+        section = key.split('.')[0]
+        if section not in TUNABLE_SECTIONS:
+            raise ValueError(f"{key}: only {', '.join(TUNABLE_SECTIONS)} keys can be tuned")
+        if key == 'training.episodes':
+            raise ValueError("training.episodes is set by the scheduler (min_episodes/max_episodes)")
+        kind = spec.get('type')
+        if kind == 'choice':
+            if not spec.get('values'):
+                raise ValueError(f"{key}: choice needs a non-empty values list")
+        elif kind in ('uniform', 'loguniform', 'int'):
+            if spec['low'] >= spec['high'] or (kind == 'loguniform' and spec['low'] <= 0):
+                raise ValueError(f"{key}: invalid range [{spec['low']}, {spec['high']}]")
+        else:
+            raise ValueError(f"{key}: unknown type {kind!r} (choice, uniform, loguniform, int)")
+
+def _to_unit(spec: Dict, value: float) -> float:
+    """Map a numeric value to [0, 1] (log scale for loguniform)."""
+    low, high = spec['low'], spec['high']
+    if spec['type'] == 'loguniform':
+        return (math.log(value) - math.log(low)) / (math.log(high) - math.log(low))
+    return (value - low) / (high - low)
+
+def _from_unit(spec: Dict, unit: float):
+    unit = min(max(unit, 0.0), 1.0)
+    low, high = spec['low'], spec['high']
+    if spec['type'] == 'loguniform':
+        return float(math.exp(math.log(low) + unit * (math.log(high) - math.log(low))))
+    if spec['type'] == 'int':
+        return int(round(low + unit * (high - low)))
+    return float(low + unit * (high - low))
+
+def sample_random(space: Dict, rng: np.random.Generator) -> Dict:
+    params = {}
+    for key, spec in space.items():
+        if spec['type'] == 'choice':
+            params[key] = spec['values'][rng.integers(len(spec['values']))]
+        else:
+            params[key] = _from_unit(spec, rng.random())
+    return params
+
+def grid_points(space: Dict) -> List[Dict]:
+    """All combinations of a grid; numeric ranges need an explicit 'grid' list."""
+    axes = []
+    for key, spec in space.items():
+        values = spec['values'] if spec['type'] == 'choice' else spec.get('grid')
+        if not values:
+            raise ValueError(f"{key}: grid search needs 'values' (choice) or a 'grid' list")
+        axes.append([(key, value) for value in values])
+    return [dict(point) for point in itertools.product(*axes)]
+
+class TPESampler:
+    """
+    Tree-structured Parzen Estimator (Bayesian optimization).
+
+    Observed trials are split into the best `gamma` fraction and the rest;
+    each parameter gets a Parzen density for both groups (Gaussian kernels
+    in [0, 1] for numeric ranges, smoothed frequencies for choices). Of
+    `n_candidates` draws from the good density, the one with the highest
+    good/bad density ratio is suggested. Falls back to random sampling
+    until `n_startup` trials have a score.
+    """
+
+    def __init__(self, gamma: float = 0.25, n_candidates: int = 24, n_startup: int = 5):
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.n_startup = n_startup
+
+    @staticmethod
+    def _numeric_density(points: np.ndarray, x: np.ndarray) -> np.ndarray:
+        # Uniform prior keeps the density positive everywhere
+        bandwidth = max(0.5 / max(len(points), 1) ** 0.5, 0.05)
+        kernels = np.exp(-0.5 * ((x[:, None] - points[None, :]) / bandwidth) ** 2) / (bandwidth * math.sqrt(2 * math.pi))
+        return (kernels.sum(axis=1) + 1.0) / (len(points) + 1)
+
+    def suggest(self, space: Dict, observations: List[Tuple[Dict, float]], rng: np.random.Generator) -> Dict:
+        """
+        Args:
+            space: Search space
+            observations: (params, score) pairs, higher score is better
+            rng: Random generator
+        """
+        if len(observations) < self.n_startup:
+            return sample_random(space, rng)
+
+        ranked = sorted(observations, key=lambda item: item[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good = [params for params, _ in ranked[:n_good]]
+        bad = [params for params, _ in ranked[n_good:]] or good
+
+        params = {}
+        for key, spec in space.items():
+            if spec['type'] == 'choice':
+                values = spec['values']
+                good_counts = np.array([sum(p[key] == v for p in good) for v in values], dtype=float) + 1.0
+                bad_counts = np.array([sum(p[key] == v for p in bad) for v in values], dtype=float) + 1.0
+                l_probs, g_probs = good_counts / good_counts.sum(), bad_counts / bad_counts.sum()
+                candidates = rng.choice(len(values), size=self.n_candidates, p=l_probs)
+                best = candidates[np.argmax(l_probs[candidates] / g_probs[candidates])]
+                params[key] = values[int(best)]
+            else:
+                good_points = np.array([_to_unit(spec, p[key]) for p in good])
+                bad_points = np.array([_to_unit(spec, p[key]) for p in bad])
+                bandwidth = max(0.5 / len(good_points) ** 0.5, 0.05)
+                centers = rng.choice(good_points, size=self.n_candidates)
+                candidates = np.clip(centers + rng.normal(0, bandwidth, self.n_candidates), 0.0, 1.0)
+                ratio = self._numeric_density(good_points, candidates) / self._numeric_density(bad_points, candidates)
+                params[key] = _from_unit(spec, float(candidates[np.argmax(ratio)]))
+        return params
+
+def set_config_value(config: Dict, key: str, value):
+    node = config
+    parts = key.split('.')
+    for part in parts[:-1]:
+        node = node.setdefault(part, {})
+    node[parts[-1]] = value
+
+def rung_budgets(min_episodes: int, max_episodes: int, eta: int) -> List[int]:
+    """Cumulative episode budget per rung: min, min*eta, ... up to max."""
+    budgets = [int(min_episodes)]
+    while budgets[-1] * eta < max_episodes:
+        budgets.append(int(budgets[-1] * eta))
+    if budgets[-1] < max_episodes:
+        budgets.append(int(max_episodes))
+    return budgets
+
+class SweepStore:
+    """
+    Append-only JSONL event log of a sweep (sweep_dir/trials.jsonl).
+
+    Events: 'sweep' (settings), 'trial' (params), 'job' (a segment was
+    started towards a rung), 'result' (metrics at a rung) and 'failed' (a
+    segment raised). Replaying the log restores every trial's state, so an
+    interrupted sweep resumes where it stopped; segments that were running
+    are simply started again from the trial's last rung checkpoint, failed
+    trials are not retried.
+    """
+
+    def __init__(self, sweep_dir: str):
+        self.path = os.path.join(sweep_dir, 'trials.jsonl')
+        self.events = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.events = [json.loads(line) for line in f if line.strip()]
+
+    def append(self, event: Dict):
+        event = dict(event, time=time.time())
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.events.append(event)
+
+    def settings(self) -> Optional[Dict]:
+        for event in self.events:
+            if event['event'] == 'sweep':
+                return event['settings']
+        return None
+
+    def trials(self) -> Dict[int, Dict]:
+        trials = {}
+        for event in self.events:
+            if event['event'] == 'trial':
+                trials[event['trial']] = {'trial': event['trial'], 'params': event['params'],
+                                          'seed': event['seed'], 'results': {}, 'target_rung': None,
+                                          'error': None}
+            elif event['event'] == 'job':
+                trials[event['trial']]['target_rung'] = event['rung']
+            elif event['event'] == 'result':
+                trials[event['trial']]['results'][event['rung']] = event
+            elif event['event'] == 'failed':
+                trials[event['trial']]['error'] = event['error']
+        return trials
+
+def _init_worker():
+    os.chdir(PROJECT_DIR)
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+
+def run_trial_segment(config: Dict, customers_path: str, start_episode: int, end_episode: int,
+                      checkpoint_in: Optional[str], checkpoint_out: str, epsilon: Optional[float],
+                      eval_episodes: int, seed: int) -> Dict:
+    """
+    Train one trial from start_episode to end_episode and evaluate it greedily.
+
+    The agent continues from checkpoint_in (weights and epsilon); the replay
+    buffer starts empty in every segment.
+
+    Returns:
+        Greedy evaluation metrics, mean training reward and the new epsilon
+    """
+    import random
+    import tensorflow as tf
+    from env.vrp_env import VRPDynamicEnv
+    from model.dqn_model import DQNAgent
+    from model.checkpoint_registry import load_into_agent
+
+    tf.keras.backend.clear_session()
+    random.seed(seed + start_episode)
+    np.random.seed(seed + start_episode)
+    tf.random.set_seed(seed + start_episode)
+
+    customers_df = pd.read_csv(customers_path)
+    env = VRPDynamicEnv(customers_df, config['environment'].get('max_vehicles', 1),
+                        max_capacity=config['environment']['max_capacity'])
+    agent = DQNAgent(state_size=env.observation_space.shape[0], action_size=env.action_space.n, config=config)
+    if checkpoint_in:
+        load_into_agent(agent, checkpoint_in)
+        agent.update_target_model()
+    if epsilon is not None:
+        agent.epsilon = epsilon
+
+    max_steps = config['training']['max_steps']
+    start_time = time.time()
+    train_rewards = []
+    for episode in range(start_episode, end_episode):
+        state = env.reset()
+        total_reward = 0
+        for _ in range(max_steps):
+            valid_actions = [i for i in range(env.n_customers) if i not in env.visited_customers]
+            action = agent.act(state, valid_actions)
+            next_state, reward, done, info = env.step(action)
+            agent.remember(state, action, reward, next_state, done)
+            agent.replay()
+            state = next_state
+            total_reward += reward
+            if done:
+                break
+        if episode % agent.target_update == 0:
+            agent.update_target_model()
+        train_rewards.append(total_reward)
+
+    # Greedy evaluation
+    trained_epsilon = agent.epsilon
+    agent.epsilon = 0.0
+    evaluation = {'total_reward': [], 'total_distance': [], 'total_time': [], 'visited_customers': []}
+    for _ in range(eval_episodes):
+        state = env.reset()
+        total_reward = 0
+        info = {}
+        for _ in range(max_steps):
+            valid_actions = [i for i in range(env.n_customers) if i not in env.visited_customers]
+            action = agent.act(state, valid_actions)
+            state, reward, done, info = env.step(action)
+            total_reward += reward
+            if done:
+                break
+        evaluation['total_reward'].append(total_reward)
+        for name in ('total_distance', 'total_time', 'visited_customers'):
+            evaluation[name].append(info.get(name, 0))
+
+    agent.save(checkpoint_out)
+
+    metrics = {name: float(np.mean(values)) for name, values in evaluation.items()}
+    metrics['train_reward'] = float(np.mean(train_rewards[-10:])) if train_rewards else float('nan')
+    return {'metrics': metrics, 'epsilon': float(trained_epsilon), 'seconds': time.time() - start_time}
+
+class SweepRunner:
+    """
+    Runs a sweep: samples trials, schedules training segments on a process
+    pool and decides after every rung which trials continue.
+
+    Schedulers:
+        asha: asynchronous successive halving. Whenever a worker is free, the
+            highest-rung trial that is in the top 1/eta of its rung (among
+            all results recorded there so far) is promoted; otherwise a new
+            trial starts. Workers never wait for a rung to fill up.
+        sha: synchronous successive halving. A rung is only promoted (top
+            1/eta) once every trial promoted into it has finished it.
+        none: every trial trains straight to max_episodes.
+    """
+
+    def __init__(self, sweep_dir: str, settings: Dict, workers: int = 1):
+        self.sweep_dir = os.path.abspath(sweep_dir)
+        os.makedirs(os.path.join(self.sweep_dir, 'checkpoints'), exist_ok=True)
+        self.store = SweepStore(self.sweep_dir)
+
+        stored = self.store.settings()
+        if stored is None:
+            self.settings = dict(DEFAULT_SWEEP, **settings)
+            validate_space(self.settings['space'])
+            self.store.append({'event': 'sweep', 'settings': self.settings})
+        else:
+            # Resume: the stored settings win so trial ids/params stay consistent
+            self.settings = stored
+
+        s = self.settings
+        self.workers = max(int(workers), 1)
+        self.space = s['space']
+        self.sign = 1.0 if s['mode'] == 'max' else -1.0
+        self.eta = int(s['reduction_factor'])
+        if s['scheduler'] == 'none':
+            self.rungs = [int(s['max_episodes'])]
+        else:
+            self.rungs = rung_budgets(s['min_episodes'], s['max_episodes'], self.eta)
+
+        if s['search'] == 'grid':
+            self.grid = grid_points(self.space)
+            self.num_trials = len(self.grid)
+        else:
+            self.grid = None
+            self.num_trials = int(s['num_trials'])
+        self.sampler = TPESampler() if s['search'] == 'bayesian' else None
+
+        with open(os.path.join(PROJECT_DIR, s['base_config']), 'r') as f:
+            self.base_config = yaml.safe_load(f)
+
+        # All trials train on the same customers
+        self.customers_path = os.path.join(self.sweep_dir, 'customers.csv')
+        if not os.path.exists(self.customers_path):
+            source = os.path.join(PROJECT_DIR, 'data', 'simulated_shipments.csv')
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"{source} not found. Run: python main.py --generate-data")
+            shutil.copyfile(source, self.customers_path)
+
+        self.trials = self.store.trials()
+        self.running = {}
+
+    def _score(self, result: Dict) -> float:
+        return self.sign * result['metrics'][self.settings['metric']]
+
+    def _checkpoint_path(self, trial_id: int, rung: int) -> str:
+        return os.path.join(self.sweep_dir, 'checkpoints', f'trial_{trial_id}_rung_{rung}.weights.h5')
+
+    def trial_config(self, params: Dict) -> Dict:
+        config = copy.deepcopy(self.base_config)
+        for key, value in params.items():
+            set_config_value(config, key, value)
+        return config
+
+    def _new_params(self, trial_id: int) -> Dict:
+        if self.grid is not None:
+            return self.grid[trial_id]
+        rng = np.random.default_rng([self.settings['seed'], trial_id])
+        if self.sampler is not None:
+            observations = self._observations()
+            return self.sampler.suggest(self.space, observations, rng)
+        return sample_random(self.space, rng)
+
+    def _observations(self) -> List[Tuple[Dict, float]]:
+        """Scores at the highest rung with enough results (comparable budgets) for TPE."""
+        for rung in reversed(range(len(self.rungs))):
+            observations = [(trial['params'], self._score(trial['results'][rung]))
+                            for trial in self.trials.values() if rung in trial['results']]
+            if len(observations) >= self.sampler.n_startup or rung == 0:
+                return observations
+        return []
+
+    def _completed_rung(self, trial: Dict) -> int:
+        return max(trial['results']) if trial['results'] else -1
+
+    def _is_idle(self, trial: Dict) -> bool:
+        """Not running and its last job has finished."""
+        return trial['trial'] not in self.running and trial['target_rung'] == self._completed_rung(trial)
+
+    def _promotable(self, rung: int) -> List[Dict]:
+        """Trials that finished `rung`, are in its top 1/eta and were not promoted yet."""
+        finished = [trial for trial in self.trials.values() if rung in trial['results']]
+        top_count = len(finished) // self.eta
+        ranked = sorted(finished, key=lambda t: self._score(t['results'][rung]), reverse=True)[:top_count]
+        return [trial for trial in ranked if self._is_idle(trial) and self._completed_rung(trial) == rung]
+
+    def _settled(self, trial: Dict, rung: int) -> bool:
+        """Finished `rung`, or failed on its way there."""
+        return rung in trial['results'] or (trial['error'] is not None and trial['target_rung'] == rung)
+
+    def _rung_closed(self, rung: int) -> bool:
+        """
+        SHA: every trial that will reach this rung has finished it. Rung 0
+        needs all num_trials trials; a higher rung needs the previous rung
+        closed and all of its top 1/eta promotions finished here.
+        """
+        if len(self.trials) < self.num_trials:
+            return False
+        if rung == 0:
+            expected = self.num_trials
+        else:
+            if not self._rung_closed(rung - 1):
+                return False
+            expected = sum(rung - 1 in trial['results'] for trial in self.trials.values()) // self.eta
+        return sum(self._settled(trial, rung) for trial in self.trials.values()) >= expected
+
+    def _next_job(self) -> Optional[Tuple[int, int]]:
+        """(trial id, target rung) for the next segment, or None if nothing to do now."""
+        # Interrupted segments (resume) first
+        for trial in self.trials.values():
+            if trial['trial'] not in self.running and trial['error'] is None and trial['target_rung'] is not None \
+                    and trial['target_rung'] > self._completed_rung(trial):
+                return trial['trial'], trial['target_rung']
+
+        scheduler = self.settings['scheduler']
+        if scheduler in ('asha', 'sha'):
+            for rung in reversed(range(len(self.rungs) - 1)):
+                if scheduler == 'sha' and not self._rung_closed(rung):
+                    continue
+                candidates = self._promotable(rung)
+                if candidates:
+                    return candidates[0]['trial'], rung + 1
+
+        if len(self.trials) < self.num_trials:
+            trial_id = len(self.trials)
+            params = self._new_params(trial_id)
+            seed = int(self.settings['seed']) * 1000 + trial_id
+            self.store.append({'event': 'trial', 'trial': trial_id, 'params': params, 'seed': seed})
+            self.trials[trial_id] = {'trial': trial_id, 'params': params, 'seed': seed,
+                                     'results': {}, 'target_rung': None, 'error': None}
+            return trial_id, 0
+
+        return None
+
+    def _submit(self, pool: ProcessPoolExecutor, trial_id: int, rung: int):
+        trial = self.trials[trial_id]
+        previous = rung - 1
+        start_episode = self.rungs[previous] if previous >= 0 else 0
+        checkpoint_in = self._checkpoint_path(trial_id, previous) if previous >= 0 else None
+        epsilon = trial['results'][previous]['epsilon'] if previous >= 0 else None
+
+        config = self.trial_config(trial['params'])
+        config['training']['episodes'] = self.rungs[rung]
+
+        self.store.append({'event': 'job', 'trial': trial_id, 'rung': rung})
+        trial['target_rung'] = rung
+        future = pool.submit(
+            run_trial_segment, config, self.customers_path, start_episode, self.rungs[rung],
+            checkpoint_in, self._checkpoint_path(trial_id, rung), epsilon,
+            int(self.settings['eval_episodes']), trial['seed']
+        )
+        self.running[trial_id] = (future, rung)
+        print(f"▶️  Trial {trial_id:3d} → rung {rung} (episodes {start_episode}-{self.rungs[rung]})")
+
+    def run(self) -> pd.DataFrame:
+        s = self.settings
+        print(f"🔍 Sweep: {s['search']} search, {self.num_trials} trials, scheduler {s['scheduler']}, "
+              f"rungs {self.rungs}, {self.workers} worker(s)")
+
+        saved_env = {key: os.environ.get(key) for key in WORKER_THREAD_ENV}
+        os.environ.update(WORKER_THREAD_ENV)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context('spawn'),
+                                     initializer=_init_worker) as pool:
+                while True:
+                    while len(self.running) < self.workers:
+                        job = self._next_job()
+                        if job is None:
+                            break
+                        self._submit(pool, *job)
+
+                    if not self.running:
+                        break
+
+                    done, _ = wait([future for future, _ in self.running.values()], return_when=FIRST_COMPLETED)
+                    for trial_id, (future, rung) in list(self.running.items()):
+                        if future not in done:
+                            continue
+                        del self.running[trial_id]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            # One failing trial (diverged training, OOM, ...) must not end the sweep
+                            error = f'{type(e).__name__}: {e}'
+                            self.store.append({'event': 'failed', 'trial': trial_id, 'rung': rung, 'error': error})
+                            self.trials[trial_id]['error'] = error
+                            print(f"❌ Trial {trial_id:3d} rung {rung} failed: {error}")
+                            continue
+                        event = {'event': 'result', 'trial': trial_id, 'rung': rung,
+                                 'episodes': self.rungs[rung], **result}
+                        self.store.append(event)
+                        self.trials[trial_id]['results'][rung] = event
+                        print(f"✅ Trial {trial_id:3d} rung {rung}: {s['metric']} = "
+                              f"{result['metrics'][s['metric']]:.2f} ({result['seconds']:.0f}s)")
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        return self.summary()
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per trial at its highest rung (failed trials at rung -1 when
+        they have no result); writes results.csv and best_config.yaml.
+        """
+        rows = []
+        for trial in self.trials.values():
+            if not trial['results'] and trial['error'] is None:
+                continue
+            rung = self._completed_rung(trial)
+            result = trial['results'].get(rung, {'episodes': 0, 'metrics': {}})
+            rows.append({'trial': trial['trial'], 'rung': rung, 'episodes': result['episodes'],
+                         'error': trial['error'],
+                         **{f'param.{key}': json.dumps(value) if isinstance(value, list) else value
+                            for key, value in trial['params'].items()},
+                         **result['metrics']})
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return df
+
+        # Rank by rung reached first, then by the metric at that rung
+        metric = self.settings['metric']
+        if metric not in df.columns:
+            df[metric] = np.nan
+        df = df.sort_values(['rung', metric], ascending=[False, self.settings['mode'] == 'min']).reset_index(drop=True)
+        df.to_csv(os.path.join(self.sweep_dir, 'results.csv'), index=False)
+        if df.iloc[0]['rung'] < 0:
+            # Every trial failed before its first result
+            return df
+
+        best = self.trials[int(df.iloc[0]['trial'])]
+        best_config = self.trial_config(best['params'])
+        best_config['training']['episodes'] = self.base_config['training']['episodes']
+        with open(os.path.join(self.sweep_dir, 'best_config.yaml'), 'w') as f:
+            yaml.safe_dump(best_config, f, sort_keys=False)
+        return df
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter sweep for DQN VRP')
+    parser.add_argument('--sweep', default=None, help='Sweep settings (YAML); omitted = defaults or stored settings')
+    parser.add_argument('--dir', required=True, help='Sweep directory (results store, checkpoints)')
+    parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) - 1, 1),
+                        help='Number of parallel worker processes')
+    args = parser.parse_args()
+
+    settings = {}
+    if args.sweep:
+        with open(args.sweep, 'r') as f:
+            settings = yaml.safe_load(f) or {}
+
+    runner = SweepRunner(args.dir, settings, workers=args.workers)
+    if args.sweep and runner.settings != dict(DEFAULT_SWEEP, **settings):
+        print("⚠️ Sweep directory already has settings; resuming with the stored ones")
+
+    df = runner.run()
+    failed = int(df['error'].notna().sum()) if not df.empty else 0
+    if failed:
+        print(f"\n⚠️ {failed} trial(s) failed, see the error column of results.csv")
+    if df.empty or (df['rung'] < 0).all():
+        print("No results yet")
+        return
+
+    metric = runner.settings['metric']
+    print(f"\n🏆 Top trials ({metric}, {runner.settings['mode']}):")
+    columns = ['trial', 'rung', 'episodes', metric] + [c for c in df.columns if c.startswith('param.')]
+    print(df[columns].head(10).to_string(index=False))
+    print(f"\n💾 Results: {os.path.join(runner.sweep_dir, 'results.csv')}")
+    print(f"💾 Best config: {os.path.join(runner.sweep_dir, 'best_config.yaml')}")
+
+if __name__ == "__main__":
+    main()
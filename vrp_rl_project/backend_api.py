@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+import os
+import threading
 import requests
 import openrouteservice
 from datetime import datetime
@@ -709,6 +711,33 @@ def get_pt_sanghiang_data():
         # Return fallback data on error
         return SIMPLE_FALLBACK_DATA
 
+class RouteProgressUpdate(BaseModel):
+    completed_segments: int
+    timestamp: Optional[str] = None  # ISO format, default: sekarang
+
+@app.post("/api/pt-sanghiang-route/{route_id}/progress")
+def update_pt_sanghiang_route_progress(route_id: str, update: RouteProgressUpdate):
+    """Report the road segments a truck has completed; estimated_arrival of the route counts from here"""
+    try:
+        timestamp = datetime.fromisoformat(update.timestamp) if update.timestamp else None
+        if not route_system.eta_tracker.has_vehicle(route_id):
+            return {"success": False, "error": f"Route {route_id} not found"}
+        status = route_system.update_route_progress(route_id, update.completed_segments, timestamp)
+        return {
+            "success": True,
+            "route_id": route_id,
+            "progress_percent": status["progress"],
+            "completed_segments": status["completed_segments"],
+            "total_segments": status["total_segments"],
+            "estimated_arrival": f"{int(round(status['remaining_time'] * 60))} minutes",
+            "estimated_completion": status["estimated_completion"].isoformat()
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 @app.get("/api/pt-sanghiang-route/{route_id}")
 def get_pt_sanghiang_route(route_id: str):
     """Get specific route data by ID"""
@@ -750,6 +779,119 @@ def get_pt_sanghiang_route(route_id: str):
             "error": str(e)
         }
 
+class PolicyStop(BaseModel):
+    lat: float
+    lng: float
+    name: Optional[str] = None
+    demand: float = 0.0
+    time_window_start: float = 0.0
+    time_window_end: float = 24.0
+    service_time: float = 0.0
+
+class PolicyRouteRequest(BaseModel):
+    stops: List[PolicyStop]
+    depot: LatLng = CIKAMPEK
+    n_vehicles: int = 1
+    max_capacity: float = 6000
+    decoding: str = config.POLICY_DECODING  # greedy, sample atau beam
+    width: int = config.POLICY_SEARCH_WIDTH
+    time_budget_ms: Optional[float] = config.POLICY_TIME_BUDGET_MS
+
+# Policy worker dimuat sekali (lazy, torch hanya dibutuhkan untuk endpoint ini)
+policy_worker = None
+policy_worker_lock = threading.Lock()
+
+def get_policy_worker():
+    """Load the exported DQN policy once and reuse it for all requests"""
+    global policy_worker
+    if policy_worker is None:
+        with policy_worker_lock:
+            if policy_worker is None:
+                if not os.path.exists(config.POLICY_MODEL_PATH):
+                    raise FileNotFoundError(
+                        f"Policy model {config.POLICY_MODEL_PATH} not found, "
+                        f"export it with: python policy_service.py <weights> {config.POLICY_MODEL_PATH}"
+                    )
+                from policy_service import PolicyWorker
+                policy_worker = PolicyWorker(
+                    config.POLICY_MODEL_PATH,
+                    max_batch_size=config.POLICY_MAX_BATCH_SIZE,
+                    max_wait_ms=config.POLICY_MAX_WAIT_MS
+                )
+    return policy_worker
+
+@app.post("/api/policy/route")
+def get_policy_route(request: PolicyRouteRequest):
+    """Order stops with the trained DQN policy (greedy requests are micro-batched, sample/beam search many routes per forward pass)"""
+    try:
+        import pandas as pd
+        from policy_service import decode_route
+
+        worker = get_policy_worker()
+
+        # Row 0 = depot, seperti saat training
+        rows = [{
+            "latitude": request.depot.lat,
+            "longitude": request.depot.lng,
+            "demand": 0.0,
+            "time_window_start": min((stop.time_window_start for stop in request.stops), default=0.0),
+            "time_window_end": max((stop.time_window_end for stop in request.stops), default=24.0),
+            "service_time": 0.0
+        }]
+        for stop in request.stops:
+            rows.append({
+                "latitude": stop.lat,
+                "longitude": stop.lng,
+                "demand": stop.demand,
+                "time_window_start": stop.time_window_start,
+                "time_window_end": stop.time_window_end,
+                "service_time": stop.service_time
+            })
+
+        result = decode_route(worker, pd.DataFrame(rows), request.n_vehicles, request.max_capacity,
+                              mode=request.decoding, width=request.width,
+                              time_budget_ms=request.time_budget_ms)
+
+        vehicles = []
+        for vehicle_index, route in enumerate(result["routes"]):
+            vehicles.append({
+                "vehicle": vehicle_index + 1,
+                "stops": [
+                    {
+                        "index": index - 1,
+                        "name": request.stops[index - 1].name,
+                        "lat": request.stops[index - 1].lat,
+                        "lng": request.stops[index - 1].lng
+                    }
+                    for index in route
+                ]
+            })
+
+        return {
+            "success": True,
+            "vehicles": vehicles,
+            "total_distance_km": round(result["total_distance"], 2),
+            "total_time_hours": round(result["total_time"], 2),
+            "visited_stops": result["visited_customers"],
+            "warning": result["error"],
+            "decoding": request.decoding,
+            "candidates": result.get("candidates", 1),
+            "decoding_ms": round(result["elapsed_ms"], 1) if "elapsed_ms" in result else None
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/policy/stats")
+def get_policy_stats():
+    """Inference worker statistics (batches, mean batch size)"""
+    if policy_worker is None:
+        return {"success": True, "loaded": False}
+    return {"success": True, "loaded": True, **policy_worker.stats()}
+
 @app.post("/api/optimize")
 def optimize_route():
     """Optimize routes using VRP algorithm"""
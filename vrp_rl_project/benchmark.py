@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite untuk solver VRP pada instance standar (CVRPLIB dan Solomon/Homberger)
+Menjalankan solver terdaftar (heuristik, policy DQN/attention) dengan batas waktu,
+lalu mencatat gap terhadap best-known solution dan runtime ke data/benchmarks/results.csv.
+
+Instances are read from a local directory (nothing is downloaded):
+    *.vrp   CVRPLIB / TSPLIB format; best-known cost from a sibling .sol file
+            ("Cost <value>") or from the COMMENT line ("Optimal value: <value>")
+    *.txt   Solomon / Homberger VRPTW format; best-known cost from a sibling
+            .sol file (CVRPLIB layout) or best_known.csv. Only files with
+            the VEHICLE / CUSTOMER headers are read (READMEs are skipped)
+Best-known values can also be listed in best_known.csv (columns: instance,
+best_known) in the instance directory. A run counts as solved only when every
+customer is served once within capacity (and, for VRPTW, within its time window).
+Only solvers registered with time_windows=True are run on VRPTW instances,
+the others are reported as 'unsupported'.
+
+Usage:
+    python benchmark.py --list-solvers
+    python benchmark.py --dir data/benchmarks/cvrplib --solvers savings_2opt sweep attention --time-limit 30
+"""
+
+import argparse
+import fnmatch
+import glob
+import multiprocessing as mp
+import os
+import re
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from heuristics import BASELINES, Routes, route_lengths
+
+BENCHMARK_DIR = os.path.join('data', 'benchmarks')
+RESULTS_PATH = os.path.join(BENCHMARK_DIR, 'results.csv')
+
+class SolverUnavailable(Exception):
+    """Solver cannot handle this instance (e.g. no trained model for its size)."""
+
+def _euclidean(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.sqrt((x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2)
+
+def _explicit_matrix(values: List[float], n: int, edge_format: str) -> np.ndarray:
+    """Full matrix from an EXPLICIT TSPLIB EDGE_WEIGHT_SECTION."""
+    matrix = np.zeros((n, n))
+    values = iter(values)
+    if edge_format == 'FULL_MATRIX':
+        for i in range(n):
+            for j in range(n):
+                matrix[i, j] = next(values)
+        return matrix
+
+    rows = {
+        'LOWER_ROW': lambda i: range(i),
+        'LOWER_DIAG_ROW': lambda i: range(i + 1),
+        'UPPER_ROW': lambda i: range(i + 1, n),
+        'UPPER_DIAG_ROW': lambda i: range(i, n),
+    }
+    if edge_format not in rows:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {edge_format}")
+    for i in range(n):
+        for j in rows[edge_format](i):
+            matrix[i, j] = matrix[j, i] = next(values)
+    return matrix
+
+def parse_cvrplib(path: str) -> Dict:
+    """
+    Parse a CVRPLIB (TSPLIB-style) .vrp file.
+
+    Supports EUC_2D (rounded to the nearest integer, the CVRPLIB convention),
+    CEIL_2D, EXACT_2D and EXPLICIT edge weights. The depot is moved to row 0.
+
+    Returns:
+        Instance dict (see load_instance)
+    """
+    header, sections, section = {}, {}, None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == 'EOF':
+                continue
+            keyword = line.split(':')[0].strip().upper()
+            if keyword.endswith('_SECTION'):
+                section = keyword
+                sections[section] = []
+            elif ':' in line:
+                key, value = line.split(':', 1)
+                header[key.strip().upper()] = value.strip()
+                section = None
+            elif section:
+                sections[section].extend(line.split())
+
+    n = int(header['DIMENSION'])
+    capacity = float(header['CAPACITY'])
+    edge_type = header.get('EDGE_WEIGHT_TYPE', 'EUC_2D').upper()
+
+    coordinates = np.zeros((n, 2))
+    if 'NODE_COORD_SECTION' in sections:
+        values = np.array(sections['NODE_COORD_SECTION'], dtype=float).reshape(n, 3)
+        coordinates[values[:, 0].astype(int) - 1] = values[:, 1:]
+
+    demand = np.zeros(n)
+    values = np.array(sections['DEMAND_SECTION'], dtype=float).reshape(n, 2)
+    demand[values[:, 0].astype(int) - 1] = values[:, 1]
+
+    depots = [int(v) for v in sections.get('DEPOT_SECTION', ['1']) if int(v) > 0]
+    depot = depots[0] - 1
+
+    if edge_type == 'EXPLICIT':
+        distances = _explicit_matrix([float(v) for v in sections['EDGE_WEIGHT_SECTION']], n,
+                                     header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper())
+    else:
+        distances = _euclidean(coordinates[:, 0], coordinates[:, 1])
+        if edge_type == 'EUC_2D':
+            distances = np.floor(distances + 0.5)
+        elif edge_type == 'CEIL_2D':
+            distances = np.ceil(distances)
+        elif edge_type != 'EXACT_2D':
+            raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {edge_type}")
+
+    # Depot first
+    order = np.concatenate(([depot], np.delete(np.arange(n), depot)))
+    best_known = None
+    match = re.search(r'(?:optimal|best)\s*(?:value|known)?\s*:?\s*([\d.]+)', header.get('COMMENT', ''), re.I)
+    if match:
+        best_known = float(match.group(1))
+    vehicles = re.search(r'-k(\d+)', header.get('NAME', os.path.basename(path)))
+
+    return {
+        'name': header.get('NAME', os.path.splitext(os.path.basename(path))[0]),
+        'format': 'cvrplib',
+        'x': coordinates[order, 0],
+        'y': coordinates[order, 1],
+        'demand': demand[order],
+        'capacity': capacity,
+        'distances': distances[np.ix_(order, order)],
+        'time_window_start': None,
+        'time_window_end': None,
+        'service_time': None,
+        'vehicles': int(vehicles.group(1)) if vehicles else None,
+        'best_known': best_known,
+    }
+
+def parse_solomon(path: str) -> Dict:
+    """
+    Parse a Solomon / Homberger VRPTW .txt file (customer 0 is the depot).
+
+    Distances are unrounded Euclidean, travel time equals distance.
+
+    Returns:
+        Instance dict (see load_instance)
+    """
+    with open(path) as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    name = lines[0]
+    vehicles_line = next(i for i, line in enumerate(lines) if line.upper().startswith('NUMBER'))
+    vehicles, capacity = (float(v) for v in lines[vehicles_line + 1].split()[:2])
+    customer_line = next(i for i, line in enumerate(lines) if line.upper().startswith('CUST'))
+    rows = np.array([line.split()[:7] for line in lines[customer_line + 1:]
+                     if re.match(r'^\d', line)], dtype=float)
+    rows = rows[np.argsort(rows[:, 0])]
+
+    return {
+        'name': name,
+        'format': 'solomon',
+        'x': rows[:, 1],
+        'y': rows[:, 2],
+        'demand': rows[:, 3],
+        'capacity': capacity,
+        'distances': _euclidean(rows[:, 1], rows[:, 2]),
+        'time_window_start': rows[:, 4],
+        'time_window_end': rows[:, 5],
+        'service_time': rows[:, 6],
+        'vehicles': int(vehicles),
+        'best_known': None,
+    }
+
+def _best_known_table(directory: str) -> Dict[str, float]:
+    path = os.path.join(directory, 'best_known.csv')
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path)
+    return {str(row['instance']): float(row['best_known']) for _, row in table.iterrows()}
+
+def _solution_cost(path: str) -> Optional[float]:
+    """Cost line of a CVRPLIB .sol file."""
+    with open(path) as f:
+        for line in f:
+            if line.lower().startswith('cost'):
+                return float(line.split()[1])
+    return None
+
+def load_instance(path: str) -> Dict:
+    """
+    Load a benchmark instance by extension (.vrp CVRPLIB, .txt Solomon).
+
+    Returns:
+        Dict with name, format, x/y coordinates, demand, capacity, distance
+        matrix, time windows and service times (None for CVRP), vehicle
+        count (if known) and best_known cost (None if unknown); row 0 is
+        the depot
+    """
+    instance = parse_cvrplib(path) if path.lower().endswith('.vrp') else parse_solomon(path)
+    instance['path'] = path
+
+    solution_path = os.path.splitext(path)[0] + '.sol'
+    if os.path.exists(solution_path):
+        instance['best_known'] = _solution_cost(solution_path) or instance['best_known']
+    table = _best_known_table(os.path.dirname(path))
+    for key in (instance['name'], os.path.splitext(os.path.basename(path))[0]):
+        if key in table:
+            instance['best_known'] = table[key]
+    return instance
+
+def _is_solomon(path: str) -> bool:
+    """Solomon/Homberger files start with VEHICLE and CUSTOMER section headers."""
+    with open(path, errors='ignore') as f:
+        head = [line.strip().upper() for _, line in zip(range(20), f)]
+    return 'VEHICLE' in head and 'CUSTOMER' in head
+
+def find_instances(directory: str, pattern: Optional[str] = None) -> List[str]:
+    """
+    Benchmark instances below directory (recursive): every .vrp file and
+    the .txt files with a Solomon header (READMEs and other text files are
+    skipped), optionally filtered by a file name glob.
+    """
+    paths = glob.glob(os.path.join(directory, '**', '*.vrp'), recursive=True)
+    paths += [path for path in glob.glob(os.path.join(directory, '**', '*.txt'), recursive=True)
+              if _is_solomon(path)]
+    if pattern:
+        paths = [path for path in paths if fnmatch.fnmatch(os.path.basename(path), pattern)]
+    return sorted(paths)
+
+def instance_dataframe(instance: Dict) -> pd.DataFrame:
+    """
+    Customers table for the env-based solvers. Coordinates are mapped onto
+    a small latitude/longitude box around (0, 0) so that the haversine
+    distances of VRPDynamicEnv are proportional to the planar ones; routes
+    are always scored with the instance's own distance matrix. Time windows
+    are not passed on (their units differ from the environment's hours).
+    """
+    x, y = instance['x'], instance['y']
+    scale = 1.0 / max(np.ptp(x), np.ptp(y), 1e-9)
+    return pd.DataFrame({
+        'customer_id': np.arange(len(x)),
+        'x': x,
+        'y': y,
+        'latitude': (y - y[0]) * scale,
+        'longitude': (x - x[0]) * scale,
+        'demand': instance['demand'],
+    })
+
+# name -> (instance, time_limit) -> routes
+SOLVERS: Dict[str, Callable[[Dict, Optional[float]], Routes]] = {}
+# Solvers that schedule with the instance's time windows
+TIME_WINDOW_SOLVERS = set()
+
+def register_solver(name: str, time_windows: bool = False):
+    """
+    Decorator adding a solver (instance dict, time limit in seconds) -> routes.
+
+    Args:
+        name: Solver name used on the command line
+        time_windows: The solver respects time_window_start/end and
+            service_time (travel time = distance, as in time_window_violations);
+            other solvers are not run on VRPTW instances
+    """
+    def decorator(function):
+        SOLVERS[name] = function
+        if time_windows:
+            TIME_WINDOW_SOLVERS.add(name)
+        return function
+    return decorator
+
+def _heuristic_solver(baseline: Callable) -> Callable:
+    def solve(instance: Dict, time_limit: Optional[float]) -> Routes:
+        """Construction heuristic from heuristics.BASELINES (2-opt phases stop at the time limit)."""
+        deadline = time.perf_counter() + time_limit if time_limit else None
+        return baseline(instance_dataframe(instance), instance['distances'], instance['demand'],
+                        instance['capacity'], False, deadline)
+    return solve
+
+for _name, _baseline in BASELINES.items():
+    register_solver(_name)(_heuristic_solver(_baseline))
+
+@register_solver('nearest_neighbor_tw', time_windows=True)
+def _time_window_solver(instance: Dict, time_limit: Optional[float]) -> Routes:
+    """Time-oriented nearest neighbor (Solomon): next customer with the earliest feasible service start."""
+    distances, demand, capacity = instance['distances'], instance['demand'], instance['capacity']
+    n = len(demand)
+    if instance['time_window_start'] is None:
+        ready, due, service = np.zeros(n), np.full(n, np.inf), np.zeros(n)
+    else:
+        ready, due, service = instance['time_window_start'], instance['time_window_end'], instance['service_time']
+
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[0] = False
+    routes, route, current, now, remaining = [], [], 0, ready[0], capacity
+
+    while unvisited.any():
+        start = np.maximum(now + distances[current], ready)
+        # Served before its due date, with time left to get back to the depot
+        candidates = unvisited & (demand <= remaining) & (start <= due + 1e-6) \
+            & (start + service + distances[:, 0] <= due[0] + 1e-6)
+        if not candidates.any():
+            if route:
+                routes.append(route)
+                route, current, now, remaining = [], 0, ready[0], capacity
+                continue
+            # Not reachable in time even from the depot: serve it late on its own route
+            candidates = unvisited & (demand <= remaining)
+            if not candidates.any():
+                raise ValueError(f"Customers {np.flatnonzero(unvisited).tolist()} have demand above "
+                                 f"vehicle capacity {capacity}")
+        # Earliest service start, ties broken by distance
+        score = np.where(candidates, start + 1e-6 * distances[current], np.inf)
+        customer = int(np.argmin(score))
+        route.append(customer)
+        unvisited[customer] = False
+        remaining -= demand[customer]
+        now = start[customer] + service[customer]
+        current = customer
+
+    routes.append(route)
+    return [route for route in routes if route]
+
+def _routes_from_actions(env, actions: List[int]) -> Routes:
+    """Split an env visiting order into routes (VRPDynamicEnv switches vehicles on capacity)."""
+    routes = [[]]
+    env.reset()
+    for action in actions:
+        _, _, done, info = env.step(action)
+        if 'error' in info and info['error'] != 'Time window violated':
+            break
+        while len(routes) < info['vehicles_used']:
+            routes.append([])
+        routes[-1].append(int(action))
+    return [route for route in routes if route]
+
+# Model caches per worker process
+_models: Dict[str, object] = {}
+
+@register_solver('attention')
+def _attention_solver(instance: Dict, time_limit: Optional[float]) -> Routes:
+    """Greedy decoding with the trained attention policy (train_attention_policy.py)."""
+    from model.attention_policy import AttentionPolicy, solve
+    from train_attention_policy import MODEL_PATH
+
+    if 'attention' not in _models:
+        if not os.path.exists(MODEL_PATH):
+            raise SolverUnavailable(f"{MODEL_PATH} not found")
+        _models['attention'] = AttentionPolicy.load(MODEL_PATH)
+
+    n = len(instance['demand'])
+    result = solve(_models['attention'], instance_dataframe(instance), n_vehicles=n,
+                   max_capacity=instance['capacity'])
+    return [route for route in result['routes'] if route]
+
+@register_solver('dqn')
+def _dqn_solver(instance: Dict, time_limit: Optional[float]) -> Routes:
+    """Greedy rollout of the latest registered DQN checkpoint trained on this instance size."""
+    from env.vrp_env import VRPDynamicEnv
+    from model.dqn_model import DQNAgent
+    from model.checkpoint_registry import CheckpointRegistry, load_into_agent
+    from utils import load_config
+
+    n = len(instance['demand'])
+    key = f'dqn_{n}'
+    if key not in _models:
+        registry = CheckpointRegistry()
+        checkpoint = registry.latest('dqn', state_size=5 + n, action_size=n)
+        if checkpoint is None:
+            raise SolverUnavailable(f"No DQN checkpoint for {n} locations")
+        agent = DQNAgent(state_size=5 + n, action_size=n, config=registry.config(checkpoint['path']) or load_config())
+        load_into_agent(agent, checkpoint['path'])
+        agent.epsilon = 0.0
+        _models[key] = agent
+    agent = _models[key]
+
+    env = VRPDynamicEnv(instance_dataframe(instance), n_vehicles=n, max_capacity=instance['capacity'])
+    state, done, actions = env.reset(), False, []
+    while not done:
+        valid_actions = np.flatnonzero(env.action_masks()).tolist()
+        if not valid_actions:
+            break
+        action = agent.act(state, valid_actions)
+        state, _, done, info = env.step(action)
+        actions.append(action)
+        if 'error' in info and info['error'] != 'Time window violated':
+            break
+    return _routes_from_actions(env, actions)
+
+def time_window_violations(instance: Dict, routes: Routes) -> int:
+    """Customers served after their due date (travel time = distance)."""
+    if instance['time_window_start'] is None:
+        return 0
+    distances = instance['distances']
+    ready, due, service = instance['time_window_start'], instance['time_window_end'], instance['service_time']
+    violations = 0
+    for route in routes:
+        current, now = 0, ready[0]
+        for customer in route:
+            now = max(now + distances[current, customer], ready[customer])
+            violations += now > due[customer] + 1e-6
+            now += service[customer]
+            current = customer
+    return int(violations)
+
+def score_routes(instance: Dict, routes: Routes) -> Dict:
+    """Closed-route cost, vehicles and feasibility checks of a solution."""
+    n = len(instance['demand'])
+    visited = [customer for route in routes for customer in route]
+    loads = [instance['demand'][route].sum() for route in routes if route]
+    cost = float(route_lengths(routes, instance['distances']).sum())
+    best_known = instance['best_known']
+    return {
+        'cost': cost,
+        'vehicles': len([route for route in routes if route]),
+        'missing_customers': n - 1 - len(set(visited)),
+        'duplicate_visits': len(visited) - len(set(visited)),
+        'capacity_violations': int(sum(load > instance['capacity'] + 1e-9 for load in loads)),
+        'time_window_violations': time_window_violations(instance, routes),
+        'best_known': best_known,
+        'gap_percent': (cost - best_known) / best_known * 100.0 if best_known else None,
+    }
+
+def _solve_task(solver_name: str, instance_path: str, time_limit: Optional[float]) -> Dict:
+    """Worker task: solve one instance and score it."""
+    instance = load_instance(instance_path)
+    if instance['time_window_start'] is not None and solver_name not in TIME_WINDOW_SOLVERS:
+        return {'status': 'unsupported', 'message': 'solver ignores time windows'}
+    start = time.perf_counter()
+    try:
+        routes = SOLVERS[solver_name](instance, time_limit)
+    except SolverUnavailable as e:
+        return {'status': 'unavailable', 'message': str(e)}
+    runtime = time.perf_counter() - start
+
+    result = score_routes(instance, routes)
+    feasible = result['missing_customers'] == 0 and result['duplicate_visits'] == 0 \
+        and result['capacity_violations'] == 0 and result['time_window_violations'] == 0
+    status = 'ok' if feasible else 'infeasible'
+    if feasible and time_limit and runtime > time_limit:
+        status = 'over_time_limit'
+    result.update(status=status, runtime_s=runtime)
+    return result
+
+def _code_version() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _format_row(row: Dict) -> str:
+    line = f"{row['solver']:22s} {row['instance']:20s} {row['status']:16s}"
+    if 'cost' in row:
+        line += f" cost {row['cost']:10.1f}"
+        if row['gap_percent'] is not None:
+            line += f" gap {row['gap_percent']:6.2f}%"
+        line += f" {row['runtime_s']:7.2f}s"
+    return line + (f" {row['message']}" if 'message' in row else '')
+
+def run_benchmark(instance_paths: List[str], solver_names: List[str], time_limit: Optional[float] = None,
+                  startup_allowance: float = 120.0) -> pd.DataFrame:
+    """
+    Run every solver on every instance.
+
+    Each solver runs in its own spawned worker process (models are loaded
+    once per solver, and TensorFlow/PyTorch solvers never share a
+    process). Solvers receive the time limit and should stop improving
+    when it passes; a worker still busy after time_limit +
+    startup_allowance seconds is killed and the run recorded as 'timeout'.
+
+    Returns:
+        One row per (solver, instance)
+    """
+    run_id = time.strftime('%Y%m%dT%H%M%S')
+    version = _code_version()
+    context = mp.get_context('spawn')
+    rows = []
+
+    for solver_name in solver_names:
+        if solver_name not in SOLVERS:
+            raise ValueError(f"Unknown solver {solver_name}; registered: {sorted(SOLVERS)}")
+        pool = context.Pool(1)
+        try:
+            for path in instance_paths:
+                row = {'run_id': run_id, 'code_version': version, 'solver': solver_name,
+                       'instance': os.path.splitext(os.path.basename(path))[0], 'time_limit_s': time_limit}
+                task = pool.apply_async(_solve_task, (solver_name, path, time_limit))
+                try:
+                    row.update(task.get(timeout=(time_limit or 0) + startup_allowance))
+                except mp.TimeoutError:
+                    row.update(status='timeout')
+                    pool.terminate()
+                    pool = context.Pool(1)
+                except Exception as e:
+                    row.update(status='error', message=f'{type(e).__name__}: {e}')
+                rows.append(row)
+                print(_format_row(row))
+        finally:
+            pool.terminate()
+
+    return pd.DataFrame(rows)
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per solver: instances attempted and solved (feasible), mean/max gap and
+    mean runtime of the solved ones. Unsupported instances (VRPTW for
+    solvers without time windows) and unavailable models are not attempts.
+    """
+    solved = results[results['status'].isin(['ok', 'over_time_limit'])]
+    attempted = results[~results['status'].isin(['unsupported', 'unavailable'])]
+    summary = solved.groupby('solver').agg(
+        mean_gap_percent=('gap_percent', 'mean'),
+        max_gap_percent=('gap_percent', 'max'),
+        mean_runtime_s=('runtime_s', 'mean'),
+    ).reindex(results['solver'].unique())
+    summary.insert(0, 'attempted', attempted.groupby('solver')['instance'].count())
+    summary.insert(1, 'solved', solved.groupby('solver')['instance'].count())
+    summary.insert(2, 'unsupported', results[results['status'] == 'unsupported'].groupby('solver')['instance'].count())
+    for column in ('attempted', 'solved', 'unsupported'):
+        summary[column] = summary[column].fillna(0).astype(int)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Run VRP solvers on CVRPLIB/Solomon benchmark instances')
+    parser.add_argument('--dir', default=BENCHMARK_DIR, help='Directory with .vrp / .txt instances (searched recursively)')
+    parser.add_argument('--pattern', default=None, help='Only instances whose file name matches this glob')
+    parser.add_argument('--solvers', nargs='+', default=None,
+                        help='Solvers to run (default: all heuristics, including nearest_neighbor_tw)')
+    parser.add_argument('--time-limit', type=float, default=60.0, help='Seconds per solver and instance')
+    parser.add_argument('--output', default=RESULTS_PATH, help='CSV the results are appended to')
+    parser.add_argument('--list-solvers', action='store_true', help='List registered solvers')
+    args = parser.parse_args()
+
+    if args.list_solvers:
+        for name, function in SOLVERS.items():
+            description = (function.__doc__ or '').strip().split('\n')[0]
+            print(f"   {name:22s} {description}")
+        return
+
+    paths = find_instances(args.dir, args.pattern)
+    if not paths:
+        print(f"⚠️ Tidak ada instance .vrp/.txt di {args.dir}")
+        print("💡 Unduh instance dari CVRPLIB (http://vrp.galgos.inf.puc-rio.br) atau Solomon ke direktori ini")
+        return
+
+    solvers = args.solvers or list(BASELINES) + sorted(TIME_WINDOW_SOLVERS)
+    print(f"📊 {len(paths)} instances x {len(solvers)} solvers, time limit {args.time_limit:g}s")
+    print("=" * 60)
+    results = run_benchmark(paths, solvers, args.time_limit)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    if os.path.exists(args.output):
+        results = pd.concat([pd.read_csv(args.output), results], ignore_index=True)
+        current = results['run_id'] == results['run_id'].iloc[-1]
+    else:
+        current = np.ones(len(results), dtype=bool)
+    results.to_csv(args.output, index=False)
+
+    print("\n📈 Summary:")
+    print(summarize(results[current]).to_string(float_format=lambda v: f'{v:.2f}'))
+    print(f"\n💾 Results appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -21,4 +21,12 @@ TRAFFIC_FACTORS = {
 RUSH_HOURS = [
     (7, 9),   # Pagi: 07:00-09:00
     (16, 19)  # Sore: 16:00-19:00
-] 
\ No newline at end of file
+] 
+
+# DQN Policy Service (/api/policy/route)
+POLICY_MODEL_PATH = "model/policy.pt"  # Hasil: python policy_service.py <weights> model/policy.pt
+POLICY_MAX_BATCH_SIZE = 64  # Maksimal request per forward pass
+POLICY_MAX_WAIT_MS = 2.0    # Maksimal waktu tunggu untuk micro-batching
+POLICY_DECODING = "greedy"  # greedy, sample (best-of-K) atau beam
+POLICY_SEARCH_WIDTH = 16    # Jumlah sampel / lebar beam per langkah
+POLICY_TIME_BUDGET_MS = 200.0  # Batas latensi untuk sample/beam
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Distributed Training untuk DQN VRP
+Beberapa proses actor mengisi shared replay buffer, satu learner meng-update bobot
+"""
+
+import os
+import queue
+import random
+import sys
+import time
+import multiprocessing as mp
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from model.checkpoint_registry import CheckpointRegistry
+from model.replay_buffer import ReplayBuffer, SharedReplayBuffer
+
+# Env vars yang membatasi thread BLAS/TF/torch di proses actor
+ACTOR_THREAD_ENV = {
+    'OMP_NUM_THREADS': '1',
+    'MKL_NUM_THREADS': '1',
+    'TF_NUM_INTRAOP_THREADS': '1',
+    'TF_NUM_INTEROP_THREADS': '1',
+}
+
+def default_valid_actions(env) -> List[int]:
+    """Unvisited customers (sama seperti loop training di main.py)"""
+    return [i for i in range(env.n_customers) if i not in env.visited_customers]
+
+def actor_epsilons(num_actors: int, base: float = 0.4, alpha: float = 7.0) -> List[float]:
+    """
+    Fixed exploration rate per actor, epsilon_i = base^(1 + alpha * i / (N - 1)).
+
+    Actors explore at different rates instead of sharing one decaying epsilon,
+    so the buffer always holds both exploratory and near-greedy experience.
+    """
+    if num_actors == 1:
+        return [base]
+    return [base ** (1 + alpha * i / (num_actors - 1)) for i in range(num_actors)]
+
+def _actor_loop(actor_id: int, env_factory: Callable, agent_factory: Callable,
+                buffer: SharedReplayBuffer, weights_queue, results_queue, stop_event,
+                epsilon: float, max_steps: int, weight_poll_interval: int,
+                valid_actions_fn: Callable, seed: int):
+    """Proses actor: jalankan episode dengan bobot terbaru, simpan transisi ke shared buffer"""
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(1)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    env = env_factory()
+    agent = agent_factory()
+    agent.memory = buffer
+    agent.epsilon = epsilon
+
+    steps = 0
+    try:
+        while not stop_event.is_set():
+            state = env.reset()
+            total_reward = 0
+            info = {}
+
+            for step in range(max_steps):
+                if steps % weight_poll_interval == 0:
+                    try:
+                        agent.set_weights(weights_queue.get_nowait())
+                    except queue.Empty:
+                        pass
+
+                action = agent.act(state, valid_actions_fn(env))
+                next_state, reward, done, info = env.step(action)
+                agent.remember(state, action, reward, next_state, done)
+
+                state = next_state
+                total_reward += reward
+                steps += 1
+
+                if done or stop_event.is_set():
+                    break
+
+            results_queue.put({
+                'actor': actor_id,
+                'total_reward': total_reward,
+                'total_distance': info.get('total_distance', 0),
+                'total_time': info.get('total_time', 0),
+                'visited_customers': info.get('visited_customers', 0),
+                'epsilon': epsilon,
+                'steps': step + 1
+            })
+    finally:
+        if getattr(agent, 'transition_writer', None) is not None:
+            agent.transition_writer.close()
+        buffer.close()
+
+def _broadcast_weights(agent, weights_queues: List):
+    """Kirim bobot learner ke setiap actor, ganti bobot lama yang belum diambil"""
+    weights = agent.get_weights()
+    for weights_queue in weights_queues:
+        try:
+            while True:
+                weights_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            weights_queue.put_nowait(weights)
+        except queue.Full:
+            pass
+
+def train_distributed(env_factory: Callable, agent_factory: Callable, config: Dict,
+                      num_actors: int = None, valid_actions_fn: Callable = default_valid_actions,
+                      replay_fn: Callable = None, checkpoint_pattern: str = None) -> Tuple[object, Dict]:
+    """
+    Train a DQN agent with several actor processes and one learner.
+
+    Each actor builds its own environment and agent copy, acts with a fixed
+    epsilon (see actor_epsilons) and writes transitions (through the agent's
+    remember, so n-step returns still apply) into a SharedReplayBuffer. The
+    calling process is the learner: it samples that buffer with the agent's
+    own replay(), updates the target network every target_update_steps and
+    broadcasts weights to the actors every broadcast_interval updates.
+
+    Args:
+        env_factory: Picklable callable returning a new environment
+        agent_factory: Picklable callable returning a new agent with
+            act/remember/replay/get_weights/set_weights/update_target_model
+        config: Configuration dictionary (training + distributed sections)
+        num_actors: Number of actor processes (default from config, or
+            CPU count - 1)
+        valid_actions_fn: Callable env -> list of valid actions
+        replay_fn: Callable agent -> loss for one learner update
+            (default agent.replay())
+        checkpoint_pattern: Format string with {episode} for periodic saves
+            (saved checkpoints are added to the CheckpointRegistry)
+
+    Returns:
+        Trained learner agent and training results (one row per episode)
+    """
+    distributed = config.get('distributed', {})
+    episodes = config['training']['episodes']
+    max_steps = config['training']['max_steps']
+    save_interval = config['training']['save_interval']
+    learning_starts = distributed.get('learning_starts', 1000)
+    broadcast_interval = distributed.get('broadcast_interval', 50)
+    target_update_steps = distributed.get('target_update_steps', 500)
+    weight_poll_interval = distributed.get('weight_poll_interval', 100)
+
+    num_actors = num_actors or distributed.get('num_actors') or max((os.cpu_count() or 2) - 1, 1)
+    replay_fn = replay_fn or (lambda agent: agent.replay())
+
+    learner = agent_factory()
+    context = mp.get_context('spawn')
+    buffer = SharedReplayBuffer(learner.memory.capacity, (learner.state_size,), context=context)
+    learner.memory = buffer
+    # Priorities would have to be shared with the actors; the learner samples uniformly
+    if getattr(learner, 'prioritized_replay', False):
+        learner.prioritized_replay = False
+
+    stop_event = context.Event()
+    results_queue = context.Queue()
+    weights_queues = [context.Queue(maxsize=1) for _ in range(num_actors)]
+    epsilons = actor_epsilons(num_actors)
+
+    results = {
+        'episode': [],
+        'actor': [],
+        'total_reward': [],
+        'total_distance': [],
+        'total_time': [],
+        'visited_customers': [],
+        'epsilon': []
+    }
+
+    print(f"🚀 Distributed training: {num_actors} actors + 1 learner")
+
+    # Actor inherits the environment at spawn: one compute thread per actor
+    saved_env = {key: os.environ.get(key) for key in ACTOR_THREAD_ENV}
+    os.environ.update(ACTOR_THREAD_ENV)
+    actors = []
+    try:
+        for actor_id in range(num_actors):
+            actor = context.Process(
+                target=_actor_loop,
+                args=(actor_id, env_factory, agent_factory, buffer, weights_queues[actor_id],
+                      results_queue, stop_event, epsilons[actor_id], max_steps,
+                      weight_poll_interval, valid_actions_fn, actor_id + 1),
+                daemon=True
+            )
+            actor.start()
+            actors.append(actor)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    _broadcast_weights(learner, weights_queues)
+
+    registry = CheckpointRegistry()
+    updates = 0
+    start_time = time.time()
+    try:
+        while len(results['episode']) < episodes:
+            # Collect finished episodes
+            while len(results['episode']) < episodes:
+                try:
+                    episode_result = results_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                episode = len(results['episode'])
+                results['episode'].append(episode)
+                for key in ('actor', 'total_reward', 'total_distance', 'total_time',
+                            'visited_customers', 'epsilon'):
+                    results[key].append(episode_result[key])
+
+                if checkpoint_pattern and episode % save_interval == 0:
+                    checkpoint_path = checkpoint_pattern.format(episode=episode)
+                    learner.save(checkpoint_path)
+                    registry.register(
+                        checkpoint_path, config=config,
+                        state_size=learner.state_size, action_size=learner.action_size,
+                        episode=episode, step=buffer.total_added,
+                        metrics={'total_reward': episode_result['total_reward'],
+                                 'total_distance': episode_result['total_distance'],
+                                 'visited_customers': episode_result['visited_customers']}
+                    )
+
+                if episode % 10 == 0:
+                    elapsed = time.time() - start_time
+                    print(f"Episode: {episode} | Actor: {episode_result['actor']} | "
+                          f"Reward: {episode_result['total_reward']:.2f} | "
+                          f"Updates: {updates} | Env steps: {buffer.total_added} | "
+                          f"Steps/s: {buffer.total_added / max(elapsed, 1e-9):.0f}")
+
+            if not any(actor.is_alive() for actor in actors):
+                raise RuntimeError("All actor processes exited unexpectedly")
+
+            if len(buffer) < max(learning_starts, getattr(learner, 'batch_size', 1)):
+                time.sleep(0.01)
+                continue
+
+            replay_fn(learner)
+            updates += 1
+
+            if updates % target_update_steps == 0:
+                learner.update_target_model()
+            if updates % broadcast_interval == 0:
+                _broadcast_weights(learner, weights_queues)
+    finally:
+        stop_event.set()
+        # Drain queues so actors blocked on put() can exit
+        deadline = time.time() + 10
+        while any(actor.is_alive() for actor in actors) and time.time() < deadline:
+            try:
+                results_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for actor in actors:
+            actor.join(timeout=1)
+            if actor.is_alive():
+                actor.terminate()
+
+        # Keep a private copy of the experience for any further training
+        learner.memory = _copy_to_local_buffer(buffer)
+        buffer.unlink()
+
+    print(f"✅ Distributed training selesai: {updates} updates, {buffer.total_added} env steps")
+    return learner, results
+
+def _copy_to_local_buffer(buffer: SharedReplayBuffer):
+    """Copy the shared buffer into a regular ReplayBuffer before unlinking it."""
+    local = ReplayBuffer(buffer.capacity, state_shape=buffer.state_shape, state_dtype=buffer.state_dtype)
+    local.states[:] = buffer.states
+    local.next_states[:] = buffer.next_states
+    local.actions[:] = buffer.actions
+    local.rewards[:] = buffer.rewards
+    local.dones[:] = buffer.dones
+    local.position = buffer.position
+    local.size = buffer.size
+    return local
@@ -2,8 +2,9 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
-from collections import deque
 import random
+import time
+from model.replay_buffer import ReplayBuffer, NStepBuffer
 
 class DQN(nn.Module):
     def __init__(self, state_size, action_size):
@@ -18,6 +19,22 @@ class DQN(nn.Module):
         x = self.relu(self.fc2(x))
         return self.fc3(x)
 
+class DuelingDQN(nn.Module):
+    def __init__(self, state_size, action_size):
+        super(DuelingDQN, self).__init__()
+        self.fc1 = nn.Linear(state_size, 128)
+        self.fc2 = nn.Linear(128, 128)
+        self.value = nn.Linear(128, 1)
+        self.advantage = nn.Linear(128, action_size)
+        self.relu = nn.ReLU()
+        
+    def forward(self, x):
+        x = self.relu(self.fc1(x))
+        x = self.relu(self.fc2(x))
+        # Q(s, a) = V(s) + A(s, a) - mean_a A(s, a)
+        advantage = self.advantage(x)
+        return self.value(x) + advantage - advantage.mean(dim=-1, keepdim=True)
+
 class VRPEnvironment:
     def __init__(self, num_destinations=4):  # Changed from 7 to 4
         self.num_destinations = num_destinations
@@ -137,68 +154,136 @@ class VRPEnvironment:
         return self.current_state
 
 class DQNAgent:
-    def __init__(self, state_size, action_size, num_destinations=4):  # Changed from 7 to 4
+    def __init__(self, state_size, action_size, num_destinations=4,  # Changed from 7 to 4
+                 double_dqn=False, dueling_dqn=False, n_step=1, transition_writer=None):
         self.state_size = state_size
         self.action_size = action_size
         self.num_destinations = num_destinations
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(2000, state_shape=(state_size,))
         self.gamma = 0.95    # discount rate
         self.epsilon = 1.0   # exploration rate
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.learning_rate = 0.001
+        
+        # Advanced DQN variants (advanced_dqn di config.yaml)
+        self.double_dqn = double_dqn
+        self.dueling_dqn = dueling_dqn
+        self.n_step_buffer = NStepBuffer(n_step, self.gamma)
+        self.bootstrap_gamma = self.gamma ** self.n_step_buffer.n_step
+        # Seconds spent sampling / updating in the last replay() call
+        self.replay_timings = {'sample': 0.0, 'update': 0.0}
+        # Optional TransitionWriter (offline_data di config.yaml)
+        self.transition_writer = transition_writer
+        
         self.model = self._build_model()
         self.target_model = self._build_model()
         self.update_target_model()
+        self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        self.criterion = nn.MSELoss()
+        
+        # Flat action index = vehicle_id * num_destinations + destination_id
+        self.num_vehicles = max(action_size // num_destinations, 1)
+        
+        # Preallocated input and cached valid-action indices for act()
+        self._state_tensor = torch.zeros(1, state_size)
+        self._action_index_cache = {}
+    
+    def _build_model(self):
+        if self.dueling_dqn:
+            return DuelingDQN(self.state_size, self.action_size)
+        return DQN(self.state_size, self.action_size)
+    
+    def update_target_model(self):
+        self.target_model.load_state_dict(self.model.state_dict())
         
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        # Store (vehicle_id, destination_id) as a flat action index
+        vehicle_id, destination_id = action
+        action_idx = vehicle_id * self.num_destinations + destination_id
+        if self.transition_writer is not None:
+            self.transition_writer.add(state, action_idx, reward, next_state, done)
+        for transition in self.n_step_buffer.push(state, action_idx, reward, next_state, done):
+            self.memory.add(*transition)
         
     def act(self, state, valid_actions):
         if np.random.random() <= self.epsilon:
             return random.choice(valid_actions)
         
-        # Convert state to tensor and get Q-values
-        state_tensor = torch.FloatTensor(state).unsqueeze(0)  # Add batch dimension
-        act_values = self.model(state_tensor).squeeze(0)  # Remove batch dimension
-        
-        # Convert action tuples to indices
-        action_indices = []
-        for vehicle_id, destination_id in valid_actions:
-            action_idx = vehicle_id * self.num_destinations + destination_id
-            action_indices.append(action_idx)
-        
-        # Get Q-values for valid actions
-        valid_q_values = [act_values[idx].item() for idx in action_indices]
+        # Copy state into the preallocated tensor and get Q-values
+        self._state_tensor[0] = torch.from_numpy(np.asarray(state, dtype=np.float32))
+        with torch.inference_mode():
+            act_values = self.model(self._state_tensor)[0]
+            
+            # Q-values for valid actions only
+            valid_q_values = act_values[self._action_indices(valid_actions)]
+            best_idx = int(torch.argmax(valid_q_values))
         
         # Return the action with highest Q-value
-        best_idx = np.argmax(valid_q_values)
         return valid_actions[best_idx]
+    
+    def _action_indices(self, valid_actions):
+        # Convert action tuples to indices (cached per set of valid actions)
+        key = tuple(valid_actions)
+        indices = self._action_index_cache.get(key)
+        if indices is None:
+            if len(self._action_index_cache) >= 4096:
+                self._action_index_cache.clear()
+            indices = torch.tensor([vehicle_id * self.num_destinations + destination_id
+                                    for vehicle_id, destination_id in valid_actions], dtype=torch.long)
+            self._action_index_cache[key] = indices
+        return indices
+        
+    def _next_action_mask(self, next_states):
+        # Valid (vehicle, destination) pairs: destinations still unvisited in the
+        # next state (last num_destinations entries of the state), for every vehicle
+        unvisited = next_states[:, -self.num_destinations:] > 0.5
+        return unvisited.repeat(1, self.num_vehicles)
         
     def replay(self, batch_size):
         if len(self.memory) < batch_size:
+            self.replay_timings['sample'] = self.replay_timings['update'] = 0.0
             return
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            # Convert action tuple to index
-            vehicle_id, destination_id = action
-            action_idx = vehicle_id * self.num_destinations + destination_id
-            
-            target = reward
-            if not done:
-                next_state_tensor = torch.FloatTensor(next_state).unsqueeze(0)
-                target = reward + self.gamma * torch.max(self.target_model(next_state_tensor)).item()
-            
-            state_tensor = torch.FloatTensor(state).unsqueeze(0)
-            target_f = self.model(state_tensor).squeeze(0)
-            target_f[action_idx] = target
-            
-            self.optimizer.zero_grad()
-            loss = nn.MSELoss()(self.model(state_tensor).squeeze(0), target_f)
-            loss.backward()
-            self.optimizer.step()
+        start = time.perf_counter()
+        batch = self.memory.sample(batch_size)
+        states, actions, rewards, next_states, dones = (torch.from_numpy(data) for data in batch)
+        sampled = time.perf_counter()
+        
+        # Targets: one target-network pass, max over valid actions only
+        with torch.no_grad():
+            next_q_values = self.target_model(next_states)
+            next_mask = self._next_action_mask(next_states)
+            if self.double_dqn:
+                # Online network picks the action, target network scores it
+                online_q_values = self.model(next_states).masked_fill(~next_mask, float('-inf'))
+                next_actions = online_q_values.argmax(1, keepdim=True)
+                next_values = next_q_values.gather(1, next_actions).squeeze(1)
+            else:
+                next_values = next_q_values.masked_fill(~next_mask, float('-inf')).max(1)[0]
+            # No valid action left: nothing to bootstrap from
+            next_values = torch.where(next_mask.any(1), next_values, torch.zeros_like(next_values))
+            targets = rewards + self.bootstrap_gamma * next_values * ~dones
+        
+        # One forward and one backward pass for the whole minibatch
+        q_values = self.model(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+        loss = self.criterion(q_values, targets)
+        
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
+        loss = loss.item()
+        self.replay_timings['sample'] = sampled - start
+        self.replay_timings['update'] = time.perf_counter() - sampled
+        return loss
+            
+    def get_weights(self):
+        return {name: tensor.detach().cpu().numpy() for name, tensor in self.model.state_dict().items()}
+    
+    def set_weights(self, weights):
+        self.model.load_state_dict({name: torch.from_numpy(array) for name, array in weights.items()})
             
     def load(self, name):
         self.model.load_state_dict(torch.load(name))
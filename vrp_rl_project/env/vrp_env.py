@@ -0,0 +1,221 @@
+import gym
+import numpy as np
+from gym import spaces
+from typing import Dict, Tuple
+import pandas as pd
+
+from utils import calculate_distance
+
+class VRPDynamicEnv(gym.Env):
+    """
+    Dynamic VRP environment with multiple vehicles, capacity and time windows.
+
+    Row 0 of customers_df is the depot; actions are row indices. Vehicles
+    leave the depot one after another: when the chosen customer does not fit
+    in the remaining capacity, the current vehicle returns to the depot and
+    the next one serves it. Time windows are soft: a vehicle arriving early
+    waits, arriving late is penalized.
+
+    All customer data is converted to NumPy arrays and the distance matrix
+    is computed once, so step() is O(1) apart from copying the observation.
+
+    Observation: [current_location, remaining_capacity, current_time,
+                  weather_factor, traffic_factor, unvisited flags (n)]
+    """
+
+    # Reward shaping
+    distance_penalty = 0.01  # per km
+    service_bonus = 10.0  # per customer served
+    completion_bonus = 50.0
+    lateness_penalty = 5.0  # per hour late
+    invalid_action_penalty = -1000.0
+
+    def __init__(self, customers_df: pd.DataFrame, n_vehicles: int = 1,
+                 max_capacity: float = 6000, speed: float = 50.0):
+        """
+        Initialize environment.
+
+        Args:
+            customers_df: Depot (row 0) and customers with latitude, longitude,
+                demand and optionally time_window_start, time_window_end and
+                service_time (hours)
+            n_vehicles: Number of vehicles available
+            max_capacity: Capacity of each vehicle (kg)
+            speed: Average speed (km/h) before weather/traffic factors
+        """
+        super(VRPDynamicEnv, self).__init__()
+
+        self.customers_df = customers_df
+        self.n_customers = len(customers_df)
+        self.n_vehicles = max(int(n_vehicles), 1)
+        self.max_capacity = max_capacity
+        self.speed = speed
+
+        # Customer attributes as plain arrays
+        self.latitude = customers_df['latitude'].to_numpy(dtype=np.float64)
+        self.longitude = customers_df['longitude'].to_numpy(dtype=np.float64)
+        self.demand = customers_df['demand'].to_numpy(dtype=np.float64)
+        self.time_window_start = self._column(customers_df, 'time_window_start', 0.0)
+        self.time_window_end = self._column(customers_df, 'time_window_end', np.inf)
+        self.service_time = self._column(customers_df, 'service_time', 0.0)
+
+        # Haversine distance (km) between every pair of locations
+        self.distance_matrix = calculate_distance(
+            self.latitude[:, None], self.longitude[:, None],
+            self.latitude[None, :], self.longitude[None, :]
+        )
+
+        # Vehicles leave the depot when its time window opens
+        self.start_time = float(self.time_window_start[0])
+
+        # Dynamic conditions (multipliers on travel time)
+        self.weather_factor = 1.0
+        self.traffic_factor = 1.0
+
+        self.action_space = spaces.Discrete(self.n_customers)
+        finite_end = self.time_window_end[np.isfinite(self.time_window_end)]
+        max_time = max(24.0, float(finite_end.max()) if len(finite_end) else 0.0)
+        self.observation_space = spaces.Box(
+            low=np.array([0, 0, 0, 0, 0] + [0] * self.n_customers),
+            high=np.array([self.n_customers, self.max_capacity, max_time, 2, 2] + [1] * self.n_customers),
+            dtype=np.float32
+        )
+
+        self.visited = np.zeros(self.n_customers, dtype=bool)
+        self._state = np.zeros(5 + self.n_customers, dtype=np.float32)
+
+        self.reset()
+
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+        if name in df.columns:
+            return df[name].to_numpy(dtype=np.float64)
+        return np.full(len(df), default, dtype=np.float64)
+
+    def reset(self) -> np.ndarray:
+        """Reset the environment to initial state."""
+        self.current_vehicle = 0
+        self.current_location = 0  # Start at depot
+        self.remaining_capacity = self.max_capacity
+        self.current_time = self.start_time
+        self.total_distance = 0.0
+        self.total_time = 0.0
+        self.time_window_violations = 0
+
+        # Depot is never a delivery target
+        self.visited[:] = False
+        self.visited[0] = True
+        self.visited_customers = {0}
+
+        self._state[0] = 0
+        self._state[1] = self.remaining_capacity
+        self._state[2] = self.current_time
+        self._state[3] = self.weather_factor
+        self._state[4] = self.traffic_factor
+        self._state[5:] = ~self.visited
+
+        return self._state.copy()
+
+    def set_conditions(self, weather_factor: float = 1.0, traffic_factor: float = 1.0):
+        """Update weather/traffic multipliers applied to travel times from now on."""
+        self.weather_factor = weather_factor
+        self.traffic_factor = traffic_factor
+        self._state[3] = weather_factor
+        self._state[4] = traffic_factor
+
+    def action_masks(self) -> np.ndarray:
+        """
+        Valid actions: unvisited customers that fit in the current vehicle, or
+        in an empty one if another vehicle is still available.
+        """
+        capacity = self.remaining_capacity
+        if self.current_vehicle + 1 < self.n_vehicles:
+            capacity = self.max_capacity
+        return ~self.visited & (self.demand <= capacity)
+
+    def _info(self) -> Dict:
+        return {
+            'total_distance': float(self.total_distance),
+            'total_time': float(self.total_time),
+            'visited_customers': len(self.visited_customers) - 1,
+            'vehicles_used': self.current_vehicle + 1,
+            'time_window_violations': self.time_window_violations
+        }
+
+    def _invalid(self, error: str) -> Tuple[np.ndarray, float, bool, Dict]:
+        info = self._info()
+        info['error'] = error
+        return self._state.copy(), self.invalid_action_penalty, True, info
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, Dict]:
+        """Take a step in the environment."""
+        action = int(action)
+
+        if self.visited[action]:
+            return self._invalid('Customer already visited')
+
+        demand = self.demand[action]
+        distance = 0.0
+
+        # Capacity: switch to the next vehicle, or fail if none is left
+        if demand > self.remaining_capacity:
+            if demand > self.max_capacity or self.current_vehicle + 1 >= self.n_vehicles:
+                return self._invalid('Capacity exceeded')
+
+            return_distance = self.distance_matrix[self.current_location, 0]
+            self.total_distance += return_distance
+            self.total_time += return_distance / self.speed * self.weather_factor * self.traffic_factor
+            distance += return_distance
+
+            self.current_vehicle += 1
+            self.current_location = 0
+            self.remaining_capacity = self.max_capacity
+            self.current_time = self.start_time
+
+        leg_distance = self.distance_matrix[self.current_location, action]
+        travel_time = leg_distance / self.speed * self.weather_factor * self.traffic_factor
+        arrival = self.current_time + travel_time
+
+        # Soft time window: wait if early, penalize lateness
+        waiting_time = max(self.time_window_start[action] - arrival, 0.0)
+        arrival += waiting_time
+        lateness = max(arrival - self.time_window_end[action], 0.0)
+        if lateness > 0:
+            self.time_window_violations += 1
+
+        service_time = self.service_time[action]
+        self.current_location = action
+        self.remaining_capacity -= demand
+        self.current_time = arrival + service_time
+        self.total_distance += leg_distance
+        self.total_time += travel_time + waiting_time + service_time
+        distance += leg_distance
+
+        self.visited[action] = True
+        self.visited_customers.add(action)
+
+        self._state[0] = action
+        self._state[1] = self.remaining_capacity
+        self._state[2] = self.current_time
+        self._state[5 + action] = 0.0
+
+        done = len(self.visited_customers) == self.n_customers
+
+        reward = (-distance * self.distance_penalty + self.service_bonus
+                  - lateness * self.lateness_penalty)
+        if done:
+            reward += self.completion_bonus
+
+        info = self._info()
+        if done and self.time_window_violations > 0:
+            info['error'] = 'Time window violated'
+
+        return self._state.copy(), reward, done, info
+
+    def render(self, mode='human'):
+        """Render the environment."""
+        print(f"Vehicle: {self.current_vehicle + 1}/{self.n_vehicles}")
+        print(f"Location: {self.current_location}")
+        print(f"Visited: {sorted(self.visited_customers - {0})}")
+        print(f"Distance: {self.total_distance:.2f} km")
+        print(f"Time: {self.total_time:.2f} h")
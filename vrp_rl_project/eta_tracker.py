@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+ETA Tracker untuk DQN VRP
+Perhitungan ulang ETA secara inkremental saat kendaraan bergerak di rutenya
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+class VehicleRouteState:
+    """State rute satu kendaraan: waktu tempuh per segmen dan prefix sum-nya"""
+
+    def __init__(self, segment_times: List[float], start_time: datetime,
+                 distances: Optional[List[float]] = None, weather_factor: float = 1.0):
+        self.segment_times = np.asarray(segment_times, dtype=float).copy()
+        # prefix_times[k] = total waktu tempuh segmen 0..k (jam)
+        self.prefix_times = np.cumsum(self.segment_times)
+        self.distances = None if distances is None else np.asarray(distances, dtype=float).copy()
+        self.weather_factor = weather_factor
+
+        # Titik acuan: waktu (nyata) saat segmen ke-(completed_segments - 1) selesai
+        self.anchor_time = start_time
+        self.completed_segments = 0
+
+    @property
+    def total_segments(self) -> int:
+        return len(self.segment_times)
+
+    def _elapsed_at_anchor(self) -> float:
+        """Prefix waktu tempuh rencana sampai titik acuan"""
+        if self.completed_segments == 0:
+            return 0.0
+        return float(self.prefix_times[self.completed_segments - 1])
+
+    def time_until(self, segment_index: int) -> float:
+        """Sisa waktu (jam) dari titik acuan sampai akhir segmen segment_index"""
+        return float(self.prefix_times[segment_index]) - self._elapsed_at_anchor()
+
+    def eta(self, segment_index: int = -1) -> datetime:
+        """Perkiraan waktu tiba di akhir segmen (default: segmen terakhir)"""
+        if segment_index < 0:
+            segment_index += self.total_segments
+        if self.total_segments == 0 or segment_index < self.completed_segments:
+            return self.anchor_time
+        return self.anchor_time + timedelta(hours=self.time_until(segment_index))
+
+    def set_segment_time(self, segment_index: int, travel_time: float):
+        """Ganti waktu tempuh satu segmen; hanya suffix prefix sum yang diperbarui"""
+        delta = travel_time - self.segment_times[segment_index]
+        if delta == 0:
+            return
+        self.segment_times[segment_index] = travel_time
+        self.prefix_times[segment_index:] += delta
+
+    def set_segment_times(self, segment_times: List[float]) -> np.ndarray:
+        """
+        Ganti waktu tempuh semua segmen sekaligus; hanya segmen yang berubah
+        yang ditulis dan prefix sum dihitung ulang mulai segmen berubah pertama
+
+        Returns:
+            Indeks segmen yang berubah
+        """
+        segment_times = np.asarray(segment_times, dtype=float)
+        changed = np.flatnonzero(segment_times != self.segment_times)
+        if len(changed) == 0:
+            return changed
+
+        first = changed[0]
+        self.segment_times[changed] = segment_times[changed]
+        offset = self.prefix_times[first - 1] if first > 0 else 0.0
+        self.prefix_times[first:] = offset + np.cumsum(self.segment_times[first:])
+        return changed
+
+    def set_progress(self, completed_segments: int, timestamp: datetime):
+        """Tandai segmen yang sudah selesai dan waktu nyata penyelesaiannya"""
+        self.completed_segments = max(0, min(completed_segments, self.total_segments))
+        self.anchor_time = timestamp
+
+class RouteETATracker:
+    """Menyimpan state rute per kendaraan agar ETA tidak perlu dihitung ulang penuh"""
+
+    def __init__(self, traffic_conditions: Optional[Dict] = None, base_speed: float = 30):
+        """Initialize ETA tracker
+
+        Args:
+            traffic_conditions: Mapping level traffic -> {"speed": km/h}, seperti
+                RouteInfoSystem.traffic_conditions (dipakai update_segment_traffic)
+            base_speed: Kecepatan dasar (km/h) yang dipakai RouteInfoSystem
+        """
+        self.traffic_conditions = traffic_conditions or {}
+        self.base_speed = base_speed
+        self.vehicles: Dict = {}
+
+    def register(self, vehicle_id, segment_times: List[float], start_time: datetime = None,
+                 distances: Optional[List[float]] = None, weather_factor: float = 1.0) -> VehicleRouteState:
+        """Daftarkan (atau ganti) rute kendaraan dari waktu tempuh per segmen (jam)"""
+        if start_time is None:
+            start_time = datetime.now()
+        state = VehicleRouteState(segment_times, start_time, distances, weather_factor)
+        self.vehicles[vehicle_id] = state
+        return state
+
+    def register_route_info(self, route_info: Dict, weather_factor: float = 1.0) -> VehicleRouteState:
+        """Daftarkan rute dari output RouteInfoSystem.get_vehicle_route_info"""
+        segments = route_info["route_segments"]
+        return self.register(
+            route_info["vehicle_id"],
+            [segment["travel_time"] for segment in segments],
+            route_info["start_time"],
+            distances=[segment["distance"] for segment in segments],
+            weather_factor=weather_factor
+        )
+
+    def has_vehicle(self, vehicle_id) -> bool:
+        return vehicle_id in self.vehicles
+
+    def get_state(self, vehicle_id) -> VehicleRouteState:
+        if vehicle_id not in self.vehicles:
+            raise KeyError(f"Vehicle {vehicle_id} has no registered route")
+        return self.vehicles[vehicle_id]
+
+    def update_progress(self, vehicle_id, completed_segments: int, timestamp: datetime = None):
+        """Kendaraan telah menyelesaikan completed_segments segmen pada timestamp"""
+        if timestamp is None:
+            timestamp = datetime.now()
+        self.get_state(vehicle_id).set_progress(completed_segments, timestamp)
+
+    def update_segment_time(self, vehicle_id, segment_index: int, travel_time: float):
+        """Perbarui waktu tempuh satu segmen (jam)"""
+        self.get_state(vehicle_id).set_segment_time(segment_index, travel_time)
+
+    def update_segment_times(self, vehicle_id, segment_times: List[float]) -> np.ndarray:
+        """Perbarui waktu tempuh (jam) semua segmen, return indeks segmen yang berubah"""
+        return self.get_state(vehicle_id).set_segment_times(segment_times)
+
+    def update_segment_traffic(self, vehicle_id, segment_index: int, traffic_condition: str):
+        """Perbarui kondisi traffic satu segmen, waktu tempuh dihitung dari jaraknya"""
+        state = self.get_state(vehicle_id)
+        if state.distances is None:
+            raise ValueError(f"Vehicle {vehicle_id} was registered without segment distances")
+
+        traffic_factor = self.traffic_conditions[traffic_condition]["speed"] / 40
+        adjusted_speed = self.base_speed * traffic_factor * state.weather_factor
+        state.set_segment_time(segment_index, state.distances[segment_index] / adjusted_speed)
+
+    def get_eta(self, vehicle_id, segment_index: int = -1) -> datetime:
+        """ETA di akhir segmen tertentu (default: akhir rute)"""
+        return self.get_state(vehicle_id).eta(segment_index)
+
+    def get_remaining_time(self, vehicle_id) -> float:
+        """Sisa waktu tempuh (jam) dari titik acuan sampai akhir rute"""
+        state = self.get_state(vehicle_id)
+        if state.total_segments == 0:
+            return 0.0
+        return state.time_until(state.total_segments - 1)
+
+    def get_status(self, vehicle_id) -> Dict:
+        """Ringkasan progres dan ETA kendaraan"""
+        state = self.get_state(vehicle_id)
+        total = state.total_segments
+        progress = (state.completed_segments / total) * 100 if total > 0 else 0
+
+        return {
+            "vehicle_id": vehicle_id,
+            "progress": round(progress, 1),
+            "completed_segments": state.completed_segments,
+            "total_segments": total,
+            "status": "In Progress" if progress < 100 else "Completed",
+            "remaining_time": round(self.get_remaining_time(vehicle_id), 2),
+            "estimated_completion": state.eta()
+        }
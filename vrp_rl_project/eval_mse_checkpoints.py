@@ -3,24 +3,49 @@
 Compute per-episode Mean Squared Error (MSE) for saved DQN checkpoints.
 
 This script loads the DQN agent and environment per project config, builds a fixed
-validation set of transitions, and evaluates TD-target MSE for checkpoints:
-episodes [0,100,200,300,400,500,600,700,800,900] and final (1000 if available).
+validation set of transitions, and evaluates TD-target MSE for every 'dqn' checkpoint
+in the checkpoint registry (model/checkpoints/registry.json) with a matching
+state/action size; the final model is labeled episode 1000. The MSE is recorded
+in the registry as the 'td_mse' metric.
 
-Output: prints a compact table and writes CSV to data/mse_checkpoints.csv
+The validation set is cached in data/validation/ as an .npz file keyed by the
+environment config, customer data, rollout settings and seed, so every run (and
+every worker) scores checkpoints on exactly the same transitions without
+re-rolling the environment. Checkpoints are evaluated in a process pool; each
+agent is built from the config recorded for the checkpoint in the registry
+(config.yaml for legacy entries without one), once per distinct config and
+worker, and only its weights are swapped per checkpoint.
+
+Output: prints a compact table and merges results into data/mse_checkpoints.csv
+(checkpoints already scored on the same validation set are skipped unless --force)
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
 import os
 import numpy as np
 import pandas as pd
 
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 from utils import load_config
 from env.vrp_env import VRPDynamicEnv
 from model.dqn_model import DQNAgent
+from model.checkpoint_registry import CheckpointRegistry, load_into_agent
+from distributed_training import ACTOR_THREAD_ENV
+
+VALIDATION_DIR = os.path.join('data', 'validation')
+OUTPUT_PATH = os.path.join('data', 'mse_checkpoints.csv')
+
+# Set per worker process by _init_worker; agents are keyed by their config
+_worker_agents: Dict[str, DQNAgent] = {}
+_worker_transitions: Optional[Dict[str, np.ndarray]] = None
 
 
-def build_env_and_agent() -> Tuple[VRPDynamicEnv, DQNAgent, dict]:
+def build_env() -> Tuple[VRPDynamicEnv, dict]:
     config = load_config()
 
     # Load customers data (use simulated if available)
@@ -31,16 +56,11 @@ def build_env_and_agent() -> Tuple[VRPDynamicEnv, DQNAgent, dict]:
     customers_df = pd.read_csv(data_path)
 
     env = VRPDynamicEnv(customers_df, config['environment']['max_vehicles'])
-    agent = DQNAgent(
-        state_size=env.observation_space.shape[0],
-        action_size=env.action_space.n,
-        config=config,
-    )
 
-    return env, agent, config
+    return env, config
 
 
-def collect_validation_transitions(env: VRPDynamicEnv, num_episodes: int = 5, max_steps: int = 150, seed: int = 42):
+def collect_validation_transitions(env: VRPDynamicEnv, num_episodes: int = 5, max_steps: int = 150, seed: int = 42) -> Dict[str, np.ndarray]:
     rng = np.random.default_rng(seed)
     transitions: List[Tuple[np.ndarray, int, float, np.ndarray, bool]] = []
 
@@ -57,18 +77,65 @@ def collect_validation_transitions(env: VRPDynamicEnv, num_episodes: int = 5, ma
             state = next_state
             if done:
                 break
-    return transitions
 
+    state_size = env.observation_space.shape[0]
+    return {
+        'states': np.stack([t[0] for t in transitions]) if transitions else np.zeros((0, state_size), np.float32),
+        'actions': np.array([t[1] for t in transitions], dtype=np.int64),
+        'rewards': np.array([t[2] for t in transitions], dtype=np.float32),
+        'next_states': np.stack([t[3] for t in transitions]) if transitions else np.zeros((0, state_size), np.float32),
+        'dones': np.array([t[4] for t in transitions], dtype=bool),
+    }
+
+
+def validation_key(env: VRPDynamicEnv, config: dict, num_episodes: int, max_steps: int, seed: int) -> str:
+    """Hash of everything that determines the validation rollouts."""
+    spec = {
+        'environment': config['environment'],
+        'n_vehicles': env.n_vehicles,
+        'max_capacity': env.max_capacity,
+        'num_episodes': num_episodes,
+        'max_steps': max_steps,
+        'seed': seed,
+    }
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(env.customers_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_validation_set(env: VRPDynamicEnv, config: dict, num_episodes: int = 8, max_steps: int = 150,
+                        seed: int = 42) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Load the cached validation set for this env/config/seed, collecting and
+    saving it on first use.
+
+    Returns:
+        (path of the .npz file, transition arrays)
+    """
+    key = validation_key(env, config, num_episodes, max_steps, seed)
+    path = os.path.join(VALIDATION_DIR, f'validation_{key}.npz')
 
-def compute_td_mse(agent: DQNAgent, transitions: List[Tuple[np.ndarray, int, float, np.ndarray, bool]], gamma: float) -> float:
-    if not transitions:
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return path, {name: data[name] for name in data.files}
+
+    transitions = collect_validation_transitions(env, num_episodes=num_episodes, max_steps=max_steps, seed=seed)
+    os.makedirs(VALIDATION_DIR, exist_ok=True)
+    tmp_path = path[:-len('.npz')] + '.tmp.npz'
+    np.savez(tmp_path, **transitions)
+    os.replace(tmp_path, path)
+    return path, transitions
+
+
+def compute_td_mse(agent: DQNAgent, transitions: Dict[str, np.ndarray], gamma: float) -> float:
+    if len(transitions['actions']) == 0:
         return float('nan')
 
-    states = np.stack([t[0] for t in transitions], axis=0)
-    actions = np.array([t[1] for t in transitions], dtype=np.int64)
-    rewards = np.array([t[2] for t in transitions], dtype=np.float32)
-    next_states = np.stack([t[3] for t in transitions], axis=0)
-    dones = np.array([t[4] for t in transitions], dtype=bool)
+    states = transitions['states']
+    actions = transitions['actions']
+    rewards = transitions['rewards']
+    next_states = transitions['next_states']
+    dones = transitions['dones']
 
     # Predict Q(s,·) and Q_target(s',·)
     q_states = agent.model.predict(states, verbose=0)
@@ -84,42 +151,146 @@ def compute_td_mse(agent: DQNAgent, transitions: List[Tuple[np.ndarray, int, flo
     return mse
 
 
+def _init_worker(validation_path: str):
+    """Load the shared validation set once per worker process."""
+    global _worker_transitions
+
+    _worker_agents.clear()
+    with np.load(validation_path) as data:
+        _worker_transitions = {name: data[name] for name in data.files}
+
+
+def _agent_for(config: dict, state_size: int, action_size: int) -> DQNAgent:
+    """Agent built from config, reused for every checkpoint trained with the same config."""
+    key = json.dumps(config, sort_keys=True, default=str)
+    if key not in _worker_agents:
+        _worker_agents[key] = DQNAgent(state_size=state_size, action_size=action_size, config=config)
+    return _worker_agents[key]
+
+
+def _evaluate_checkpoint(path: str, config: dict, state_size: int,
+                         action_size: int) -> Tuple[str, float, Optional[str]]:
+    """Worker task: (checkpoint path, TD MSE, error message)."""
+    agent = _agent_for(config, state_size, action_size)
+    try:
+        load_into_agent(agent, path)
+    except ValueError as e:
+        # Architecture differs from its config (legacy checkpoint scored with config.yaml)
+        return path, float('nan'), str(e)
+    return path, compute_td_mse(agent, _worker_transitions, config['model']['gamma']), None
+
+
+def evaluate_checkpoints(checkpoints: Dict[str, dict], state_size: int, action_size: int,
+                         validation_path: str, workers: int = 1) -> Dict[str, Tuple[float, Optional[str]]]:
+    """
+    Score checkpoints on the cached validation set, in a process pool when
+    workers > 1.
+
+    Args:
+        checkpoints: Mapping of checkpoint path to the config it was trained with
+
+    Returns:
+        Mapping of checkpoint path to (TD MSE, error message)
+    """
+    results = {}
+    if not checkpoints:
+        return results
+
+    if workers <= 1:
+        _init_worker(validation_path)
+        for path, config in checkpoints.items():
+            path, mse, error = _evaluate_checkpoint(path, config, state_size, action_size)
+            results[path] = (mse, error)
+        return results
+
+    # Workers inherit the environment at spawn: one compute thread each
+    saved_env = {key: os.environ.get(key) for key in ACTOR_THREAD_ENV}
+    os.environ.update(ACTOR_THREAD_ENV)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(validation_path,)) as pool:
+            futures = [pool.submit(_evaluate_checkpoint, path, config, state_size, action_size)
+                       for path, config in checkpoints.items()]
+            for future in as_completed(futures):
+                path, mse, error = future.result()
+                results[path] = (mse, error)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    return results
+
+
 def main():
-    env, agent, config = build_env_and_agent()
-    transitions = collect_validation_transitions(env, num_episodes=8, max_steps=config['training']['max_steps'])
+    parser = argparse.ArgumentParser(description='TD-target MSE per DQN checkpoint')
+    parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) - 1, 1),
+                        help='Number of evaluation processes')
+    parser.add_argument('--episodes', type=int, default=8,
+                        help='Validation rollouts (part of the validation set key)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Validation rollout seed (part of the validation set key)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-evaluate checkpoints already in the CSV for this validation set')
+    args = parser.parse_args()
 
-    # Checkpoints to evaluate
-    ckpt_dir = os.path.join('model', 'checkpoints')
-    episodes = [0, 100, 200, 300, 400, 500, 600, 700, 800, 900]
+    env, config = build_env()
+    state_size = env.observation_space.shape[0]
+    action_size = env.action_space.n
+    validation_path, transitions = load_validation_set(
+        env, config, num_episodes=args.episodes, max_steps=config['training']['max_steps'], seed=args.seed
+    )
+    validation_set = os.path.basename(validation_path)
+    print(f"Validation set: {validation_path} ({len(transitions['actions'])} transitions)")
 
-    rows = []
+    # Checkpoints to evaluate: every registered 'dqn' checkpoint matching this environment
+    registry = CheckpointRegistry()
+    final_path = os.path.join('model', 'dqn_final.weights.h5')
+    if os.path.exists(final_path) and final_path not in registry:
+        registry.register(final_path, run='dqn', episode=1000, save=False)
+    registry.scan()
+    checkpoints = {
+        checkpoint['path']: checkpoint
+        for checkpoint in registry.list('dqn', state_size=state_size, action_size=action_size)
+        if os.path.exists(checkpoint['path'])
+    }
+
+    # Previous results; rows for other validation sets are kept as they are
+    previous = pd.read_csv(OUTPUT_PATH) if os.path.exists(OUTPUT_PATH) else pd.DataFrame()
+    if 'checkpoint' not in previous.columns:
+        previous = pd.DataFrame(columns=['episode', 'mse', 'checkpoint', 'validation_set'])
+    done = set(previous.loc[previous['validation_set'] == validation_set, 'checkpoint'])
+    pending = [path for path in checkpoints if args.force or path not in done]
+    print(f"Evaluating {len(pending)} of {len(checkpoints)} checkpoints with {args.workers} worker(s)")
 
-    for ep in episodes:
-        ckpt_path = os.path.join(ckpt_dir, f'dqn_episode_{ep}.weights.h5')
-        if not os.path.exists(ckpt_path):
+    # Each checkpoint is scored with the network it was trained with
+    pending = {path: registry.config(path) or config for path in pending}
+    results = evaluate_checkpoints(pending, state_size, action_size, validation_path, args.workers)
+
+    rows = []
+    for path, (mse, error) in results.items():
+        if error is not None:
+            print(f"Skipping {path}: {error}")
             continue
-        agent.load(ckpt_path)
-        mse = compute_td_mse(agent, transitions, gamma=config['model']['gamma'])
-        rows.append({'episode': ep, 'mse': mse})
+        registry.update_metrics(path, save=False, td_mse=mse)
+        rows.append({'episode': checkpoints[path]['episode'], 'mse': mse,
+                     'checkpoint': path, 'validation_set': validation_set})
 
-    # Evaluate final model if present (label as episode 1000)
-    final_path = os.path.join('model', 'dqn_final.weights.h5')
-    if os.path.exists(final_path):
-        agent.load(final_path)
-        mse = compute_td_mse(agent, transitions, gamma=config['model']['gamma'])
-        rows.append({'episode': 1000, 'mse': mse})
+    registry.save()
 
-    # Save and print
-    df = pd.DataFrame(rows).sort_values('episode')
-    out_path = os.path.join('data', 'mse_checkpoints.csv')
-    df.to_csv(out_path, index=False)
+    # Merge and save (new results replace old ones for the same checkpoint/validation set)
+    df = pd.concat([previous, pd.DataFrame(rows, columns=previous.columns)], ignore_index=True)
+    df = df.drop_duplicates(subset=['checkpoint', 'validation_set'], keep='last').sort_values(['validation_set', 'episode'])
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    df.to_csv(OUTPUT_PATH, index=False)
 
     print('\nMSE per Checkpoint (TD target):')
-    for _, r in df.iterrows():
+    for _, r in df[df['validation_set'] == validation_set].iterrows():
         print(f"Episode {int(r['episode']):4d} | MSE: {r['mse']:.6f}")
-    print(f"\nSaved to: {out_path}")
+    print(f"\nSaved to: {OUTPUT_PATH}")
 
 
 if __name__ == '__main__':
     main()
-
@@ -4,60 +4,17 @@ Script evaluasi DQN VRP menggunakan data real PT. Sanghiang Perkasa (4 destinasi
 Menghitung metrik evaluasi yang diminta: distance, time, completion rate, violations, utilization, efficiency.
 """
 
+import argparse
 import os
 from typing import Dict, List, Tuple
 import numpy as np
 import pandas as pd
 
-from utils import load_config, calculate_distance
+from utils import load_config
 from env.vrp_env import VRPDynamicEnv
 from model.dqn_model import DQNAgent
-
-
-def _nearest_neighbor_baseline_real(customers_df: pd.DataFrame) -> Tuple[float, float]:
-    """
-    Compute nearest-neighbor baseline untuk data real (4 destinasi).
-    
-    Returns:
-        total_distance_km, total_time_hours
-    """
-    if len(customers_df) <= 1:
-        return 0.0, 0.0
-
-    unvisited = set(range(1, len(customers_df)))  # Skip depot (index 0)
-    current = 0
-    total_distance = 0.0
-    total_time = 0.0
-    base_speed_kmh = 50.0  # same as used in the env
-
-    while unvisited:
-        curr_lat = customers_df.iloc[current]['latitude']
-        curr_lon = customers_df.iloc[current]['longitude']
-
-        # pick nearest by Haversine distance
-        nearest = None
-        nearest_dist = float('inf')
-        for j in list(unvisited):
-            dist = calculate_distance(
-                curr_lat,
-                curr_lon,
-                customers_df.iloc[j]['latitude'],
-                customers_df.iloc[j]['longitude'],
-            )
-            if dist < nearest_dist:
-                nearest_dist = dist
-                nearest = j
-
-        # move to nearest
-        assert nearest is not None
-        total_distance += nearest_dist
-        service_time = float(customers_df.iloc[nearest]['service_time'])
-        travel_time = nearest_dist / base_speed_kmh
-        total_time += travel_time + service_time
-        current = nearest
-        unvisited.remove(nearest)
-
-    return total_distance, total_time
+from heuristics import heuristic_comparison, nearest_neighbor_baseline, run_baselines
+from route_search import DECODING_MODES, search_routes
 
 
 def analyze_convergence(rewards: List[float], epsilons: List[float], window: int = 50) -> Dict:
@@ -146,9 +103,16 @@ def evaluate_agent_real(
     config: Dict,
     episodes: int = 50,
     checkpoint_path: str = "model/dqn_real_final.weights.h5",
+    decoding: str = "greedy",
+    width: int = 16,
+    time_budget_ms: float = None,
 ) -> Dict:
     """
     Run greedy evaluation untuk data real dan compute metrik yang diminta.
+
+    Dengan decoding 'sample' (best-of-K) atau 'beam', urutan kunjungan tiap
+    episode dicari dulu dengan route_search (banyak rute parsial per forward
+    pass, dalam time_budget_ms), lalu dijalankan di env.
     """
     env = VRPDynamicEnv(customers_df)
 
@@ -168,10 +132,12 @@ def evaluate_agent_real(
     # Force greedy for evaluation
     agent.epsilon = 0.0
 
-    baseline_distance_km, baseline_time_h = _nearest_neighbor_baseline_real(customers_df)
+    baseline_distance_km, baseline_time_h = nearest_neighbor_baseline(customers_df)
+    heuristic_baselines = run_baselines(customers_df, env.max_capacity, distances=env.distance_matrix)
 
     print(f"\n🚚 Evaluasi DQN VRP - Data Real PT. Sanghiang Perkasa")
     print(f"📊 Episodes: {episodes}")
+    print(f"🧭 Decoding: {decoding}" + (f" (width {width})" if decoding != "greedy" else ""))
     print(f"🎯 Destinasi: 4 (Bogor, Tangerang, Jakarta, Bekasi)")
     print(f"🏢 Depot: Pulo Gadung, Jakarta Timur")
     print(f"📏 Baseline NN Distance: {baseline_distance_km:.2f} km")
@@ -187,13 +153,24 @@ def evaluate_agent_real(
     utilizations: List[float] = []
 
     for episode in range(episodes):
+        planned = None
+        if decoding != "greedy":
+            planned = iter(search_routes(agent.q_values_batch, env, decoding, width=width,
+                                         time_budget_ms=time_budget_ms, seed=episode)['actions'])
+
         state = env.reset()
         episode_reward = 0.0
+        info = {}
 
         # Run until done
         while True:
             valid_actions = [i for i in range(env.n_customers) if i not in env.visited_customers]
-            action = agent.act(state, valid_actions)
+            if planned is not None:
+                action = next(planned, None)
+                if action is None:
+                    break
+            else:
+                action = agent.act(state, valid_actions)
             next_state, reward, done, info = env.step(action)
             state = next_state
             episode_reward += reward
@@ -267,6 +244,7 @@ def evaluate_agent_real(
 
     results = {
         'episodes': episodes,
+        'decoding': decoding,
         'average_reward': round(avg_reward, 3),
         'average_distance_km': round(avg_distance, 2),
         'average_time_hours': round(avg_time, 2),
@@ -278,6 +256,7 @@ def evaluate_agent_real(
         'baseline_time_hours': round(baseline_time_h, 2),
         'route_efficiency_percent': round(route_efficiency_pct, 1),
         'distance_optimization_percent_vs_baseline': round(distance_optimization_pct, 1),
+        **heuristic_comparison(heuristic_baselines, avg_distance),
         # Convergence and exploration metrics
         'convergence_status': convergence_analysis['convergence_status'],
         'optimal_episode': convergence_analysis['optimal_episode'],
@@ -330,6 +309,10 @@ def print_evaluation_summary(results: Dict):
     print(f"\n📏 BASELINE COMPARISON:")
     print(f"   • Nearest Neighbor Distance: {results['baseline_distance_km']} km")
     print(f"   • Nearest Neighbor Time: {results['baseline_time_hours']} jam")
+    for key, value in results.items():
+        if key.startswith('gap_vs_'):
+            name = key[len('gap_vs_'):-len('_percent')]
+            print(f"   • {name}: {results[f'baseline_{name}_km']} km (DQN gap {value:+.1f}%)")
     
     print(f"\n🔄 CONVERGENCE & EXPLORATION:")
     print(f"   • Convergence Status: {results['convergence_status']}")
@@ -348,6 +331,14 @@ def print_evaluation_summary(results: Dict):
 
 def main():
     """Main function untuk evaluasi data real."""
+    parser = argparse.ArgumentParser(description='Evaluate DQN VRP - Data Real')
+    parser.add_argument('--episodes', type=int, default=50, help='Number of evaluation episodes')
+    parser.add_argument('--decoding', choices=DECODING_MODES, default='greedy',
+                        help='Route decoding: greedy, best-of-K sampling or beam search')
+    parser.add_argument('--width', type=int, default=16, help='Samples / beam width for sample and beam')
+    parser.add_argument('--time-budget-ms', type=float, default=None,
+                        help='Latency budget for sample and beam decoding')
+    args = parser.parse_args()
     
     # Load configuration dan data
     config = load_config()
@@ -362,7 +353,8 @@ def main():
     print(f"✅ Loaded data real: {len(customers_df)} baris (1 depot + 4 destinasi)")
     
     # Run evaluation
-    results = evaluate_agent_real(customers_df, config, episodes=50)
+    results = evaluate_agent_real(customers_df, config, episodes=args.episodes, decoding=args.decoding,
+                                  width=args.width, time_budget_ms=args.time_budget_ms)
     
     # Print summary
     print_evaluation_summary(results)
@@ -5,55 +5,10 @@ from typing import Dict, List, Tuple
 import numpy as np
 import pandas as pd
 
-from utils import load_config, calculate_distance
+from utils import load_config
 from env.vrp_env import VRPDynamicEnv
 from model.dqn_model import DQNAgent
-
-
-def _nearest_neighbor_baseline(customers_df: pd.DataFrame) -> Tuple[float, float]:
-    """
-    Compute a simple nearest-neighbor baseline distance and time starting from index 0 (depot).
-
-    Returns:
-        total_distance_km, total_time_hours
-    """
-    if len(customers_df) <= 1:
-        return 0.0, 0.0
-
-    unvisited = set(range(1, len(customers_df)))
-    current = 0
-    total_distance = 0.0
-    total_time = 0.0
-    base_speed_kmh = 50.0  # same as used in the env
-
-    while unvisited:
-        curr_lat = customers_df.iloc[current]['latitude']
-        curr_lon = customers_df.iloc[current]['longitude']
-
-        # pick nearest by Haversine distance
-        nearest = None
-        nearest_dist = float('inf')
-        for j in list(unvisited):
-            dist = calculate_distance(
-                curr_lat,
-                curr_lon,
-                customers_df.iloc[j]['latitude'],
-                customers_df.iloc[j]['longitude'],
-            )
-            if dist < nearest_dist:
-                nearest_dist = dist
-                nearest = j
-
-        # move to nearest
-        assert nearest is not None
-        total_distance += nearest_dist
-        service_time = float(customers_df.iloc[nearest]['service_time'])
-        travel_time = nearest_dist / base_speed_kmh
-        total_time += travel_time + service_time
-        current = nearest
-        unvisited.remove(nearest)
-
-    return total_distance, total_time
+from heuristics import heuristic_comparison, nearest_neighbor_baseline, run_baselines
 
 
 def evaluate_agent(
@@ -80,7 +35,8 @@ def evaluate_agent(
     # Force greedy for evaluation
     agent.epsilon = 0.0
 
-    baseline_distance_km, baseline_time_h = _nearest_neighbor_baseline(customers_df)
+    baseline_distance_km, baseline_time_h = nearest_neighbor_baseline(customers_df)
+    heuristic_baselines = run_baselines(customers_df, env.max_capacity, distances=env.distance_matrix)
 
     total_rewards: List[float] = []
     total_distances: List[float] = []
@@ -149,6 +105,7 @@ def evaluate_agent(
         'baseline_time_hours': round(baseline_time_h, 2),
         'route_efficiency_percent': round(route_efficiency_pct, 1),
         'distance_optimization_percent_vs_baseline': round(distance_optimization_pct, 1),
+        **heuristic_comparison(heuristic_baselines, avg_distance),
     }
 
     # Save per-episode raw metrics for traceability
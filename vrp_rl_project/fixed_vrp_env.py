@@ -25,10 +25,12 @@ class FixedVRPEnvironment(gym.Env):
     Fixed VRP Environment with simple APIs and stable reward function.
     """
     
-    def __init__(self, customers_df, n_vehicles: int = 1):
+    def __init__(self, customers_df, n_vehicles: int = 1, transition_writer=None):
         super(FixedVRPEnvironment, self).__init__()
         
         self.customers_df = customers_df
+        # Optional TransitionWriter (model/transition_store.py): every step is recorded
+        self.transition_writer = transition_writer
         self.n_customers = len(customers_df)
         self.n_vehicles = n_vehicles
         self.max_capacity = 6000
@@ -37,6 +39,24 @@ class FixedVRPEnvironment(gym.Env):
         self.weather_api = SimpleWeatherAPI()
         self.traffic_api = SimpleTrafficAPI()
         
+        # Customer attributes as plain arrays (no pandas row access in step)
+        self.latitude = customers_df['latitude'].to_numpy(dtype=np.float64)
+        self.longitude = customers_df['longitude'].to_numpy(dtype=np.float64)
+        self.demand = customers_df['demand'].to_numpy(dtype=np.float64)
+        self.service_time = customers_df['service_time'].to_numpy(dtype=np.float64)
+        
+        # Precomputed distances (km) and travel times (h, 50 km/h)
+        self.distance_matrix = np.sqrt(
+            (self.latitude[:, None] - self.latitude[None, :])**2 +
+            (self.longitude[:, None] - self.longitude[None, :])**2
+        ) * 111
+        self.depot_distance = np.sqrt((self.latitude + 6.2088)**2 + (self.longitude - 106.8456)**2) * 111
+        self.travel_time_matrix = self.distance_matrix / 50
+        self.depot_travel_time = self.depot_distance / 50
+        
+        # Observation vector, updated in place by step()
+        self._state = np.zeros(5 + self.n_customers, dtype=np.float32)
+        
         # Define action and observation space
         self.action_space = spaces.Discrete(self.n_customers)
         
@@ -59,39 +79,56 @@ class FixedVRPEnvironment(gym.Env):
         self.total_distance = 0
         self.total_time = 0
         
+        self._state[0] = self.current_location
+        self._state[1] = self.remaining_capacity
+        self._state[2] = self.current_time
+        self._state[3] = self.weather_api.get_weather_impact(0, 0)  # Simple
+        self._state[4] = self.traffic_api.get_traffic_impact((0, 0), (0, 0))  # Simple
+        self._state[5:] = 1.0
+        
         return self._get_state()
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, Dict]:
-        """Take a step in the environment."""
-        
+        """Take a step in the environment (recorded when a transition writer is set)."""
+        if self.transition_writer is None:
+            return self._step(action)
+        
+        state = self._get_state()
+        next_state, reward, done, info = self._step(action)
+        self.transition_writer.add(state, action, reward, next_state, done)
+        return next_state, reward, done, info
+
+    def _step(self, action: int) -> Tuple[np.ndarray, float, bool, Dict]:
         if action in self.visited_customers:
             return self._get_state(), -1000, True, {'error': 'Customer already visited'}
             
-        customer = self.customers_df.iloc[action]
+        demand = self.demand[action]
         
         # Check capacity constraint
-        if customer['demand'] > self.remaining_capacity:
+        if demand > self.remaining_capacity:
             return self._get_state(), -1000, True, {'error': 'Capacity exceeded'}
         
-        # Calculate distance (simplified)
+        # Distance and travel time (simplified) from the precomputed matrices
         if self.current_location == 0:  # From depot
-            distance = np.sqrt((customer['latitude'] + 6.2088)**2 + (customer['longitude'] - 106.8456)**2) * 111  # km
+            distance = self.depot_distance[action]
+            travel_time = self.depot_travel_time[action]
         else:
-            prev_customer = self.customers_df.iloc[self.current_location]
-            distance = np.sqrt((customer['latitude'] - prev_customer['latitude'])**2 + 
-                             (customer['longitude'] - prev_customer['longitude'])**2) * 111  # km
-        
-        # Calculate travel time (simplified)
-        travel_time = distance / 50  # Assuming 50 km/h
+            distance = self.distance_matrix[self.current_location, action]
+            travel_time = self.travel_time_matrix[self.current_location, action]
         
         # Update state
         self.current_location = action
-        self.remaining_capacity -= customer['demand']
-        self.current_time += travel_time + customer['service_time']
+        self.remaining_capacity -= demand
+        self.current_time += travel_time + self.service_time[action]
         self.visited_customers.add(action)
         self.total_distance += distance
         self.total_time += travel_time
         
+        self._state[0] = action
+        self._state[1] = self.remaining_capacity
+        self._state[2] = self.current_time
+        self._state[5 + action] = 0.0
+        
         # Calculate reward using simple function
         reward = self._calculate_simple_reward(distance, len(self.visited_customers))
         
@@ -105,20 +142,8 @@ class FixedVRPEnvironment(gym.Env):
         }
 
     def _get_state(self) -> np.ndarray:
-        """Get current state representation."""
-        state = [
-            self.current_location,
-            self.remaining_capacity,
-            self.current_time,
-            self.weather_api.get_weather_impact(0, 0),  # Simple
-            self.traffic_api.get_traffic_impact((0, 0), (0, 0)),  # Simple
-        ]
-        
-        # Add unvisited customers status
-        for i in range(self.n_customers):
-            state.append(1.0 if i not in self.visited_customers else 0.0)
-        
-        return np.array(state, dtype=np.float32)
+        """Get current state representation (copy of the in-place observation)."""
+        return self._state.copy()
 
     def _calculate_simple_reward(self, distance: float, visited_count: int) -> float:
         """Simple and stable reward function."""
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Baseline heuristik VRP berbasis matriks jarak (NumPy)
+Nearest neighbor, Clarke-Wright savings, sweep dan 2-opt sebagai pembanding policy DQN.
+
+Routes are lists of customer row indices (the depot, row 0, is implicit at
+both ends). Distances follow VRPDynamicEnv.total_distance: every vehicle
+returns to the depot except the last one, so baseline and agent numbers
+are directly comparable. Time windows are ignored (they are soft in the
+environment as well).
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import calculate_distance
+
+Routes = List[List[int]]
+
+def distance_matrix(customers_df: pd.DataFrame) -> np.ndarray:
+    """Haversine distance (km) between every pair of rows, depot included."""
+    latitude = customers_df['latitude'].to_numpy(dtype=np.float64)
+    longitude = customers_df['longitude'].to_numpy(dtype=np.float64)
+    return calculate_distance(latitude[:, None], longitude[:, None], latitude[None, :], longitude[None, :])
+
+def route_lengths(routes: Routes, distances: np.ndarray) -> np.ndarray:
+    """Closed length (depot -> customers -> depot) of every route."""
+    lengths = np.zeros(len(routes))
+    for r, route in enumerate(routes):
+        if route:
+            tour = np.concatenate(([0], route, [0]))
+            lengths[r] = distances[tour[:-1], tour[1:]].sum()
+    return lengths
+
+def solution_distance(routes: Routes, distances: np.ndarray) -> float:
+    """
+    Total distance as counted by VRPDynamicEnv: closed routes, minus the
+    return leg of the route driven last (the one with the longest return).
+    """
+    routes = [route for route in routes if route]
+    if not routes:
+        return 0.0
+    return_legs = distances[[route[-1] for route in routes], 0]
+    return float(route_lengths(routes, distances).sum() - return_legs.max())
+
+def order_routes(routes: Routes, distances: np.ndarray) -> Routes:
+    """Put the route with the longest return leg last, matching solution_distance."""
+    routes = [route for route in routes if route]
+    if len(routes) > 1:
+        last = int(np.argmax(distances[[route[-1] for route in routes], 0]))
+        routes.append(routes.pop(last))
+    return routes
+
+def _check_demand(demand: np.ndarray, capacity: float):
+    too_large = np.flatnonzero(demand[1:] > capacity) + 1
+    if len(too_large):
+        raise ValueError(f"Customers {too_large.tolist()} have demand above vehicle capacity {capacity}")
+
+def nearest_neighbor_path(distances: np.ndarray, service_time: Optional[np.ndarray] = None,
+                          speed: float = 50.0) -> Tuple[float, float, List[int]]:
+    """
+    Single open path from the depot, always to the nearest unvisited stop
+    (no capacity). One masked argmin per step instead of a scalar loop.
+
+    Returns:
+        total_distance_km, total_time_hours (travel + service), visiting order
+    """
+    n = len(distances)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[0] = False
+    current, total_distance, order = 0, 0.0, []
+
+    for _ in range(n - 1):
+        row = np.where(unvisited, distances[current], np.inf)
+        nearest = int(np.argmin(row))
+        total_distance += row[nearest]
+        unvisited[nearest] = False
+        order.append(nearest)
+        current = nearest
+
+    service = 0.0 if service_time is None else float(service_time[order].sum())
+    return float(total_distance), total_distance / speed + service, order
+
+def nearest_neighbor_baseline(customers_df: pd.DataFrame, speed: float = 50.0) -> Tuple[float, float]:
+    """
+    Nearest-neighbor path baseline from the depot (row 0), ignoring capacity.
+
+    Returns:
+        total_distance_km, total_time_hours
+    """
+    if len(customers_df) <= 1:
+        return 0.0, 0.0
+    service_time = customers_df['service_time'].to_numpy(dtype=np.float64) \
+        if 'service_time' in customers_df.columns else None
+    total_distance, total_time, _ = nearest_neighbor_path(distance_matrix(customers_df), service_time, speed)
+    return total_distance, total_time
+
+def nearest_neighbor_routes(distances: np.ndarray, demand: np.ndarray, capacity: float) -> Routes:
+    """Capacity-feasible nearest neighbor: a vehicle returns when no unvisited customer fits."""
+    _check_demand(demand, capacity)
+    n = len(distances)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[0] = False
+    routes, route, current, remaining = [], [], 0, capacity
+
+    while unvisited.any():
+        candidates = unvisited & (demand <= remaining)
+        if not candidates.any():
+            routes.append(route)
+            route, current, remaining = [], 0, capacity
+            continue
+        nearest = int(np.argmin(np.where(candidates, distances[current], np.inf)))
+        route.append(nearest)
+        unvisited[nearest] = False
+        remaining -= demand[nearest]
+        current = nearest
+
+    routes.append(route)
+    return [route for route in routes if route]
+
+def two_opt(route: Sequence[int], distances: np.ndarray, open_end: bool = False,
+            max_rounds: int = 1000, moves_per_round: int = 256,
+            deadline: Optional[float] = None) -> List[int]:
+    """
+    Improve one route with 2-opt.
+
+    Each round evaluates every segment reversal at once as a matrix of
+    length deltas, then applies the best improving moves whose segments do
+    not overlap (their deltas stay valid), until no move improves.
+
+    Args:
+        route: Customer order (depot excluded)
+        distances: Full distance matrix
+        open_end: Optimize depot -> ... -> last customer without the return
+            leg (the vehicle driven last in VRPDynamicEnv). Modelled as a
+            closed tour through a free dummy node pinned next to the depot.
+        deadline: time.perf_counter() value after which no new round starts
+
+    Returns:
+        Improved customer order (depot excluded)
+    """
+    nodes = np.concatenate(([0], np.asarray(route, dtype=np.int64)))
+    local = distances[np.ix_(nodes, nodes)]
+    if open_end:
+        local = np.pad(local, ((0, 1), (0, 1)))
+    n = len(local)
+    tour = np.arange(n)
+    if n < 4:
+        return nodes[1:].tolist()
+
+    upper = np.triu(np.ones((n, n), dtype=bool), 2)
+    upper[0, n - 1] = False  # adjacent edges of the closed tour
+    if open_end:
+        upper[:, n - 1] = False  # keep the dummy -> depot edge
+
+    for _ in range(max_rounds):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        a, b = tour, np.roll(tour, -1)
+        edges = local[a, b]
+        # Replacing edges (a_i, b_i), (a_j, b_j) by (a_i, a_j), (b_i, b_j) reverses tour[i+1:j+1]
+        delta = local[a[:, None], a[None, :]] + local[b[:, None], b[None, :]] \
+            - edges[:, None] - edges[None, :]
+        delta = np.where(upper, delta, 0.0)
+
+        improving = np.flatnonzero(delta < -1e-9)
+        if len(improving) == 0:
+            break
+        if len(improving) > moves_per_round:
+            improving = improving[np.argpartition(delta.flat[improving], moves_per_round)[:moves_per_round]]
+        improving = improving[np.argsort(delta.flat[improving])]
+
+        applied: List[Tuple[int, int]] = []
+        for i, j in zip(*np.unravel_index(improving, delta.shape)):
+            if all(j < start or i > end for start, end in applied):
+                tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+                applied.append((i, j))
+
+    tour = tour[1:len(nodes)] if open_end else tour[1:]
+    return nodes[tour].tolist()
+
+def improve_routes(routes: Routes, distances: np.ndarray, open_last: bool = True,
+                   deadline: Optional[float] = None) -> Routes:
+    """
+    2-opt every route as a closed tour and, with open_last, the route driven
+    last (longest return leg) once more as an open path, as VRPDynamicEnv
+    counts it.
+    """
+    routes = [two_opt(route, distances, deadline=deadline) for route in routes if route]
+    if routes and open_last:
+        last = int(np.argmax(distances[[route[-1] for route in routes], 0]))
+        routes[last] = two_opt(routes[last], distances, open_end=True, deadline=deadline)
+    return routes
+
+def savings_routes(distances: np.ndarray, demand: np.ndarray, capacity: float) -> Routes:
+    """
+    Clarke-Wright parallel savings.
+
+    Savings s_ij = d_0i + d_0j - d_ij are computed for all pairs at once and
+    merged in decreasing order when i and j end two different routes and
+    the combined load fits.
+    """
+    _check_demand(demand, capacity)
+    n = len(distances)
+    if n <= 2:
+        return [[i] for i in range(1, n)]
+
+    rows, cols = np.triu_indices(n, 1)
+    keep = rows > 0
+    rows, cols = rows[keep], cols[keep]
+    savings = distances[0, rows] + distances[0, cols] - distances[rows, cols]
+    order = np.argsort(-savings, kind='stable')
+    order = order[savings[order] > 0]
+
+    routes: Dict[int, List[int]] = {i: [i] for i in range(1, n)}
+    route_of = np.arange(n)
+    load = demand.astype(np.float64).copy()
+
+    for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj or load[ri] + load[rj] > capacity:
+            continue
+        first, second = routes[ri], routes[rj]
+        # i must end its route and j must start the other (reverse if needed)
+        if first[-1] != i:
+            if first[0] != i:
+                continue
+            first.reverse()
+        if second[0] != j:
+            if second[-1] != j:
+                continue
+            second.reverse()
+
+        first.extend(second)
+        route_of[second] = ri
+        load[ri] += load[rj]
+        del routes[rj]
+
+    return list(routes.values())
+
+def sweep_routes(customers_df: pd.DataFrame, distances: np.ndarray, demand: np.ndarray,
+                 capacity: float, n_starts: int = 8, open_last: bool = True,
+                 deadline: Optional[float] = None) -> Routes:
+    """
+    Sweep: customers sorted by polar angle around the depot are cut into
+    routes by capacity, and each route is improved with 2-opt. Several
+    starting angles are tried (while the deadline allows) and the shortest
+    solution is kept. Uses planar x/y columns when present, else
+    latitude/longitude.
+    """
+    _check_demand(demand, capacity)
+    if 'x' in customers_df.columns and 'y' in customers_df.columns:
+        x = customers_df['x'].to_numpy(dtype=np.float64)
+        y = customers_df['y'].to_numpy(dtype=np.float64)
+        angle = np.arctan2(y[1:] - y[0], x[1:] - x[0])
+    else:
+        latitude = customers_df['latitude'].to_numpy(dtype=np.float64)
+        longitude = customers_df['longitude'].to_numpy(dtype=np.float64)
+        angle = np.arctan2(latitude[1:] - latitude[0],
+                           (longitude[1:] - longitude[0]) * np.cos(np.radians(latitude[0])))
+    by_angle = np.argsort(angle) + 1
+    if len(by_angle) == 0:
+        return []
+
+    best, best_distance = None, np.inf
+    for start in np.unique(np.linspace(0, len(by_angle), max(n_starts, 1), endpoint=False).astype(int)):
+        routes, route, load = [], [], 0.0
+        for customer in np.roll(by_angle, -start).tolist():
+            if load + demand[customer] > capacity:
+                routes.append(route)
+                route, load = [], 0.0
+            route.append(customer)
+            load += demand[customer]
+        routes.append(route)
+
+        routes = improve_routes(routes, distances, open_last, deadline)
+        total = solution_distance(routes, distances) if open_last else route_lengths(routes, distances).sum()
+        if total < best_distance:
+            best, best_distance = routes, total
+        if len(routes) == 1 or (deadline is not None and time.perf_counter() > deadline):
+            # One vehicle: every start angle gives the same tour
+            break
+    return best
+
+# Registered baselines:
+# name -> (customers_df, distances, demand, capacity, open_last, deadline) -> routes
+BASELINES: Dict[str, Callable[..., Routes]] = {
+    'nearest_neighbor': lambda df, d, q, cap, open_last, deadline: nearest_neighbor_routes(d, q, cap),
+    'nearest_neighbor_2opt': lambda df, d, q, cap, open_last, deadline: improve_routes(
+        nearest_neighbor_routes(d, q, cap), d, open_last, deadline),
+    'savings': lambda df, d, q, cap, open_last, deadline: savings_routes(d, q, cap),
+    'savings_2opt': lambda df, d, q, cap, open_last, deadline: improve_routes(
+        savings_routes(d, q, cap), d, open_last, deadline),
+    'sweep': lambda df, d, q, cap, open_last, deadline: sweep_routes(
+        df, d, q, cap, open_last=open_last, deadline=deadline),
+}
+
+def run_baselines(customers_df: pd.DataFrame, capacity: float,
+                  methods: Optional[Sequence[str]] = None,
+                  distances: Optional[np.ndarray] = None,
+                  time_limit: Optional[float] = None) -> Dict[str, Dict]:
+    """
+    Solve an instance with the registered baseline heuristics.
+
+    Args:
+        customers_df: Depot (row 0) and customers with latitude, longitude, demand
+        capacity: Vehicle capacity
+        methods: Baseline names (default: all in BASELINES)
+        distances: Precomputed distance matrix (optional)
+        time_limit: Seconds per method for the improvement phases (optional)
+
+    Returns:
+        Per method: distance_km (VRPDynamicEnv convention), closed_distance_km,
+        vehicles, runtime_s and routes
+    """
+    if distances is None:
+        distances = distance_matrix(customers_df)
+    demand = customers_df['demand'].to_numpy(dtype=np.float64)
+
+    results = {}
+    for name in methods or BASELINES:
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit else None
+        routes = order_routes(BASELINES[name](customers_df, distances, demand, capacity, True, deadline),
+                              distances)
+        runtime = time.perf_counter() - start
+        results[name] = {
+            'distance_km': solution_distance(routes, distances),
+            'closed_distance_km': float(route_lengths(routes, distances).sum()),
+            'vehicles': len(routes),
+            'runtime_s': runtime,
+            'routes': routes
+        }
+    return results
+
+def heuristic_comparison(baselines: Dict[str, Dict], distance_km: float) -> Dict[str, float]:
+    """
+    Flat summary columns comparing a policy's distance with run_baselines()
+    results: baseline distance and runtime, and the policy's gap in percent
+    (negative = policy is shorter).
+    """
+    summary = {}
+    for name, result in baselines.items():
+        baseline_km = result['distance_km']
+        summary[f'baseline_{name}_km'] = round(baseline_km, 2)
+        summary[f'baseline_{name}_runtime_s'] = round(result['runtime_s'], 4)
+        summary[f'gap_vs_{name}_percent'] = (
+            round((distance_km - baseline_km) / baseline_km * 100.0, 1) if baseline_km > 0 else 0.0
+        )
+    return summary
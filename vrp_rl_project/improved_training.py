@@ -4,13 +4,16 @@ import matplotlib.pyplot as plt
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
 import random
 from dataclasses import dataclass
 from typing import List, Dict, Tuple
 import json
 import os
 
+from model.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, NStepBuffer
+from model.transition_store import open_writer
+from utils import load_config
+
 @dataclass
 class RouteData:
     route_name: str
@@ -40,11 +43,40 @@ class ImprovedDQN(nn.Module):
         x = self.fc4(x)
         return x
 
-class ImprovedDQNAgent:
+class ImprovedDuelingDQN(nn.Module):
     def __init__(self, state_size: int, action_size: int):
+        super(ImprovedDuelingDQN, self).__init__()
+        self.fc1 = nn.Linear(state_size, 256)
+        self.fc2 = nn.Linear(256, 256)
+        self.fc3 = nn.Linear(256, 128)
+        self.value = nn.Linear(128, 1)
+        self.advantage = nn.Linear(128, action_size)
+        self.relu = nn.ReLU()
+        self.dropout = nn.Dropout(0.2)
+        
+    def forward(self, x):
+        x = self.relu(self.fc1(x))
+        x = self.dropout(x)
+        x = self.relu(self.fc2(x))
+        x = self.dropout(x)
+        x = self.relu(self.fc3(x))
+        # Q(s, a) = V(s) + A(s, a) - mean_a A(s, a)
+        advantage = self.advantage(x)
+        return self.value(x) + advantage - advantage.mean(dim=-1, keepdim=True)
+
+class ImprovedDQNAgent:
+    def __init__(self, state_size: int, action_size: int, prioritized_replay: bool = False,
+                 double_dqn: bool = False, dueling_dqn: bool = False, n_step: int = 1,
+                 transition_writer=None):
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=10000)
+        self.prioritized_replay = prioritized_replay
+        self.double_dqn = double_dqn
+        self.dueling_dqn = dueling_dqn
+        if prioritized_replay:
+            self.memory = PrioritizedReplayBuffer(10000, state_shape=(state_size,))
+        else:
+            self.memory = ReplayBuffer(10000, state_shape=(state_size,))
         self.gamma = 0.99
         self.epsilon = 1.0
         self.epsilon_min = 0.01
@@ -53,43 +85,93 @@ class ImprovedDQNAgent:
         self.batch_size = 64
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
-        self.q_network = ImprovedDQN(state_size, action_size).to(self.device)
-        self.target_network = ImprovedDQN(state_size, action_size).to(self.device)
+        # n-step returns are bootstrapped with gamma^n
+        self.n_step_buffer = NStepBuffer(n_step, self.gamma)
+        self.bootstrap_gamma = self.gamma ** self.n_step_buffer.n_step
+        
+        # Optional TransitionWriter (offline_data di config.yaml)
+        self.transition_writer = transition_writer
+        
+        network = ImprovedDuelingDQN if dueling_dqn else ImprovedDQN
+        self.q_network = network(state_size, action_size).to(self.device)
+        self.target_network = network(state_size, action_size).to(self.device)
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=self.learning_rate)
         self.criterion = nn.MSELoss()
         
         self.update_target_network()
         
+        # Preallocated input and cached action masks for act()
+        self._state_tensor = torch.zeros(1, state_size, device=self.device)
+        self._mask_cache = {}
+        
     def update_target_network(self):
         self.target_network.load_state_dict(self.q_network.state_dict())
         
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        if self.transition_writer is not None:
+            self.transition_writer.add(state, action, reward, next_state, done)
+        for transition in self.n_step_buffer.push(state, action, reward, next_state, done):
+            self.memory.add(*transition)
         
-    def act(self, state):
+    def act(self, state, valid_actions=None):
         if np.random.rand() <= self.epsilon:
+            if valid_actions:
+                return random.choice(valid_actions)
             return random.randrange(self.action_size)
         
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        q_values = self.q_network(state_tensor)
-        return np.argmax(q_values.cpu().data.numpy())
+        self._state_tensor[0] = torch.from_numpy(np.asarray(state, dtype=np.float32))
+        
+        # Greedy action without dropout and autograd bookkeeping
+        self.q_network.eval()
+        with torch.inference_mode():
+            q_values = self.q_network(self._state_tensor)[0]
+            if valid_actions:
+                q_values = q_values + self._action_mask(valid_actions)
+            return int(torch.argmax(q_values))
+    
+    def _action_mask(self, valid_actions):
+        key = tuple(valid_actions)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            if len(self._mask_cache) >= 4096:
+                self._mask_cache.clear()
+            mask = torch.full((self.action_size,), float('-inf'), device=self.device)
+            mask[list(valid_actions)] = 0.0
+            self._mask_cache[key] = mask
+        return mask
         
     def replay(self):
         if len(self.memory) < self.batch_size:
             return
             
-        batch = random.sample(self.memory, self.batch_size)
-        states = torch.FloatTensor([data[0] for data in batch]).to(self.device)
-        actions = torch.LongTensor([data[1] for data in batch]).to(self.device)
-        rewards = torch.FloatTensor([data[2] for data in batch]).to(self.device)
-        next_states = torch.FloatTensor([data[3] for data in batch]).to(self.device)
-        dones = torch.BoolTensor([data[4] for data in batch]).to(self.device)
+        indices = self.memory.sample_indices(self.batch_size)
+        batch = self.memory.gather(indices)
+        states, actions, rewards, next_states, dones = (torch.from_numpy(data).to(self.device) for data in batch)
+        
+        # Targets without dropout and autograd bookkeeping
+        self.q_network.eval()
+        self.target_network.eval()
+        with torch.no_grad():
+            next_q_values = self.target_network(next_states)
+            if self.double_dqn:
+                # Online network picks the action, target network scores it
+                next_actions = self.q_network(next_states).argmax(1, keepdim=True)
+                next_q_values = next_q_values.gather(1, next_actions).squeeze(1)
+            else:
+                next_q_values = next_q_values.max(1)[0]
+        target_q_values = rewards + (self.bootstrap_gamma * next_q_values * ~dones)
         
-        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1))
-        next_q_values = self.target_network(next_states).max(1)[0].detach()
-        target_q_values = rewards + (self.gamma * next_q_values * ~dones)
+        self.q_network.train()
+        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
         
-        loss = self.criterion(current_q_values.squeeze(), target_q_values)
+        if self.prioritized_replay:
+            # Importance-sampling weighted MSE, TD errors become new priorities
+            weights = torch.from_numpy(self.memory.importance_weights(indices)).to(self.device)
+            td_errors = target_q_values - current_q_values
+            loss = (weights * td_errors.pow(2)).mean()
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy())
+        else:
+            loss = self.criterion(current_q_values, target_q_values)
         
         self.optimizer.zero_grad()
         loss.backward()
@@ -98,6 +180,12 @@ class ImprovedDQNAgent:
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
             
+    def get_weights(self):
+        return {name: tensor.detach().cpu().numpy() for name, tensor in self.q_network.state_dict().items()}
+    
+    def set_weights(self, weights):
+        self.q_network.load_state_dict({name: torch.from_numpy(array) for name, array in weights.items()})
+            
     def save(self, filename):
         torch.save(self.q_network.state_dict(), filename)
         
@@ -210,8 +298,18 @@ def improved_training():
     state_size = len(env.reset())
     action_size = len(destinations) + 1  # +1 for return to depot
     
-    # Agent setup
-    agent = ImprovedDQNAgent(state_size, action_size)
+    # Agent setup (advanced DQN variants dari config.yaml)
+    config = load_config()
+    advanced = config.get('advanced_dqn', {})
+    agent = ImprovedDQNAgent(
+        state_size,
+        action_size,
+        prioritized_replay=advanced.get('prioritized_replay', False),
+        double_dqn=advanced.get('double_dqn', False),
+        dueling_dqn=advanced.get('dueling_dqn', False),
+        n_step=advanced.get('n_step_learning', 1),
+        transition_writer=open_writer(config, state_size, action_size, prefix='improved')
+    )
     
     # Training parameters
     episodes = 1000
@@ -276,6 +374,8 @@ def improved_training():
                   f"Completion: {avg_completion:.2%} | Epsilon: {agent.epsilon:.3f}")
     
     print("\n✅ Training Completed!")
+    if agent.transition_writer is not None:
+        agent.transition_writer.flush()
     
     # Save results
     df = pd.DataFrame(training_results)
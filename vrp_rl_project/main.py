@@ -1,4 +1,5 @@
 import argparse
+import functools
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
@@ -7,15 +8,30 @@ import seaborn as sns
 from utils import load_config, generate_simulated_data, save_results, plot_route
 from env.vrp_env import VRPDynamicEnv
 from model.dqn_model import DQNAgent
+from model.checkpoint_registry import CheckpointRegistry, load_into_agent
+from model.training_state import DEFAULT_RESUME_DIR, load_training_state, save_training_state
+from distributed_training import train_distributed
+from telemetry import TrainingTelemetry
+from validation import PeriodicValidation
+from route_search import DECODING_MODES, search_routes
 
-def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
+def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict, resume: bool = False) -> Dict:
     """
     Train the DQN agent.
     
+    Every training.resume_interval episodes the complete training state
+    (weights, optimizer, replay buffer, epsilon, RNG, results) is saved to
+    training.resume_dir; with resume=True training continues from there.
+    Every training.evaluation_interval episodes the greedy policy is
+    evaluated on a fixed validation set in a background thread; training
+    stops once it has not improved for training.early_stopping_patience
+    episodes (see validation.PeriodicValidation).
+    
     Args:
         env: VRP environment
         agent: DQN agent
         config: Configuration dictionary
+        resume: Continue from the last training snapshot, if any
         
     Returns:
         Dictionary containing training results
@@ -23,6 +39,10 @@ def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
     episodes = config['training']['episodes']
     max_steps = config['training']['max_steps']
     save_interval = config['training']['save_interval']
+    resume_interval = config['training'].get('resume_interval', save_interval)
+    resume_dir = config['training'].get('resume_dir', DEFAULT_RESUME_DIR)
+    registry = CheckpointRegistry()
+    validation = PeriodicValidation(env, agent, config, run='dqn', registry=registry)
     
     results = {
         'episode': [],
@@ -31,8 +51,28 @@ def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
         'total_time': [],
         'visited_customers': []
     }
+    start_episode = 0
+    total_steps = 0
+    
+    progress = load_training_state(agent, resume_dir) if resume else None
+    if progress is not None:
+        start_episode = progress['episode']
+        total_steps = progress['total_steps']
+        results = progress['results']
+        validation.load_state(progress.get('validation'))
+        print(f"Resuming from episode {start_episode} ({total_steps} steps, "
+              f"{len(agent.memory)} transitions in replay memory, epsilon {agent.epsilon:.4f})")
+    elif resume:
+        print(f"No training snapshot in {resume_dir}, starting from scratch")
+    
+    telemetry = TrainingTelemetry(
+        'data/telemetry/train.jsonl', interval=config['training'].get('telemetry_interval', 10),
+        metadata={'episodes': episodes, 'max_steps': max_steps, 'batch_size': agent.batch_size,
+                  'start_episode': start_episode},
+        append=progress is not None
+    )
     
-    for episode in range(episodes):
+    for episode in range(start_episode, episodes):
         state = env.reset()
         total_reward = 0
         
@@ -42,19 +82,23 @@ def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
                            if i not in env.visited_customers]
             
             # Choose action
-            action = agent.act(state, valid_actions)
+            with telemetry.timer('inference'):
+                action = agent.act(state, valid_actions)
             
             # Take action
-            next_state, reward, done, info = env.step(action)
+            with telemetry.timer('env'):
+                next_state, reward, done, info = env.step(action)
             
             # Store experience
             agent.remember(state, action, reward, next_state, done)
             
             # Train agent
             loss = agent.replay()
+            telemetry.step(loss, agent)
             
             state = next_state
             total_reward += reward
+            total_steps += 1
             
             if done:
                 break
@@ -69,10 +113,34 @@ def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
         results['total_distance'].append(info.get('total_distance', 0))
         results['total_time'].append(info.get('total_time', 0))
         results['visited_customers'].append(info.get('visited_customers', 0))
+        telemetry.end_episode(
+            episode, epsilon=agent.epsilon, steps=step + 1,
+            total_reward=total_reward,
+            total_distance=info.get('total_distance', 0),
+            total_time=info.get('total_time', 0),
+            visited_customers=info.get('visited_customers', 0)
+        )
         
         # Save model
         if episode % save_interval == 0:
-            agent.save(f'model/checkpoints/dqn_episode_{episode}.weights.h5')
+            checkpoint_path = f'model/checkpoints/dqn_episode_{episode}.weights.h5'
+            agent.save(checkpoint_path)
+            registry.register(
+                checkpoint_path, config=config,
+                state_size=agent.state_size, action_size=agent.action_size,
+                episode=episode, step=total_steps,
+                metrics={'total_reward': total_reward,
+                         'total_distance': info.get('total_distance', 0),
+                         'visited_customers': info.get('visited_customers', 0)}
+            )
+        
+        # Validation and early stopping
+        stop = validation.end_episode(episode)
+        
+        # Snapshot for resuming (after the episode, so it restarts cleanly)
+        if (episode + 1) % resume_interval == 0 or episode == episodes - 1 or stop:
+            save_training_state(agent, {'episode': episode + 1, 'total_steps': total_steps,
+                                        'results': results, 'validation': validation.state()}, resume_dir)
         
         # Print progress
         if episode % 10 == 0:
@@ -82,23 +150,44 @@ def train_model(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
             print(f"Total Time: {info.get('total_time', 0):.2f}")
             print(f"Visited Customers: {info.get('visited_customers', 0)}")
             print("------------------------")
+        
+        if stop:
+            print(f"Early stopping at episode {episode}: no validation improvement since "
+                  f"episode {validation.early_stopping.best_episode}")
+            break
+    
+    validation.close()
+    telemetry.close(final_epsilon=agent.epsilon)
+    if agent.transition_writer is not None:
+        agent.transition_writer.flush()
     
     return results
 
-def evaluate_model(env: VRPDynamicEnv, agent: DQNAgent) -> Dict:
+def evaluate_model(env: VRPDynamicEnv, agent: DQNAgent, decoding: str = 'greedy',
+                   width: int = 16, time_budget_ms: float = None) -> Dict:
     """
     Evaluate the trained DQN agent.
     
     Args:
         env: VRP environment
         agent: DQN agent
+        decoding: 'greedy', 'sample' (best-of-K) or 'beam' (see route_search)
+        width: Samples / beam width for sample and beam decoding
+        time_budget_ms: Latency budget for sample and beam decoding
         
     Returns:
         Dictionary containing evaluation results
     """
+    # Sample/beam: search the visiting order first, then replay it in env
+    planned = None
+    if decoding != 'greedy':
+        planned = iter(search_routes(agent.q_values_batch, env, decoding, width=width,
+                                     time_budget_ms=time_budget_ms)['actions'])
+    
     state = env.reset()
     total_reward = 0
     route = []
+    info = {}
     
     while True:
         # Get valid actions
@@ -106,7 +195,12 @@ def evaluate_model(env: VRPDynamicEnv, agent: DQNAgent) -> Dict:
                         if i not in env.visited_customers]
         
         # Choose action
-        action = agent.act(state, valid_actions)
+        if planned is not None:
+            action = next(planned, None)
+            if action is None:
+                break
+        else:
+            action = agent.act(state, valid_actions)
         
         # Take action
         next_state, reward, done, info = env.step(action)
@@ -180,6 +274,18 @@ def main():
                        help='Train the model')
     parser.add_argument('--evaluate', action='store_true',
                        help='Evaluate the model')
+    parser.add_argument('--distributed', action='store_true',
+                       help='Train with parallel actor processes and one learner')
+    parser.add_argument('--actors', type=int, default=None,
+                       help='Number of actor processes for --distributed')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue training from the last snapshot in training.resume_dir')
+    parser.add_argument('--decoding', choices=DECODING_MODES, default='greedy',
+                       help='Route decoding for --evaluate: greedy, best-of-K sampling or beam search')
+    parser.add_argument('--width', type=int, default=16,
+                       help='Samples / beam width for --decoding sample or beam')
+    parser.add_argument('--time-budget-ms', type=float, default=None,
+                       help='Latency budget for --decoding sample or beam')
     args = parser.parse_args()
     
     # Load configuration
@@ -201,14 +307,30 @@ def main():
         
         # Create environment and agent
         env = VRPDynamicEnv(customers_df, config['environment']['max_vehicles'])
-        agent = DQNAgent(
-            state_size=env.observation_space.shape[0],
-            action_size=env.action_space.n,
-            config=config
-        )
         
-        # Train model
-        results = train_model(env, agent, config)
+        if args.distributed:
+            # Actors build their own env/agent from these factories
+            env_factory = functools.partial(VRPDynamicEnv, customers_df, config['environment']['max_vehicles'])
+            agent_factory = functools.partial(
+                DQNAgent,
+                state_size=env.observation_space.shape[0],
+                action_size=env.action_space.n,
+                config=config
+            )
+            agent, results = train_distributed(
+                env_factory, agent_factory, config,
+                num_actors=args.actors,
+                checkpoint_pattern='model/checkpoints/dqn_episode_{episode}.weights.h5'
+            )
+        else:
+            agent = DQNAgent(
+                state_size=env.observation_space.shape[0],
+                action_size=env.action_space.n,
+                config=config
+            )
+            
+            # Train model
+            results = train_model(env, agent, config, resume=args.resume)
         
         # Save results
         save_results(results, 'training_results.csv')
@@ -216,6 +338,14 @@ def main():
         
         # Save final model
         agent.save('model/dqn_final.weights.h5')
+        CheckpointRegistry().register(
+            'model/dqn_final.weights.h5', config=config, run='dqn',
+            state_size=agent.state_size, action_size=agent.action_size,
+            episode=len(results['episode']),
+            metrics={'total_reward': results['total_reward'][-1],
+                     'total_distance': results['total_distance'][-1],
+                     'visited_customers': results['visited_customers'][-1]}
+        )
         print("Training completed")
     
     if args.evaluate:
@@ -227,10 +357,17 @@ def main():
             action_size=env.action_space.n,
             config=config
         )
-        agent.load('model/checkpoints/dqn_episode_900.weights.h5')
+        
+        # Latest checkpoint for this environment size from the registry
+        registry = CheckpointRegistry()
+        registry.scan()
+        checkpoint = registry.latest('dqn', state_size=agent.state_size, action_size=agent.action_size)
+        model_path = checkpoint['path'] if checkpoint else 'model/checkpoints/dqn_episode_900.weights.h5'
+        load_into_agent(agent, model_path)
+        print(f"Loaded model: {model_path}")
         
         # Evaluate model
-        results = evaluate_model(env, agent)
+        results = evaluate_model(env, agent, args.decoding, args.width, args.time_budget_ms)
         
         # Plot route
         plot_route(results['route'], customers_df, "Optimal Route")
@@ -0,0 +1,361 @@
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+# Node features: x, y, demand, time window start/end, service time, depot flag
+NODE_FEATURES = 7
+# Dynamic context: remaining capacity, current time, weather factor, traffic factor
+CONTEXT_FEATURES = 4
+
+def node_features(env) -> np.ndarray:
+    """
+    Size-independent node features of a VRPDynamicEnv instance.
+
+    Coordinates are relative to the depot and scaled by the instance's
+    extent, demand by vehicle capacity and times by the planning horizon,
+    so instances of any size and region share one input distribution.
+
+    Returns:
+        Array of shape (n_customers, NODE_FEATURES)
+    """
+    y = env.latitude - env.latitude[0]
+    x = (env.longitude - env.longitude[0]) * math.cos(math.radians(env.latitude[0]))
+    scale = max(np.abs(x).max(), np.abs(y).max(), 1e-6)
+
+    horizon = _horizon(env)
+    features = np.zeros((env.n_customers, NODE_FEATURES), dtype=np.float32)
+    features[:, 0] = x / scale
+    features[:, 1] = y / scale
+    features[:, 2] = env.demand / env.max_capacity
+    features[:, 3] = env.time_window_start / horizon
+    features[:, 4] = np.minimum(env.time_window_end, horizon) / horizon
+    features[:, 5] = env.service_time / horizon
+    features[0, 6] = 1.0
+    return features
+
+def _horizon(env) -> float:
+    finite_end = env.time_window_end[np.isfinite(env.time_window_end)]
+    return max(24.0, float(finite_end.max()) if len(finite_end) else 0.0)
+
+def random_instance(n_customers: int, rng: np.random.Generator, max_capacity: float = 6000,
+                    demand_range: Tuple[float, float] = (100, 1500)) -> pd.DataFrame:
+    """
+    Random training instance: depot (row 0) plus n_customers customers
+    around Jabodetabek, same columns as data/simulated_shipments.csv.
+    """
+    n = n_customers + 1
+    latitude = -6.2 + rng.uniform(-0.4, 0.4, n)
+    longitude = 106.8 + rng.uniform(-0.5, 0.5, n)
+    start = rng.uniform(0, 12, n)
+    end = start + rng.uniform(4, 12, n)
+    df = pd.DataFrame({
+        'customer_id': np.arange(n),
+        'latitude': latitude,
+        'longitude': longitude,
+        'demand': rng.uniform(*demand_range, n),
+        'time_window_start': start,
+        'time_window_end': np.minimum(end, 24),
+        'service_time': rng.uniform(5, 30, n) / 60
+    })
+    # Depot: no demand, open all day
+    df.loc[0, ['demand', 'time_window_start', 'time_window_end', 'service_time']] = [0.0, 0.0, 24.0, 0.0]
+    return df
+
+class AttentionPolicy(nn.Module):
+    """
+    Encoder-decoder routing policy with attention (Kool et al., "Attention,
+    Learn to Solve Routing Problems!").
+
+    The encoder embeds every location and runs transformer layers over the
+    set, so the parameter count does not depend on the number of stops.
+    The decoder builds a query from the graph embedding, the current
+    location's embedding and the dynamic context (capacity, time, weather,
+    traffic), attends over the node embeddings (glimpse) and scores every
+    location with a pointer; infeasible locations are masked before the
+    softmax. Keys and values are projected once per instance (encode), so a
+    decoding step costs O(n) and 1,000+ stop instances run on CPU.
+    """
+
+    def __init__(self, embedding_dim: int = 128, n_heads: int = 8, n_layers: int = 3,
+                 feed_forward_dim: int = 512, tanh_clipping: float = 10.0):
+        super(AttentionPolicy, self).__init__()
+        if embedding_dim % n_heads != 0:
+            raise ValueError("embedding_dim must be divisible by n_heads")
+
+        self.hparams = {
+            'embedding_dim': embedding_dim,
+            'n_heads': n_heads,
+            'n_layers': n_layers,
+            'feed_forward_dim': feed_forward_dim,
+            'tanh_clipping': tanh_clipping
+        }
+        self.embedding_dim = embedding_dim
+        self.n_heads = n_heads
+        self.tanh_clipping = tanh_clipping
+
+        # Encoder
+        self.node_embedding = nn.Linear(NODE_FEATURES, embedding_dim)
+        self.encoder = nn.TransformerEncoder(
+            nn.TransformerEncoderLayer(embedding_dim, n_heads, feed_forward_dim, dropout=0.0,
+                                       batch_first=True, norm_first=True),
+            n_layers,
+            enable_nested_tensor=False
+        )
+        self.encoder_norm = nn.LayerNorm(embedding_dim)
+
+        # Decoder
+        self.project_node = nn.Linear(embedding_dim, 3 * embedding_dim, bias=False)
+        self.project_graph = nn.Linear(embedding_dim, embedding_dim, bias=False)
+        self.project_step = nn.Linear(embedding_dim + CONTEXT_FEATURES, embedding_dim, bias=False)
+        self.project_out = nn.Linear(embedding_dim, embedding_dim, bias=False)
+
+    def encode(self, features: torch.Tensor, node_mask: torch.Tensor) -> Dict[str, torch.Tensor]:
+        """
+        Embed all locations and precompute decoder keys/values.
+
+        Args:
+            features: (batch, n_nodes, NODE_FEATURES)
+            node_mask: (batch, n_nodes) True for real (non-padding) nodes
+
+        Returns:
+            Cache for decode_step
+        """
+        embeddings = self.encoder(self.node_embedding(features), src_key_padding_mask=~node_mask)
+        embeddings = self.encoder_norm(embeddings)
+
+        weights = node_mask.unsqueeze(-1).float()
+        graph = (embeddings * weights).sum(1) / weights.sum(1).clamp(min=1.0)
+        glimpse_key, glimpse_value, logit_key = self.project_node(embeddings).chunk(3, dim=-1)
+
+        return {
+            'embeddings': embeddings,
+            'fixed_context': self.project_graph(graph),
+            'glimpse_key': self._split_heads(glimpse_key),
+            'glimpse_value': self._split_heads(glimpse_value),
+            'logit_key': logit_key
+        }
+
+    def _split_heads(self, x: torch.Tensor) -> torch.Tensor:
+        batch, n_nodes, _ = x.shape
+        return x.view(batch, n_nodes, self.n_heads, -1).transpose(1, 2)
+
+    def decode_step(self, cache: Dict[str, torch.Tensor], current: torch.Tensor,
+                    context: torch.Tensor, action_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Log-probabilities of the next location.
+
+        Args:
+            cache: Output of encode
+            current: (batch,) index of the current location
+            context: (batch, CONTEXT_FEATURES) dynamic state
+            action_mask: (batch, n_nodes) True for feasible locations; rows
+                without any feasible location get a uniform dummy distribution
+
+        Returns:
+            (batch, n_nodes) log-probabilities (-inf where masked)
+        """
+        batch = current.shape[0]
+        rows = torch.arange(batch)
+        # Finished rows would give NaN; they are ignored by the caller
+        action_mask = action_mask | ~action_mask.any(1, keepdim=True)
+
+        current_embedding = cache['embeddings'][rows, current]
+        query = cache['fixed_context'] + self.project_step(torch.cat([current_embedding, context], dim=-1))
+
+        # Glimpse: multi-head attention over feasible nodes
+        head_dim = self.embedding_dim // self.n_heads
+        query_heads = query.view(batch, self.n_heads, 1, head_dim)
+        compatibility = query_heads @ cache['glimpse_key'].transpose(-1, -2) / math.sqrt(head_dim)
+        compatibility = compatibility.masked_fill(~action_mask[:, None, None, :], float('-inf'))
+        glimpse = torch.softmax(compatibility, dim=-1) @ cache['glimpse_value']
+        glimpse = self.project_out(glimpse.reshape(batch, self.embedding_dim))
+
+        # Pointer: single-head compatibility, clipped with tanh
+        logits = (cache['logit_key'] @ glimpse.unsqueeze(-1)).squeeze(-1) / math.sqrt(self.embedding_dim)
+        logits = self.tanh_clipping * torch.tanh(logits)
+        logits = logits.masked_fill(~action_mask, float('-inf'))
+        return F.log_softmax(logits, dim=-1)
+
+    def save(self, path: str):
+        torch.save({'hparams': self.hparams, 'state_dict': self.state_dict()}, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'AttentionPolicy':
+        checkpoint = torch.load(path, map_location='cpu', weights_only=True)
+        policy = cls(**checkpoint['hparams'])
+        policy.load_state_dict(checkpoint['state_dict'])
+        policy.eval()
+        return policy
+
+def _batch_features(envs: List) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Padded node features and node mask for environments of different sizes."""
+    n_nodes = max(env.n_customers for env in envs)
+    features = np.zeros((len(envs), n_nodes, NODE_FEATURES), dtype=np.float32)
+    node_mask = np.zeros((len(envs), n_nodes), dtype=bool)
+    for i, env in enumerate(envs):
+        features[i, :env.n_customers] = node_features(env)
+        node_mask[i, :env.n_customers] = True
+    return torch.from_numpy(features), torch.from_numpy(node_mask)
+
+def _batch_state(envs: List, done: np.ndarray, n_nodes: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Current location, dynamic context and action mask of every environment."""
+    current = np.zeros(len(envs), dtype=np.int64)
+    context = np.zeros((len(envs), CONTEXT_FEATURES), dtype=np.float32)
+    action_mask = np.zeros((len(envs), n_nodes), dtype=bool)
+    for i, env in enumerate(envs):
+        current[i] = env.current_location
+        context[i] = (env.remaining_capacity / env.max_capacity, env.current_time / _horizon(env),
+                      env.weather_factor, env.traffic_factor)
+        if not done[i]:
+            action_mask[i, :env.n_customers] = env.action_masks()
+    return torch.from_numpy(current), torch.from_numpy(context), torch.from_numpy(action_mask)
+
+def rollout(policy: AttentionPolicy, envs: List, greedy: bool = False) -> Dict:
+    """
+    Run one episode in every environment (reset first), choosing locations
+    with the policy.
+
+    Environments may have different numbers of stops; they are padded and
+    masked. The environments do their own bookkeeping (vehicle switches,
+    time windows, rewards), exactly as during DQN training.
+
+    Args:
+        policy: Attention policy
+        envs: VRPDynamicEnv instances
+        greedy: Argmax decoding instead of sampling
+
+    Returns:
+        'log_likelihood' (batch,) tensor with gradient, 'total_reward',
+        'total_distance', 'visited_customers' arrays, 'routes' (location
+        sequences) and 'errors'
+    """
+    for env in envs:
+        env.reset()
+
+    features, node_mask = _batch_features(envs)
+    cache = policy.encode(features, node_mask)
+    n_nodes = features.shape[1]
+
+    batch = len(envs)
+    done = np.zeros(batch, dtype=bool)
+    total_reward = np.zeros(batch)
+    infos = [{} for _ in envs]
+    routes = [[] for _ in envs]
+    log_likelihood = torch.zeros(batch)
+
+    while not done.all():
+        current, context, action_mask = _batch_state(envs, done, n_nodes)
+        # An active environment without any feasible stop cannot continue
+        stuck = ~done & ~action_mask.numpy().any(1)
+        for i in np.flatnonzero(stuck):
+            infos[i] = dict(envs[i]._info(), error='No feasible stop left')
+            done[i] = True
+        if done.all():
+            break
+
+        log_probs = policy.decode_step(cache, current, context, action_mask)
+        if greedy:
+            actions = log_probs.argmax(-1)
+        else:
+            actions = torch.multinomial(log_probs.exp(), 1).squeeze(-1)
+
+        active = torch.from_numpy(~done)
+        chosen = log_probs.gather(1, actions.unsqueeze(-1)).squeeze(-1)
+        log_likelihood = log_likelihood + torch.where(active, chosen, torch.zeros_like(chosen))
+
+        for i in np.flatnonzero(~done):
+            action = int(actions[i])
+            _, reward, env_done, info = envs[i].step(action)
+            total_reward[i] += reward
+            routes[i].append(action)
+            infos[i] = info
+            done[i] = env_done
+
+    return {
+        'log_likelihood': log_likelihood,
+        'total_reward': total_reward,
+        'total_distance': np.array([info.get('total_distance', 0.0) for info in infos]),
+        'visited_customers': np.array([info.get('visited_customers', 0) for info in infos]),
+        'routes': routes,
+        'errors': [info.get('error') for info in infos]
+    }
+
+class AttentionPolicyTrainer:
+    def __init__(self, policy: AttentionPolicy, learning_rate: float = 1e-4, max_grad_norm: float = 1.0):
+        """
+        REINFORCE with a self-critical (greedy rollout) baseline.
+
+        For every instance the policy samples a route and also decodes one
+        greedily; the advantage is sampled return minus greedy return, so
+        no critic network is needed and the baseline tracks the policy.
+
+        Args:
+            policy: Attention policy to train
+            learning_rate: Adam learning rate
+            max_grad_norm: Gradient clipping norm
+        """
+        self.policy = policy
+        self.optimizer = torch.optim.Adam(policy.parameters(), lr=learning_rate)
+        self.max_grad_norm = max_grad_norm
+
+    def train_batch(self, envs: List) -> Dict:
+        """One policy-gradient step on a batch of environments."""
+        self.policy.eval()
+        with torch.no_grad():
+            baseline = rollout(self.policy, envs, greedy=True)
+
+        self.policy.train()
+        sampled = rollout(self.policy, envs, greedy=False)
+        advantage = torch.from_numpy(sampled['total_reward'] - baseline['total_reward']).float()
+        loss = -(advantage * sampled['log_likelihood']).mean()
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        grad_norm = nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+        self.optimizer.step()
+
+        return {
+            'loss': float(loss.item()),
+            'sampled_reward': float(sampled['total_reward'].mean()),
+            'greedy_reward': float(baseline['total_reward'].mean()),
+            'greedy_distance': float(baseline['total_distance'].mean()),
+            'grad_norm': float(grad_norm)
+        }
+
+@torch.no_grad()
+def solve(policy: AttentionPolicy, customers_df: pd.DataFrame, n_vehicles: int = 1,
+          max_capacity: float = 6000) -> Dict:
+    """
+    Greedy route for one instance of any size.
+
+    Returns:
+        Stop sequence per vehicle (row indices), totals and an error message
+        if the route ended on a constraint
+    """
+    from env.vrp_env import VRPDynamicEnv
+
+    policy.eval()
+    env = VRPDynamicEnv(customers_df, n_vehicles=n_vehicles, max_capacity=max_capacity)
+    result = rollout(policy, [env], greedy=True)
+
+    # Split the visiting order by vehicle (VRPDynamicEnv switches when capacity runs out)
+    routes = [[]]
+    env.reset()
+    for action in result['routes'][0]:
+        _, _, _, info = env.step(action)
+        while len(routes) < info['vehicles_used']:
+            routes.append([])
+        routes[-1].append(action)
+
+    return {
+        'routes': routes,
+        'total_reward': float(result['total_reward'][0]),
+        'total_distance': float(result['total_distance'][0]),
+        'visited_customers': int(result['visited_customers'][0]),
+        'error': result['errors'][0]
+    }
@@ -0,0 +1,281 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_REGISTRY_PATH = os.path.join('model', 'checkpoints', 'registry.json')
+
+# Nama file checkpoint: <run>_episode_<n>.<ext>, misalnya dqn_real_episode_100.weights.h5
+_EPISODE_PATTERN = re.compile(r'^(?P<run>.+?)_episode_(?P<episode>\d+)\.')
+
+def _layer_number(name: str) -> int:
+    """Keras layer naming order: dense, dense_1, dense_2, ..."""
+    suffix = name.rsplit('_', 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+def open_weights(path: str) -> 'OrderedDict[str, np.ndarray]':
+    """
+    Open checkpoint weights without reading them into memory.
+
+    Keras .weights.h5 files store each variable as a contiguous dataset, so
+    every layer variable is returned as a copy-on-write np.memmap over the
+    file (optimizer state is skipped). Torch .pth state dicts are loaded
+    with torch.load(mmap=True) and returned as NumPy views. Pages are only
+    read when an array is actually used.
+
+    Args:
+        path: Checkpoint file (.weights.h5 / .h5 or .pth / .pt)
+
+    Returns:
+        Ordered mapping of variable name to array ('<layer>/<index>' for
+        Keras files, state dict keys for torch files)
+    """
+    weights = OrderedDict()
+
+    if path.endswith('.h5'):
+        import h5py
+
+        with h5py.File(path, 'r') as f:
+            layer_group = f['layers']
+            for layer_name in sorted(layer_group.keys(), key=_layer_number):
+                if 'vars' not in layer_group[layer_name]:
+                    continue
+                variables = layer_group[layer_name]['vars']
+                for index in sorted(variables.keys(), key=int):
+                    dataset = variables[index]
+                    offset = dataset.id.get_offset()
+                    name = f'{layer_name}/{index}'
+                    if offset is None or dataset.chunks is not None or dataset.compression:
+                        # Chunked/compressed datasets cannot be mapped directly
+                        weights[name] = dataset[()]
+                    elif dataset.size == 0:
+                        weights[name] = np.zeros(dataset.shape, dtype=dataset.dtype)
+                    else:
+                        weights[name] = np.memmap(path, dtype=dataset.dtype, mode='c',
+                                                  offset=offset, shape=dataset.shape)
+    else:
+        import torch
+
+        state_dict = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+        for name, tensor in state_dict.items():
+            weights[name] = tensor.numpy()
+
+    return weights
+
+def infer_env_spec(weights: Dict[str, np.ndarray]) -> Tuple[int, int]:
+    """
+    State and action size of a Q-network from its weights.
+
+    Returns:
+        (state_size, action_size)
+    """
+    matrices = [array for array in weights.values() if array.ndim == 2]
+    if not matrices:
+        raise ValueError("No weight matrices found")
+
+    first, last = matrices[0], matrices[-1]
+    if any(name.startswith('fc1') for name in weights):
+        # Torch nn.Linear: (out_features, in_features); dueling head is named advantage
+        first = weights['fc1.weight']
+        last = weights['advantage.weight'] if 'advantage.weight' in weights else last
+        return int(first.shape[1]), int(last.shape[0])
+
+    # Keras Dense: (in_features, out_features); dueling advantage stream is built last
+    return int(first.shape[0]), int(last.shape[1])
+
+def load_into_agent(agent, path: str):
+    """
+    Load checkpoint weights into an agent through memory-mapped arrays.
+
+    Keras agents get their Dense layers assigned in order (layer names
+    differ between models built in the same process, the order does not);
+    torch agents receive the state dict through set_weights.
+    """
+    weights = open_weights(path)
+
+    if hasattr(agent, 'model') and hasattr(agent.model, 'get_layer'):
+        model_layers = [layer for layer in agent.model.layers if layer.weights]
+        file_layers = OrderedDict()
+        for name, array in weights.items():
+            file_layers.setdefault(name.split('/')[0], []).append(array)
+        if len(model_layers) != len(file_layers):
+            raise ValueError(f"{path} has {len(file_layers)} layers, model has {len(model_layers)}")
+        for layer, arrays in zip(model_layers, file_layers.values()):
+            layer.set_weights(arrays)
+    else:
+        agent.set_weights(dict(weights))
+
+class CheckpointRegistry:
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH):
+        """
+        Index of saved checkpoints with their metadata.
+
+        Each entry records the checkpoint path, run name, episode, training
+        step, environment spec (state/action size), evaluation metrics and a
+        reference to the config it was trained with. Configs are stored once
+        per distinct content (keyed by hash), entries are kept in a dict keyed
+        by path, and the index is a single JSON file rewritten atomically.
+
+        Args:
+            path: JSON index file
+        """
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.configs: Dict[str, Dict] = {}
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.entries = {entry['path']: entry for entry in data.get('checkpoints', [])}
+            self.configs = data.get('configs', {})
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(path).replace(os.sep, '/')
+
+    def _store_config(self, config: Optional[Dict]) -> Optional[str]:
+        if config is None:
+            return None
+        encoded = json.dumps(config, sort_keys=True, default=str)
+        config_id = hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:12]
+        self.configs.setdefault(config_id, json.loads(encoded))
+        return config_id
+
+    def save(self):
+        """Write the index (via a temporary file, so readers never see a partial file)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            'checkpoints': sorted(self.entries.values(), key=lambda e: (e['run'], e.get('episode') or 0, e['path'])),
+            'configs': self.configs
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def register(self, path: str, config: Optional[Dict] = None, state_size: Optional[int] = None,
+                 action_size: Optional[int] = None, episode: Optional[int] = None,
+                 step: Optional[int] = None, metrics: Optional[Dict] = None,
+                 run: Optional[str] = None, save: bool = True) -> Dict:
+        """
+        Add or replace a checkpoint entry.
+
+        Run name and episode default to what the file name says
+        (<run>_episode_<n>.*, otherwise the file stem); state/action size
+        default to what the weights say.
+
+        Returns:
+            The registry entry
+        """
+        key = self._key(path)
+        match = _EPISODE_PATTERN.match(os.path.basename(path))
+        if run is None:
+            run = match.group('run') if match else os.path.basename(path).split('.')[0]
+        if episode is None and match:
+            episode = int(match.group('episode'))
+        if (state_size is None or action_size is None) and os.path.exists(path):
+            inferred_state, inferred_action = infer_env_spec(open_weights(path))
+            state_size = inferred_state if state_size is None else state_size
+            action_size = inferred_action if action_size is None else action_size
+
+        previous = self.entries.get(key, {})
+        entry = {
+            'path': key,
+            'run': run,
+            'episode': episode,
+            'step': step if step is not None else previous.get('step', episode),
+            'state_size': None if state_size is None else int(state_size),
+            'action_size': None if action_size is None else int(action_size),
+            'config_id': self._store_config(config) or previous.get('config_id'),
+            'metrics': dict(previous.get('metrics', {}), **{k: float(v) for k, v in (metrics or {}).items()}),
+            'size_bytes': os.path.getsize(path) if os.path.exists(path) else None,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(os.path.getmtime(path)))
+                          if os.path.exists(path) else time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        self.entries[key] = entry
+
+        if save:
+            self.save()
+        return entry
+
+    def update_metrics(self, path: str, save: bool = True, **metrics) -> Dict:
+        """Record evaluation metrics for a registered checkpoint."""
+        entry = self.entries[self._key(path)]
+        entry['metrics'].update({name: float(value) for name, value in metrics.items()})
+        if save:
+            self.save()
+        return entry
+
+    def scan(self, pattern: str = os.path.join('model', '**', '*.weights.h5'), save: bool = True) -> List[Dict]:
+        """Register checkpoint files matching a glob pattern that are not in the index yet."""
+        added = []
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if self._key(path) not in self.entries:
+                added.append(self.register(path, save=False))
+        if added and save:
+            self.save()
+        return added
+
+    def prune_missing(self, save: bool = True) -> List[str]:
+        """Drop entries whose checkpoint file no longer exists."""
+        missing = [key for key in self.entries if not os.path.exists(key)]
+        for key in missing:
+            del self.entries[key]
+        if missing and save:
+            self.save()
+        return missing
+
+    def get(self, path: str) -> Optional[Dict]:
+        return self.entries.get(self._key(path))
+
+    def config(self, path: str) -> Optional[Dict]:
+        """Config the checkpoint was trained with (if recorded)."""
+        entry = self.get(path)
+        if entry is None or entry['config_id'] is None:
+            return None
+        return self.configs[entry['config_id']]
+
+    def list(self, run: Optional[str] = None, state_size: Optional[int] = None,
+             action_size: Optional[int] = None) -> List[Dict]:
+        """Entries (ordered by episode, then step), optionally filtered by run and env spec."""
+        entries = [
+            entry for entry in self.entries.values()
+            if (run is None or entry['run'] == run)
+            and (state_size is None or entry['state_size'] == state_size)
+            and (action_size is None or entry['action_size'] == action_size)
+        ]
+        return sorted(entries, key=lambda e: (e.get('episode') or 0, e.get('step') or 0, e['created_at']))
+
+    def latest(self, run: Optional[str] = None, **filters) -> Optional[Dict]:
+        """Most recent checkpoint (highest episode) of a run."""
+        entries = self.list(run, **filters)
+        return entries[-1] if entries else None
+
+    def best(self, metric: str, mode: str = 'max', run: Optional[str] = None, **filters) -> Optional[Dict]:
+        """Checkpoint with the best value of an evaluation metric ('max' or 'min')."""
+        if mode not in ('max', 'min'):
+            raise ValueError(f"mode must be 'max' or 'min', got {mode}")
+        entries = [e for e in self.list(run, **filters) if metric in e['metrics']]
+        if not entries:
+            return None
+        select = max if mode == 'max' else min
+        return select(entries, key=lambda e: e['metrics'][metric])
+
+    def remove(self, path: str, save: bool = True):
+        self.entries.pop(self._key(path), None)
+        if save:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return self._key(path) in self.entries
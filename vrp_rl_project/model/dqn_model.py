@@ -1,10 +1,13 @@
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
-from collections import deque
 import random
+import time
 from typing import List, Tuple, Dict
 
+from model.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, NStepBuffer
+from model.transition_store import open_writer
+
 class DQNAgent:
     def __init__(self, state_size: int, action_size: int, config: Dict):
         """
@@ -28,14 +31,49 @@ class DQNAgent:
         self.memory_size = config['model']['memory_size']
         self.batch_size = config['model']['batch_size']
         self.target_update = config['model']['target_update']
+        self.fused_replay = config['model'].get('fused_replay', True)
+        
+        # Advanced DQN features
+        advanced = config.get('advanced_dqn', {})
+        self.prioritized_replay = advanced.get('prioritized_replay', False)
+        self.double_dqn = advanced.get('double_dqn', False)
+        self.dueling_dqn = advanced.get('dueling_dqn', False)
+        self.n_step = advanced.get('n_step_learning', 1)
+        
+        # n-step returns are bootstrapped with gamma^n
+        self.n_step_buffer = NStepBuffer(self.n_step, self.gamma)
+        self.bootstrap_gamma = self.gamma ** self.n_step
+        
+        # Seconds spent sampling / updating in the last replay() call
+        self.replay_timings = {'sample': 0.0, 'update': 0.0}
         
         # Initialize memory
-        self.memory = deque(maxlen=self.memory_size)
+        if self.prioritized_replay:
+            self.memory = PrioritizedReplayBuffer(
+                self.memory_size,
+                state_shape=(self.state_size,),
+                alpha=advanced.get('per_alpha', 0.6),
+                beta=advanced.get('per_beta', 0.4),
+                beta_steps=advanced.get('per_beta_steps', 100000)
+            )
+        else:
+            self.memory = ReplayBuffer(self.memory_size, state_shape=(self.state_size,))
+        
+        # Offline dataset of raw 1-step transitions (offline_data.enabled)
+        self.transition_writer = open_writer(config, self.state_size, self.action_size)
         
         # Create main and target networks
         self.model = self._build_model()
         self.target_model = self._build_model()
         self.update_target_model()
+        
+        # Compiled target computation + gradient update (see learn_batch)
+        self._train_step = self._build_train_step()
+        
+        # Single-state inference fast path (see act)
+        self._state_buffer = np.zeros((1, self.state_size), dtype=np.float32)
+        self._mask_cache = {}
+        self._predict_single = self._build_predict_single()
 
     def _build_model(self) -> models.Model:
         """
@@ -44,6 +82,9 @@ class DQNAgent:
         Returns:
             Compiled Keras model
         """
+        if self.dueling_dqn:
+            return self._build_dueling_model()
+        
         model = models.Sequential()
         
         # Input layer
@@ -63,6 +104,141 @@ class DQNAgent:
         
         return model
 
+    def _build_dueling_model(self) -> models.Model:
+        """
+        Build dueling network: shared hidden layers followed by a state-value
+        stream V(s) and an advantage stream A(s, a), combined as
+        Q(s, a) = V(s) + A(s, a) - mean_a A(s, a).
+        
+        Returns:
+            Compiled Keras model
+        """
+        inputs = layers.Input(shape=(self.state_size,))
+        
+        x = inputs
+        for units in self.config['model']['hidden_layers']:
+            x = layers.Dense(units, activation='relu')(x)
+        
+        value = layers.Dense(1, activation='linear')(x)
+        advantage = layers.Dense(self.action_size, activation='linear')(x)
+        q_values = layers.Lambda(
+            lambda streams: streams[0] + streams[1] - tf.reduce_mean(streams[1], axis=1, keepdims=True)
+        )([value, advantage])
+        
+        model = models.Model(inputs=inputs, outputs=q_values)
+        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate),
+                     loss='mse')
+        
+        return model
+
+    def _build_train_step(self):
+        """
+        Build the graph-compiled training step.
+        
+        Target computation with the target network, the forward pass and the
+        optimizer update run as a single tf.function, replacing the two
+        model.predict calls, the Python target loop and model.fit. The loss is
+        the same MSE over all action outputs that model.fit minimizes (errors
+        of non-taken actions are zero), optionally weighted per transition by
+        importance-sampling weights for prioritized replay. With Double DQN the
+        online network picks the next action and the target network scores it.
+        
+        This is not the same update as _fit_batch: model.fit uses its default
+        batch_size of 32, i.e. two Adam steps per 64-sample replay batch,
+        while this step takes a single Adam step on the whole replay batch.
+        Use model.fused_replay: false for the original behaviour.
+        
+        Returns:
+            Compiled training step function
+        """
+        model = self.model
+        target_model = self.target_model
+        optimizer = model.optimizer
+        gamma = tf.constant(self.bootstrap_gamma, dtype=tf.float32)
+        double_dqn = self.double_dqn
+        
+        @tf.function
+        def train_step(states, actions, rewards, next_states, dones, weights):
+            next_q = target_model(next_states, training=False)
+            if double_dqn:
+                next_actions = tf.argmax(model(next_states, training=False), axis=1, output_type=tf.int32)
+                next_values = tf.gather(next_q, next_actions, axis=1, batch_dims=1)
+            else:
+                next_values = tf.reduce_max(next_q, axis=1)
+            targets = rewards + gamma * next_values * (1.0 - dones)
+            
+            with tf.GradientTape() as tape:
+                q_values = model(states, training=True)
+                q_taken = tf.gather(q_values, actions, axis=1, batch_dims=1)
+                td_errors = targets - q_taken
+                n_outputs = tf.cast(tf.size(q_values), tf.float32)
+                loss = tf.reduce_sum(weights * tf.square(td_errors)) / n_outputs
+            
+            gradients = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return loss, td_errors
+        
+        return train_step
+
+    def _build_predict_single(self):
+        """
+        Build the compiled single-state forward pass.
+        
+        model.predict sets up a batched data pipeline on every call, which
+        dominates the cost for one state. A tf.function with a fixed input
+        signature is traced once and then called directly.
+        
+        Returns:
+            Compiled prediction function for a (1, state_size) input
+        """
+        model = self.model
+        
+        @tf.function(input_signature=[tf.TensorSpec(shape=(1, self.state_size), dtype=tf.float32)])
+        def predict_single(state):
+            return model(state, training=False)
+        
+        return predict_single
+
+    def _action_mask(self, valid_actions: List[int]) -> np.ndarray:
+        """
+        Get the additive mask (0 for valid, -inf for invalid actions), cached
+        per set of valid actions.
+        """
+        key = tuple(valid_actions)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            if len(self._mask_cache) >= 4096:
+                self._mask_cache.clear()
+            mask = np.full(self.action_size, -np.inf, dtype=np.float32)
+            mask[valid_actions] = 0
+            self._mask_cache[key] = mask
+        return mask
+
+    def q_values(self, state: np.ndarray) -> np.ndarray:
+        """
+        Compute Q-values for a single state with the compiled fast path.
+        
+        Args:
+            state: Current state
+            
+        Returns:
+            Q-values for all actions
+        """
+        self._state_buffer[0] = state
+        return self._predict_single(self._state_buffer).numpy()[0]
+
+    def q_values_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Compute Q-values for a batch of states with one forward pass.
+        
+        Args:
+            states: Batch of states, shape (batch, state_size)
+            
+        Returns:
+            Q-values, shape (batch, action_size)
+        """
+        return self.model(np.asarray(states, dtype=np.float32), training=False).numpy()
+
     def update_target_model(self):
         """Update target network weights with main network weights."""
         self.target_model.set_weights(self.model.get_weights())
@@ -79,7 +255,10 @@ class DQNAgent:
             next_state: Next state
             done: Whether episode is done
         """
-        self.memory.append((state, action, reward, next_state, done))
+        if self.transition_writer is not None:
+            self.transition_writer.add(state, action, reward, next_state, done)
+        for transition in self.n_step_buffer.push(state, action, reward, next_state, done):
+            self.memory.add(*transition)
 
     def act(self, state: np.ndarray, valid_actions: List[int] = None) -> int:
         """
@@ -97,15 +276,38 @@ class DQNAgent:
                 return random.choice(valid_actions)
             return random.randrange(self.action_size)
         
-        act_values = self.model.predict(state.reshape(1, -1), verbose=0)
+        act_values = self.q_values(state)
         
         if valid_actions:
             # Mask invalid actions with large negative values
-            mask = np.ones(self.action_size) * -np.inf
-            mask[valid_actions] = 0
-            act_values = act_values + mask
+            act_values = act_values + self._action_mask(valid_actions)
             
-        return np.argmax(act_values[0])
+        return np.argmax(act_values)
+
+    def act_batch(self, states: np.ndarray, action_masks: np.ndarray = None) -> np.ndarray:
+        """
+        Choose actions for a batch of states (e.g. from VectorVRPEnvironment)
+        using epsilon-greedy with one forward pass.
+
+        Args:
+            states: Batch of states, shape (batch, state_size)
+            action_masks: Boolean valid-action masks, shape (batch, action_size) (optional)
+
+        Returns:
+            Selected action per state
+        """
+        batch_size = len(states)
+        q_values = self.model(np.asarray(states, dtype=np.float32), training=False).numpy()
+
+        if action_masks is not None:
+            q_values = np.where(action_masks, q_values, -np.inf)
+            # Random valid action: argmax over random scores restricted to the mask
+            random_actions = np.argmax(np.where(action_masks, np.random.rand(batch_size, self.action_size), -1.0), axis=1)
+        else:
+            random_actions = np.random.randint(self.action_size, size=batch_size)
+
+        explore = np.random.rand(batch_size) <= self.epsilon
+        return np.where(explore, random_actions, np.argmax(q_values, axis=1))
 
     def replay(self) -> float:
         """
@@ -115,37 +317,105 @@ class DQNAgent:
             Loss value
         """
         if len(self.memory) < self.batch_size:
+            self.replay_timings['sample'] = self.replay_timings['update'] = 0.0
             return 0.0
+        
+        start = time.perf_counter()
+        indices = self.memory.sample_indices(self.batch_size)
+        states, actions, rewards, next_states, dones = self.memory.gather(indices)
+        weights = self.memory.importance_weights(indices) if self.prioritized_replay else None
+        sampled = time.perf_counter()
+        
+        if self.fused_replay:
+            loss, td_errors = self.learn_batch(states, actions, rewards, next_states, dones, weights)
+        else:
+            loss, td_errors = self._fit_batch(states, actions, rewards, next_states, dones, weights)
+        
+        if self.prioritized_replay:
+            self.memory.update_priorities(indices, td_errors)
+        
+        # Seconds spent in the last call (read by telemetry.TrainingTelemetry)
+        self.replay_timings['sample'] = sampled - start
+        self.replay_timings['update'] = time.perf_counter() - sampled
+        
+        # Decay epsilon
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
             
-        minibatch = random.sample(self.memory, self.batch_size)
+        return loss
+
+    def learn_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                    next_states: np.ndarray, dones: np.ndarray,
+                    weights: np.ndarray = None) -> Tuple[float, np.ndarray]:
+        """
+        Run one compiled training step on a batch of transitions.
         
-        states = np.array([i[0] for i in minibatch])
-        actions = np.array([i[1] for i in minibatch])
-        rewards = np.array([i[2] for i in minibatch])
-        next_states = np.array([i[3] for i in minibatch])
-        dones = np.array([i[4] for i in minibatch])
+        Args:
+            states: Batch of states
+            actions: Batch of actions taken
+            rewards: Batch of rewards
+            next_states: Batch of next states
+            dones: Batch of done flags
+            weights: Per-transition loss weights (optional)
+            
+        Returns:
+            Loss value and per-transition TD errors
+        """
+        if weights is None:
+            weights = np.ones(len(states), dtype=np.float32)
         
+        loss, td_errors = self._train_step(
+            tf.convert_to_tensor(states, dtype=tf.float32),
+            tf.convert_to_tensor(actions, dtype=tf.int32),
+            tf.convert_to_tensor(rewards, dtype=tf.float32),
+            tf.convert_to_tensor(next_states, dtype=tf.float32),
+            tf.convert_to_tensor(dones, dtype=tf.float32),
+            tf.convert_to_tensor(weights, dtype=tf.float32)
+        )
+        return float(loss), td_errors.numpy()
+
+    def _fit_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                   next_states: np.ndarray, dones: np.ndarray,
+                   weights: np.ndarray = None) -> Tuple[float, np.ndarray]:
+        """
+        Train on a batch with model.predict/model.fit (original Keras path).
+        
+        Returns:
+            Loss value and per-transition TD errors
+        """
         # Predict Q-values for current states
         target = self.model.predict(states, verbose=0)
         
         # Predict Q-values for next states using target network
         target_next = self.target_model.predict(next_states, verbose=0)
+        if self.double_dqn:
+            next_actions = np.argmax(self.model.predict(next_states, verbose=0), axis=1)
+            next_values = target_next[np.arange(len(next_states)), next_actions]
+        else:
+            next_values = np.max(target_next, axis=1)
         
         # Update Q-values for taken actions
-        for i in range(self.batch_size):
+        td_errors = np.zeros(len(states), dtype=np.float32)
+        for i in range(len(states)):
+            predicted = target[i][actions[i]]
             if dones[i]:
                 target[i][actions[i]] = rewards[i]
             else:
-                target[i][actions[i]] = rewards[i] + self.gamma * np.max(target_next[i])
+                target[i][actions[i]] = rewards[i] + self.bootstrap_gamma * next_values[i]
+            td_errors[i] = target[i][actions[i]] - predicted
         
         # Train the model
-        history = self.model.fit(states, target, epochs=1, verbose=0)
+        history = self.model.fit(states, target, sample_weight=weights, epochs=1, verbose=0)
         
-        # Decay epsilon
-        if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
-            
-        return history.history['loss'][0]
+        return history.history['loss'][0], td_errors
+
+    def get_weights(self) -> List[np.ndarray]:
+        """Get main network weights (e.g. to broadcast to actor processes)."""
+        return self.model.get_weights()
+
+    def set_weights(self, weights: List[np.ndarray]):
+        """Set main network weights."""
+        self.model.set_weights(weights)
 
     def load(self, name: str):
         """Load model weights from file."""
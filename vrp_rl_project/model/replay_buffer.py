@@ -0,0 +1,551 @@
+import json
+import multiprocessing as mp
+import os
+import numpy as np
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, state_shape: Optional[Tuple[int, ...]] = None,
+                 state_dtype=np.float32, seed: Optional[int] = None):
+        """
+        Fixed-size experience replay memory backed by preallocated arrays.
+
+        Transitions are written into a ring of typed NumPy arrays instead of a
+        deque of Python tuples, so each transition costs only its raw bytes
+        and a minibatch is gathered with one vectorized take per field.
+
+        Args:
+            capacity: Maximum number of transitions kept
+            state_shape: Shape of a single state (inferred from the first
+                transition when omitted)
+            state_dtype: Storage dtype for states
+            seed: Optional seed for index sampling
+        """
+        self.capacity = int(capacity)
+        self.state_dtype = state_dtype
+        self.rng = np.random.default_rng(seed)
+
+        self.position = 0
+        self.size = 0
+
+        self.states = None
+        self._batch_size = None
+        if state_shape is not None:
+            self._allocate(tuple(state_shape))
+
+    def _allocate(self, state_shape: Tuple[int, ...]):
+        """Allocate storage for the given state shape."""
+        self.state_shape = state_shape
+        self.states = np.zeros((self.capacity,) + state_shape, dtype=self.state_dtype)
+        self.next_states = np.zeros((self.capacity,) + state_shape, dtype=self.state_dtype)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def _allocate_batch(self, batch_size: int):
+        """Allocate the reusable output arrays returned by sample()."""
+        self._batch_size = batch_size
+        self._batch_states = np.empty((batch_size,) + self.state_shape, dtype=self.state_dtype)
+        self._batch_next_states = np.empty((batch_size,) + self.state_shape, dtype=self.state_dtype)
+        self._batch_actions = np.empty(batch_size, dtype=np.int64)
+        self._batch_rewards = np.empty(batch_size, dtype=np.float32)
+        self._batch_dones = np.empty(batch_size, dtype=bool)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, state: np.ndarray, action: int, reward: float,
+            next_state: np.ndarray, done: bool) -> int:
+        """
+        Store a transition, overwriting the oldest one when full.
+
+        Returns:
+            Index the transition was written to
+        """
+        if self.states is None:
+            self._allocate(np.shape(state))
+
+        index = self.position
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def sample_indices(self, batch_size: int) -> np.ndarray:
+        """Draw batch_size uniform random indices of stored transitions."""
+        return self.rng.integers(0, self.size, size=batch_size)
+
+    def gather(self, indices: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Gather transitions at the given indices.
+
+        The returned arrays are preallocated batch buffers that are reused by
+        the next call, so use (or copy) them before sampling again.
+
+        Returns:
+            states, actions, rewards, next_states, dones
+        """
+        batch_size = len(indices)
+        if self._batch_size != batch_size:
+            self._allocate_batch(batch_size)
+
+        np.take(self.states, indices, axis=0, out=self._batch_states)
+        np.take(self.actions, indices, out=self._batch_actions)
+        np.take(self.rewards, indices, out=self._batch_rewards)
+        np.take(self.next_states, indices, axis=0, out=self._batch_next_states)
+        np.take(self.dones, indices, out=self._batch_dones)
+
+        return (self._batch_states, self._batch_actions, self._batch_rewards,
+                self._batch_next_states, self._batch_dones)
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """
+        Sample a uniform random minibatch.
+
+        Returns:
+            states, actions, rewards, next_states, dones
+        """
+        return self.gather(self.sample_indices(batch_size))
+
+    def _snapshot_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays written by save(). Rows past size were never written."""
+        return {name: getattr(self, name)[:self.size]
+                for name in ('states', 'actions', 'rewards', 'next_states', 'dones')}
+
+    def _snapshot_meta(self) -> Dict:
+        """Scalar state written by save()."""
+        return {
+            'type': type(self).__name__,
+            'capacity': self.capacity,
+            'position': self.position,
+            'size': self.size,
+            'state_shape': list(self.state_shape),
+            'state_dtype': np.dtype(self.state_dtype).str,
+            'rng': self.rng.bit_generator.state
+        }
+
+    def save(self, directory: str):
+        """
+        Snapshot the buffer into a directory: one .npy file per field,
+        written through a memory map, plus buffer.json with the ring
+        position, size and sampling RNG state. Files are replaced
+        atomically. Arrays still mapped from a loaded snapshot are copied
+        into memory first, so the snapshot they came from (possibly this
+        directory) can be replaced or deleted afterwards, also on Windows
+        where mapped files cannot be.
+
+        Args:
+            directory: Output directory (created if needed)
+        """
+        if self.states is None:
+            raise ValueError("Cannot save an empty ReplayBuffer before its first transition")
+
+        self._release_mappings()
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self._snapshot_arrays().items():
+            # Write next to the old file and swap, so an interrupted save
+            # leaves the previous snapshot intact
+            path = os.path.join(directory, f'{name}.npy')
+            output = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=array.dtype, shape=array.shape)
+            output[:] = array
+            output.flush()
+            del output
+            os.replace(path + '.tmp', path)
+
+        with open(os.path.join(directory, 'buffer.json'), 'w') as f:
+            json.dump(self._snapshot_meta(), f)
+
+    def _release_mappings(self):
+        """Copy arrays memory-mapped from a snapshot into memory, closing the files."""
+        for name, array in vars(self).items():
+            if isinstance(array, np.memmap):
+                setattr(self, name, np.array(array))
+
+    def load(self, directory: str, mmap_mode: Optional[str] = 'c'):
+        """
+        Restore a snapshot written by save().
+
+        With mmap_mode='c' a full buffer is not read into memory: its arrays
+        map the snapshot files copy-on-write, so loading is immediate, pages
+        are read on first access and new transitions never modify the
+        files. The mapping lasts until the next save(). A partially filled
+        buffer is copied into fresh arrays so it can keep growing.
+
+        Args:
+            directory: Snapshot directory
+            mmap_mode: np.load memory-map mode (None reads the files fully)
+        """
+        with open(os.path.join(directory, 'buffer.json')) as f:
+            meta = json.load(f)
+
+        if meta['capacity'] != self.capacity:
+            raise ValueError(f"Snapshot capacity {meta['capacity']} does not match buffer capacity {self.capacity}")
+        state_shape = tuple(meta['state_shape'])
+        if self.states is None:
+            self.state_dtype = np.dtype(meta['state_dtype'])
+            self._allocate(state_shape)
+        elif state_shape != self.state_shape:
+            raise ValueError(f"Snapshot state shape {state_shape} does not match buffer state shape {self.state_shape}")
+
+        size = meta['size']
+        for name in self._snapshot_arrays():
+            data = np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+            self._restore_array(name, data, size)
+
+        self.position = meta['position']
+        self.size = size
+        self.rng.bit_generator.state = meta['rng']
+        self._batch_size = None
+        return meta
+
+    def _restore_array(self, name: str, data: np.ndarray, size: int):
+        """Adopt a loaded snapshot array (zero-copy when it covers the whole ring)."""
+        current = getattr(self, name)
+        if isinstance(data, np.memmap) and data.shape == current.shape:
+            setattr(self, name, data)
+        else:
+            current[:len(data)] = data
+
+class SumTree:
+    def __init__(self, capacity: int):
+        """
+        Binary sum tree over leaf priorities, stored in a flat array.
+
+        Node i has children 2i and 2i+1, leaves start at tree_capacity, and
+        the root (node 1) holds the total priority. Sampling and updates walk
+        one root-to-leaf path, O(log n), and are vectorized over a batch.
+
+        Args:
+            capacity: Number of leaves
+        """
+        self.capacity = int(capacity)
+        self.tree_capacity = 1 << max(self.capacity - 1, 1).bit_length()
+        self.depth = self.tree_capacity.bit_length() - 1
+        self.tree = np.zeros(2 * self.tree_capacity, dtype=np.float64)
+
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def leaves(self, indices: np.ndarray) -> np.ndarray:
+        """Priorities stored at the given leaf indices."""
+        return self.tree[np.asarray(indices) + self.tree_capacity]
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        """Set leaf priorities and refresh the sums on their paths to the root."""
+        nodes = np.asarray(indices, dtype=np.int64) + self.tree_capacity
+        self.tree[nodes] = priorities
+
+        if len(nodes) == 1:
+            # Scalar walk is much cheaper than array ops for a single leaf
+            tree = self.tree
+            node = int(nodes[0]) // 2
+            while node >= 1:
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+                node //= 2
+            return
+
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        Find the leaves whose cumulative priority range contains each value.
+
+        Args:
+            values: Prefix-sum values in [0, total)
+
+        Returns:
+            Leaf indices
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+
+        return nodes - self.tree_capacity
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    def __init__(self, capacity: int, state_shape: Optional[Tuple[int, ...]] = None,
+                 state_dtype=np.float32, seed: Optional[int] = None,
+                 alpha: float = 0.6, beta: float = 0.4, beta_steps: int = 100000,
+                 epsilon: float = 1e-6):
+        """
+        Proportional prioritized experience replay on top of ReplayBuffer.
+
+        Transitions are sampled with probability p_i^alpha / sum_k p_k^alpha
+        through a SumTree, and importance-sampling weights correct the bias
+        of the non-uniform sampling.
+
+        Args:
+            capacity: Maximum number of transitions kept
+            state_shape: Shape of a single state
+            state_dtype: Storage dtype for states
+            seed: Optional seed for sampling
+            alpha: How strongly priorities shape sampling (0 = uniform)
+            beta: Initial importance-sampling exponent, annealed to 1
+            beta_steps: Number of sample calls over which beta reaches 1
+            epsilon: Added to |TD error| so no transition has zero priority
+        """
+        super().__init__(capacity, state_shape, state_dtype, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = (1.0 - beta) / max(beta_steps, 1)
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(self.capacity)
+
+    def add(self, state: np.ndarray, action: int, reward: float,
+            next_state: np.ndarray, done: bool) -> int:
+        """Store a transition with the current maximum priority."""
+        index = super().add(state, action, reward, next_state, done)
+        self.tree.update(np.array([index]), np.array([self.max_priority ** self.alpha]))
+        return index
+
+    def sample_indices(self, batch_size: int) -> np.ndarray:
+        """Draw indices proportionally to priority (one stratum per sample)."""
+        segment = self.tree.total() / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = self.tree.find(values)
+        # Guard against float round-off landing on an empty leaf
+        return np.minimum(indices, self.size - 1)
+
+    def importance_weights(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Importance-sampling weights for sampled indices, normalized so the
+        largest weight is 1. Anneals beta towards 1 on every call.
+        """
+        probabilities = self.tree.leaves(indices) / self.tree.total()
+        weights = (self.size * probabilities) ** (-self.beta)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return (weights / weights.max()).astype(np.float32)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Set priorities of sampled transitions from their new TD errors."""
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def _snapshot_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = super()._snapshot_arrays()
+        arrays['priority_tree'] = self.tree.tree
+        return arrays
+
+    def _snapshot_meta(self) -> Dict:
+        meta = super()._snapshot_meta()
+        meta.update(alpha=self.alpha, beta=self.beta, epsilon=self.epsilon, max_priority=self.max_priority)
+        return meta
+
+    def load(self, directory: str, mmap_mode: Optional[str] = 'c'):
+        """Restore a snapshot including priorities and the annealed beta."""
+        meta = super().load(directory, mmap_mode)
+        self.alpha = meta['alpha']
+        self.beta = meta['beta']
+        self.epsilon = meta['epsilon']
+        self.max_priority = meta['max_priority']
+        return meta
+
+    def _restore_array(self, name: str, data: np.ndarray, size: int):
+        if name == 'priority_tree':
+            # Small (2 x capacity floats) and updated every step: keep in memory
+            self.tree.tree = np.array(data, dtype=np.float64)
+        else:
+            super()._restore_array(name, data, size)
+
+class NStepBuffer:
+    def __init__(self, n_step: int, gamma: float):
+        """
+        Turns 1-step transitions into n-step transitions before they are
+        stored in a replay buffer.
+
+        Keeps the last n transitions of the running episode. Once n are
+        pending, the oldest is emitted with the discounted n-step return
+        sum_{k<n} gamma^k r_k and the state reached n steps later, so the
+        learner bootstraps with gamma^n. At episode end the remaining
+        transitions are emitted with their shorter returns (no bootstrap).
+
+        Args:
+            n_step: Number of steps to accumulate (1 = plain transitions)
+            gamma: Discount factor
+        """
+        self.n_step = max(int(n_step), 1)
+        self.gamma = gamma
+        self.discounts = gamma ** np.arange(self.n_step)
+        self.pending = deque()
+        self._last_next_state = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def reset(self):
+        """Drop pending transitions of the running episode."""
+        self.pending.clear()
+        self._last_next_state = None
+
+    def push(self, state: np.ndarray, action, reward: float,
+             next_state: np.ndarray, done: bool) -> List[Tuple]:
+        """
+        Add a transition of the running episode.
+
+        An episode that was cut off without done (e.g. at max_steps) is
+        detected when the next state does not continue from the previous
+        next_state; its pending transitions have no full n-step return and
+        are dropped.
+
+        Returns:
+            Completed (state, action, n-step return, next_state, done) tuples
+        """
+        if self.n_step == 1:
+            return [(state, action, reward, next_state, done)]
+
+        if self.pending and not np.array_equal(state, self._last_next_state):
+            self.reset()
+
+        # Copy: environments may update their state arrays in place
+        next_state = np.array(next_state, copy=True)
+        self.pending.append((np.array(state, copy=True), action, reward))
+        self._last_next_state = next_state
+
+        if done:
+            completed = []
+            n_step_return = 0.0
+            for pending_state, pending_action, pending_reward in reversed(self.pending):
+                n_step_return = pending_reward + self.gamma * n_step_return
+                completed.append((pending_state, pending_action, n_step_return, next_state, True))
+            self.reset()
+            completed.reverse()
+            return completed
+
+        if len(self.pending) < self.n_step:
+            return []
+
+        rewards = np.fromiter((pending[2] for pending in self.pending), dtype=np.float64,
+                              count=self.n_step)
+        first_state, first_action, _ = self.pending.popleft()
+        return [(first_state, first_action, float(rewards @ self.discounts), next_state, False)]
+
+class SharedReplayBuffer(ReplayBuffer):
+    def __init__(self, capacity: int, state_shape: Tuple[int, ...],
+                 state_dtype=np.float32, seed: Optional[int] = None, context=None):
+        """
+        ReplayBuffer whose arrays live in shared memory, so several actor
+        processes can add transitions that a learner process samples.
+
+        add() is serialized with a process-shared lock; sampling does not
+        lock, so a row that is being overwritten at that moment may be read
+        half-updated, which off-policy DQN tolerates. Pass the buffer to
+        child processes as a Process argument; the creating process owns the
+        memory and should call unlink() when training is done.
+
+        Args:
+            capacity: Maximum number of transitions kept
+            state_shape: Shape of a single state (required)
+            state_dtype: Storage dtype for states
+            seed: Optional seed for index sampling
+            context: multiprocessing context used for the lock (default spawn)
+        """
+        context = context or mp.get_context('spawn')
+        self._lock = context.Lock()
+        # position, size, total transitions added
+        self._counters = context.RawArray('q', 3)
+        self._shared_blocks = {}
+        self._owner = True
+        super().__init__(capacity, state_shape, state_dtype, seed)
+
+    @property
+    def position(self) -> int:
+        return self._counters[0]
+
+    @position.setter
+    def position(self, value: int):
+        self._counters[0] = value
+
+    @property
+    def size(self) -> int:
+        return self._counters[1]
+
+    @size.setter
+    def size(self, value: int):
+        self._counters[1] = value
+
+    @property
+    def total_added(self) -> int:
+        return self._counters[2]
+
+    def _field_specs(self):
+        return {
+            'states': ((self.capacity,) + self.state_shape, self.state_dtype),
+            'next_states': ((self.capacity,) + self.state_shape, self.state_dtype),
+            'actions': ((self.capacity,), np.int64),
+            'rewards': ((self.capacity,), np.float32),
+            'dones': ((self.capacity,), bool),
+        }
+
+    def _allocate(self, state_shape: Tuple[int, ...]):
+        """Allocate every field in its own shared memory block."""
+        self.state_shape = state_shape
+        for name, (shape, dtype) in self._field_specs().items():
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._shared_blocks[name] = block
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shared_blocks'] = {name: block.name for name, block in self._shared_blocks.items()}
+        for name in self._field_specs():
+            state.pop(name)
+        for name in ('_batch_states', '_batch_next_states', '_batch_actions',
+                     '_batch_rewards', '_batch_dones'):
+            state.pop(name, None)
+        state['_batch_size'] = None
+        return state
+
+    def __setstate__(self, state):
+        block_names = state.pop('_shared_blocks')
+        self.__dict__.update(state)
+        self._owner = False
+        self._shared_blocks = {}
+        for name, (shape, dtype) in self._field_specs().items():
+            block = shared_memory.SharedMemory(name=block_names[name])
+            self._shared_blocks[name] = block
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    def add(self, state: np.ndarray, action: int, reward: float,
+            next_state: np.ndarray, done: bool) -> int:
+        """Store a transition (process-safe)."""
+        with self._lock:
+            index = super().add(state, action, reward, next_state, done)
+            self._counters[2] += 1
+        return index
+
+    def _restore_array(self, name: str, data: np.ndarray, size: int):
+        # Always copy into the shared blocks so other processes see the data
+        getattr(self, name)[:len(data)] = data
+
+    def close(self):
+        """Detach this process from the shared memory blocks."""
+        for name in self._field_specs():
+            setattr(self, name, None)
+        for block in self._shared_blocks.values():
+            block.close()
+
+    def unlink(self):
+        """Close and free the shared memory (creating process only)."""
+        self.close()
+        if self._owner:
+            for block in self._shared_blocks.values():
+                block.unlink()
+        self._shared_blocks = {}
@@ -0,0 +1,130 @@
+import os
+import pickle
+import random
+import shutil
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_RESUME_DIR = os.path.join('model', 'checkpoints', 'resume')
+
+# Isi snapshot: bobot model/target, state optimizer, replay buffer (.npy per field),
+# dan state.pkl (epsilon, n-step pending, RNG, progress training)
+_STATE_FILE = 'state.pkl'
+
+def _optimizer_variables(agent):
+    """Optimizer variables of the agent's main network, building the optimizer if needed."""
+    optimizer = agent.model.optimizer
+    if not optimizer.built:
+        optimizer.build(agent.model.trainable_variables)
+    return optimizer.variables
+
+def has_training_state(directory: str = DEFAULT_RESUME_DIR) -> bool:
+    """Whether a complete training snapshot exists in directory."""
+    return os.path.exists(os.path.join(directory, _STATE_FILE))
+
+def save_training_state(agent, progress: Dict, directory: str = DEFAULT_RESUME_DIR) -> str:
+    """
+    Snapshot everything needed to continue training exactly where it stopped.
+
+    Saves main/target network weights, the optimizer variables (Adam
+    moments and iteration count), the replay buffer, epsilon, the pending
+    n-step transitions, the Python/NumPy RNG states and the caller's
+    progress (next episode, step counter, results so far). The snapshot is
+    written to a temporary directory and swapped in, so an interruption
+    while saving leaves the previous snapshot intact.
+
+    Args:
+        agent: Keras DQNAgent
+        progress: Training loop state (picklable), returned by load_training_state
+        directory: Snapshot directory
+
+    Returns:
+        Snapshot directory
+    """
+    directory = directory.rstrip(os.sep)
+    tmp_directory = directory + '.tmp'
+    old_directory = directory + '.old'
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    np.savez(os.path.join(tmp_directory, 'model.npz'), *agent.model.get_weights())
+    np.savez(os.path.join(tmp_directory, 'target_model.npz'), *agent.target_model.get_weights())
+    np.savez(os.path.join(tmp_directory, 'optimizer.npz'),
+             *[np.asarray(variable) for variable in _optimizer_variables(agent)])
+    if len(agent.memory) > 0:
+        agent.memory.save(os.path.join(tmp_directory, 'replay'))
+
+    state = {
+        'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'state_size': agent.state_size,
+        'action_size': agent.action_size,
+        'epsilon': agent.epsilon,
+        'n_step_pending': list(agent.n_step_buffer.pending),
+        'n_step_last_next_state': agent.n_step_buffer._last_next_state,
+        'python_random': random.getstate(),
+        'numpy_random': np.random.get_state(),
+        'progress': progress
+    }
+    with open(os.path.join(tmp_directory, _STATE_FILE), 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Swap: the old snapshot is only removed once the new one is in place.
+    # memory.save above released any mapping of the old replay files, which
+    # would otherwise block renaming/removing them on Windows
+    shutil.rmtree(old_directory, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, old_directory)
+    os.replace(tmp_directory, directory)
+    shutil.rmtree(old_directory, ignore_errors=True)
+    return directory
+
+def load_training_state(agent, directory: str = DEFAULT_RESUME_DIR, mmap_mode: Optional[str] = 'c') -> Optional[Dict]:
+    """
+    Restore a snapshot written by save_training_state into a freshly built agent.
+
+    The replay buffer is memory-mapped (see ReplayBuffer.load), so resuming
+    does not re-fill it or read it all from disk up front.
+
+    Args:
+        agent: Keras DQNAgent built with the same config
+        directory: Snapshot directory
+        mmap_mode: Memory-map mode for the replay buffer arrays
+
+    Returns:
+        The saved progress dict, or None when there is no snapshot
+    """
+    if not has_training_state(directory):
+        return None
+
+    with open(os.path.join(directory, _STATE_FILE), 'rb') as f:
+        state = pickle.load(f)
+    if (state['state_size'], state['action_size']) != (agent.state_size, agent.action_size):
+        raise ValueError(f"Snapshot in {directory} is for state/action size "
+                         f"{state['state_size']}/{state['action_size']}, agent has "
+                         f"{agent.state_size}/{agent.action_size}")
+
+    with np.load(os.path.join(directory, 'model.npz')) as data:
+        agent.model.set_weights([data[f'arr_{i}'] for i in range(len(data.files))])
+    with np.load(os.path.join(directory, 'target_model.npz')) as data:
+        agent.target_model.set_weights([data[f'arr_{i}'] for i in range(len(data.files))])
+    with np.load(os.path.join(directory, 'optimizer.npz')) as data:
+        variables = _optimizer_variables(agent)
+        if len(variables) != len(data.files):
+            raise ValueError(f"Snapshot has {len(data.files)} optimizer variables, agent has {len(variables)}")
+        for i, variable in enumerate(variables):
+            variable.assign(data[f'arr_{i}'])
+
+    replay_directory = os.path.join(directory, 'replay')
+    if os.path.exists(replay_directory):
+        agent.memory.load(replay_directory, mmap_mode=mmap_mode)
+
+    agent.epsilon = state['epsilon']
+    agent.n_step_buffer.reset()
+    agent.n_step_buffer.pending.extend(state['n_step_pending'])
+    agent.n_step_buffer._last_next_state = state['n_step_last_next_state']
+    random.setstate(state['python_random'])
+    np.random.set_state(state['numpy_random'])
+
+    return state['progress']
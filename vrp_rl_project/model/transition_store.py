@@ -0,0 +1,344 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_STORE_ROOT = os.path.join('data', 'transitions')
+
+# Satu dataset = satu direktori berisi dataset.json (spec) dan chunk_<writer>_<seq>_<rows>.npz
+_FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones', 'episodes')
+_SPEC_FILE = 'dataset.json'
+
+def dataset_name(state_size: int, action_size: int, prefix: str = 'dqn') -> str:
+    """Default dataset name: one dataset per environment spec."""
+    return f'{prefix}_s{state_size}_a{action_size}'
+
+def _chunk_rows(path: str) -> int:
+    """Row count encoded in the chunk file name."""
+    return int(os.path.basename(path)[:-len('.npz')].rsplit('_', 1)[1])
+
+class TransitionWriter:
+    def __init__(self, directory: str, chunk_size: int = 10000, state_dtype=np.float32,
+                 metadata: Optional[Dict] = None):
+        """
+        Append-only columnar transition store on disk.
+
+        Transitions are collected in preallocated arrays and written as one
+        uncompressed .npz chunk (one array per field) every chunk_size rows.
+        Chunk names are unique per writer, so several runs or actor
+        processes can write to the same dataset at the same time; chunks
+        are written to a temporary name and renamed, so readers never see a
+        partial chunk. The last partial chunk is written by close() (also
+        registered at interpreter exit).
+
+        Args:
+            directory: Dataset directory (created if needed)
+            chunk_size: Transitions per chunk file
+            state_dtype: Storage dtype for states
+            metadata: Extra fields for dataset.json when the dataset is created
+        """
+        self.directory = directory
+        self.chunk_size = max(int(chunk_size), 1)
+        self.state_dtype = np.dtype(state_dtype)
+        self.metadata = metadata or {}
+        self.writer_id = f'{time.strftime("%Y%m%d%H%M%S")}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+
+        self.state_shape = None
+        self.count = 0
+        self.sequence = 0
+        self.episode = 0
+        self._batch_episodes = None
+        self.total_written = 0
+        self.closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        spec_path = os.path.join(directory, _SPEC_FILE)
+        if os.path.exists(spec_path):
+            with open(spec_path) as f:
+                spec = json.load(f)
+            self._allocate(tuple(spec['state_shape']))
+
+        atexit.register(self.close)
+
+    def _allocate(self, state_shape: Tuple[int, ...]):
+        self.state_shape = state_shape
+        self.buffers = {
+            'states': np.zeros((self.chunk_size,) + state_shape, dtype=self.state_dtype),
+            'actions': np.zeros(self.chunk_size, dtype=np.int64),
+            'rewards': np.zeros(self.chunk_size, dtype=np.float32),
+            'next_states': np.zeros((self.chunk_size,) + state_shape, dtype=self.state_dtype),
+            'dones': np.zeros(self.chunk_size, dtype=bool),
+            'episodes': np.zeros(self.chunk_size, dtype=np.int64)
+        }
+
+    def _write_spec(self):
+        """Create dataset.json on first write (kept as is when another writer was first)."""
+        spec_path = os.path.join(self.directory, _SPEC_FILE)
+        if os.path.exists(spec_path):
+            return
+        spec = {
+            'state_shape': list(self.state_shape),
+            'state_dtype': self.state_dtype.str,
+            'fields': list(_FIELDS),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **self.metadata
+        }
+        tmp_path = f'{spec_path}.{self.writer_id}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(spec, f, indent=2)
+        os.replace(tmp_path, spec_path)
+
+    def add(self, state: np.ndarray, action: int, reward: float,
+            next_state: np.ndarray, done: bool):
+        """Store one transition. Episodes are numbered per writer, split at done."""
+        if self.state_shape is None:
+            self._allocate(np.shape(state))
+        elif np.shape(state) != self.state_shape:
+            raise ValueError(f"State shape {np.shape(state)} does not match dataset shape {self.state_shape}")
+
+        index = self.count
+        buffers = self.buffers
+        buffers['states'][index] = state
+        buffers['actions'][index] = action
+        buffers['rewards'][index] = reward
+        buffers['next_states'][index] = next_state
+        buffers['dones'][index] = done
+        buffers['episodes'][index] = self.episode
+        self.count += 1
+
+        if done:
+            self.episode += 1
+        if self.count == self.chunk_size:
+            self.flush()
+
+    def add_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                  next_states: np.ndarray, dones: np.ndarray):
+        """
+        Store one transition per instance of a vector environment (row i
+        always comes from instance i). Every instance gets its own episode
+        numbers, so use a writer either with add() or with add_batch().
+        """
+        states = np.asarray(states)
+        dones = np.asarray(dones, dtype=bool)
+        batch_size = len(dones)
+        if self.state_shape is None:
+            self._allocate(states.shape[1:])
+        elif states.shape[1:] != self.state_shape:
+            raise ValueError(f"State shape {states.shape[1:]} does not match dataset shape {self.state_shape}")
+        if self._batch_episodes is None or len(self._batch_episodes) != batch_size:
+            self._batch_episodes = self.episode + np.arange(batch_size)
+            self.episode += batch_size
+
+        fields = {'states': states, 'actions': actions, 'rewards': rewards, 'next_states': next_states,
+                  'dones': dones, 'episodes': self._batch_episodes}
+        start = 0
+        while start < batch_size:
+            rows = min(batch_size - start, self.chunk_size - self.count)
+            for field, values in fields.items():
+                self.buffers[field][self.count:self.count + rows] = values[start:start + rows]
+            self.count += rows
+            start += rows
+            if self.count == self.chunk_size:
+                self.flush()
+
+        # Finished instances continue with a new episode
+        finished = np.flatnonzero(dones)
+        self._batch_episodes[finished] = self.episode + np.arange(len(finished))
+        self.episode += len(finished)
+
+    def flush(self):
+        """Write the collected transitions as a chunk (no-op when empty)."""
+        if self.count == 0:
+            return
+
+        self._write_spec()
+        name = f'chunk_{self.writer_id}_{self.sequence:06d}_{self.count}.npz'
+        path = os.path.join(self.directory, name)
+        tmp_path = path[:-len('.npz')] + '.tmp.npz'
+        np.savez(tmp_path, **{field: array[:self.count] for field, array in self.buffers.items()})
+        os.replace(tmp_path, path)
+
+        self.total_written += self.count
+        self.sequence += 1
+        self.count = 0
+
+    def close(self):
+        """Write the last partial chunk."""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class TransitionDataset:
+    def __init__(self, directory: str):
+        """
+        Read side of a transition store written by TransitionWriter.
+
+        Chunks are discovered by listing the directory, so transitions
+        written by other runs after opening are picked up by refresh().
+
+        Args:
+            directory: Dataset directory
+        """
+        self.directory = directory
+        spec_path = os.path.join(directory, _SPEC_FILE)
+        if not os.path.exists(spec_path):
+            raise FileNotFoundError(f"No transition dataset in {directory}")
+        with open(spec_path) as f:
+            self.spec = json.load(f)
+        self.state_shape = tuple(self.spec['state_shape'])
+        self.refresh()
+
+    def refresh(self):
+        """Re-list the chunk files."""
+        self.chunks = sorted(glob.glob(os.path.join(self.directory, 'chunk_*[0-9].npz')))
+        self.chunk_rows = [_chunk_rows(path) for path in self.chunks]
+
+    def __len__(self) -> int:
+        return sum(self.chunk_rows)
+
+    def load_chunk(self, index: int) -> Dict[str, np.ndarray]:
+        with np.load(self.chunks[index]) as data:
+            return {field: data[field] for field in _FIELDS}
+
+    def _windows(self, order: List[int], window_chunks: int) -> Iterator[Dict[str, np.ndarray]]:
+        """Concatenate consecutive chunks of order into windows."""
+        for start in range(0, len(order), window_chunks):
+            loaded = [self.load_chunk(index) for index in order[start:start + window_chunks]]
+            yield {field: np.concatenate([chunk[field] for chunk in loaded]) for field in _FIELDS}
+
+    def iter_batches(self, batch_size: int, shuffle: bool = True, seed: Optional[int] = None,
+                     window_chunks: int = 4, drop_last: bool = True,
+                     prefetch: bool = True) -> Iterator[Tuple[np.ndarray, ...]]:
+        """
+        Stream minibatches from disk for one pass over the dataset.
+
+        Only window_chunks chunks are held in memory at a time (two windows
+        with prefetch, which loads the next window in a background thread
+        while the current one is consumed). With shuffle the chunk order
+        and the rows inside each window are permuted, an approximate
+        shuffle whose quality grows with window_chunks.
+
+        Args:
+            batch_size: Transitions per batch
+            shuffle: Shuffle chunk order and rows within a window
+            seed: Shuffle seed
+            window_chunks: Chunks loaded and mixed together
+            drop_last: Skip the last incomplete batch of each window
+            prefetch: Load the next window in a background thread
+
+        Yields:
+            states, actions, rewards, next_states, dones
+        """
+        rng = np.random.default_rng(seed)
+        order = list(rng.permutation(len(self.chunks))) if shuffle else list(range(len(self.chunks)))
+        windows = self._windows(order, max(int(window_chunks), 1))
+        if prefetch:
+            windows = _prefetch(windows)
+
+        for window in windows:
+            n = len(window['actions'])
+            rows = rng.permutation(n) if shuffle else np.arange(n)
+            end = n - n % batch_size if drop_last else n
+            for start in range(0, end, batch_size):
+                index = rows[start:start + batch_size]
+                yield (window['states'][index], window['actions'][index], window['rewards'][index],
+                       window['next_states'][index], window['dones'][index])
+
+    def fill_buffer(self, buffer, max_transitions: Optional[int] = None) -> int:
+        """
+        Copy the most recent transitions into a ReplayBuffer (e.g. to start
+        online training from earlier experience).
+
+        Returns:
+            Number of transitions added
+        """
+        limit = buffer.capacity if max_transitions is None else min(max_transitions, buffer.capacity)
+        selected, rows = [], 0
+        for index in reversed(range(len(self.chunks))):
+            if rows >= limit:
+                break
+            selected.append(index)
+            rows += self.chunk_rows[index]
+
+        # Oldest selected chunk is only partly needed
+        skip = max(rows - limit, 0)
+        added = 0
+        for chunk in self._windows(list(reversed(selected)), 1):
+            n = len(chunk['actions'])
+            for i in range(skip, n):
+                buffer.add(chunk['states'][i], chunk['actions'][i], chunk['rewards'][i],
+                           chunk['next_states'][i], chunk['dones'][i])
+            added += n - skip
+            skip = 0
+        return added
+
+def _prefetch(iterator: Iterator, depth: int = 1) -> Iterator:
+    """Run an iterator in a background thread, keeping up to depth items ready."""
+    items = queue.Queue(maxsize=depth)
+    finished = object()
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(e)
+        put(finished)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is finished:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Consumer stopped early: let the producer exit instead of blocking
+        stop.set()
+
+def open_writer(config: Dict, state_size: int, action_size: int,
+                prefix: str = 'dqn') -> Optional[TransitionWriter]:
+    """
+    Transition writer for the offline_data config section, or None when
+    offline_data.enabled is false.
+    """
+    settings = config.get('offline_data', {})
+    if not settings.get('enabled', False):
+        return None
+
+    name = settings.get('dataset') or dataset_name(state_size, action_size, prefix)
+    return TransitionWriter(
+        os.path.join(settings.get('root', DEFAULT_STORE_ROOT), name),
+        chunk_size=settings.get('chunk_size', 10000),
+        metadata={'state_size': state_size, 'action_size': action_size}
+    )
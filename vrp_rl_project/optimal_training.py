@@ -7,10 +7,12 @@ Menggunakan fixed environment dan model optimal
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from collections import deque
 import random
 import yaml
 from fixed_vrp_env import FixedVRPEnvironment
+from model.transition_store import open_writer
+from utils import load_config
+from model.replay_buffer import ReplayBuffer
 
 class OptimalDQNAgent:
     """Optimal DQN Agent dengan arsitektur yang sudah dioptimasi"""
@@ -30,14 +32,14 @@ class OptimalDQNAgent:
         self.target_update = 5
         
         # Memory
-        self.memory = deque(maxlen=self.memory_size)
+        self.memory = ReplayBuffer(self.memory_size, state_shape=(state_size,))
         
         # Model (simplified for demonstration)
         self.q_table = {}  # Simple Q-table for now
         
     def remember(self, state, action, reward, next_state, done):
         """Store experience in memory"""
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
     
     def act(self, state, valid_actions=None):
         """Choose action using epsilon-greedy policy"""
@@ -58,10 +60,10 @@ class OptimalDQNAgent:
         if len(self.memory) < self.batch_size:
             return 0.0
         
-        batch = random.sample(self.memory, self.batch_size)
+        batch = self.memory.sample(self.batch_size)
         total_loss = 0.0
         
-        for state, action, reward, next_state, done in batch:
+        for state, action, reward, next_state, done in zip(*batch):
             state_key = tuple(state)
             next_state_key = tuple(next_state)
             
@@ -108,7 +110,8 @@ def train_optimal_model():
     
     # Create environment
     customers_df = create_training_data()
-    env = FixedVRPEnvironment(customers_df, n_vehicles=1)
+    transition_writer = open_writer(load_config(), 5 + len(customers_df), len(customers_df), prefix='fixed')
+    env = FixedVRPEnvironment(customers_df, n_vehicles=1, transition_writer=transition_writer)
     
     # Create agent
     state_size = 9  # Based on debug results
@@ -180,6 +183,9 @@ def train_optimal_model():
                   f"Epsilon={agent.epsilon:.3f}")
             print(f"  Avg Reward: {avg_reward:.2f}, Avg Completion: {avg_completion:.2f}")
     
+    if transition_writer is not None:
+        transition_writer.flush()
+    
     return agent, rewards_history, distances_history, completion_rates, epsilons
 
 def plot_training_results(rewards, distances, completions, epsilons):
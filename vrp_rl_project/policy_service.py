@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+Policy Service untuk DQN VRP
+Export policy ke TorchScript/ONNX dan inference worker CPU dengan micro-batching
+"""
+
+import argparse
+import io
+import json
+import os
+import queue
+import threading
+import time
+import warnings
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+POLICY_METADATA_FILE = 'policy.json'
+
+def _keras_dense_weights(weights_path: str) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], bool]:
+    """
+    Read (kernel, bias) pairs of a Keras Dense stack from a .weights.h5 file.
+
+    Dueling models (model.dqn_model.DQNAgent with advanced_dqn.dueling_dqn)
+    store the value and advantage heads as the last two Dense layers,
+    combined by a lambda layer.
+
+    Returns:
+        (Dense (kernel, bias) pairs in build order, whether the model is dueling)
+    """
+    import h5py
+
+    layers = []
+    with h5py.File(weights_path, 'r') as f:
+        group = f['layers']
+        names = [name for name in group.keys() if name.startswith('dense')]
+        others = sorted(set(group.keys()) - set(names) - {'input_layer'})
+        dueling = others == ['lambda']
+        if others and not dueling:
+            raise ValueError(f"{weights_path} is not a Dense stack or dueling network (found layers {list(group.keys())})")
+
+        def layer_number(name):
+            suffix = name[len('dense'):].lstrip('_')
+            return int(suffix) if suffix else 0
+
+        for name in sorted(names, key=layer_number):
+            variables = group[name]['vars']
+            layers.append((variables['0'][()], variables['1'][()]))
+
+    if dueling and (len(layers) < 3 or layers[-2][0].shape[1] != 1
+                    or layers[-2][0].shape[0] != layers[-1][0].shape[0]):
+        raise ValueError(f"{weights_path} has a lambda layer but no value/advantage Dense heads")
+    return layers, dueling
+
+def load_policy_network(weights_path: str):
+    """
+    Build a torch module for a trained policy, detecting the architecture
+    from the weights file.
+
+    Supported: Keras Dense stacks and dueling networks (model/dqn_*.weights.h5,
+    relu hidden layers as built by model.dqn_model.DQNAgent) and the torch
+    DQN, DuelingDQN, ImprovedDQN and ImprovedDuelingDQN state dicts (.pth).
+
+    Returns:
+        (module in eval mode, state_size, action_size)
+    """
+    import torch
+    import torch.nn as nn
+
+    def linear_layer(kernel, bias):
+        linear = nn.Linear(kernel.shape[0], kernel.shape[1])
+        with torch.no_grad():
+            linear.weight.copy_(torch.from_numpy(kernel.T.copy()))
+            linear.bias.copy_(torch.from_numpy(bias))
+        return linear
+
+    if weights_path.endswith('.h5'):
+        dense_layers, dueling = _keras_dense_weights(weights_path)
+        hidden_layers = dense_layers[:-2] if dueling else dense_layers[:-1]
+        modules = []
+        for kernel, bias in hidden_layers:
+            modules.extend([linear_layer(kernel, bias), nn.ReLU()])
+
+        if dueling:
+            class KerasDuelingNetwork(nn.Module):
+                def __init__(self, hidden, value, advantage):
+                    super().__init__()
+                    self.hidden = hidden
+                    self.value = value
+                    self.advantage = advantage
+
+                def forward(self, x):
+                    x = self.hidden(x)
+                    # Q(s, a) = V(s) + A(s, a) - mean_a A(s, a), as the Keras lambda layer
+                    advantage = self.advantage(x)
+                    return self.value(x) + advantage - advantage.mean(dim=-1, keepdim=True)
+
+            network = KerasDuelingNetwork(nn.Sequential(*modules), linear_layer(*dense_layers[-2]),
+                                          linear_layer(*dense_layers[-1]))
+        else:
+            network = nn.Sequential(*modules, linear_layer(*dense_layers[-1]))
+        state_size, action_size = dense_layers[0][0].shape[0], dense_layers[-1][0].shape[1]
+    else:
+        state_dict = torch.load(weights_path, map_location='cpu')
+        state_size = state_dict['fc1.weight'].shape[1]
+        if 'value.weight' in state_dict:
+            action_size = state_dict['advantage.weight'].shape[0]
+            if 'fc3.weight' in state_dict:
+                from improved_training import ImprovedDuelingDQN as network_class
+            else:
+                from dqn_model import DuelingDQN as network_class
+        elif 'fc4.weight' in state_dict:
+            from improved_training import ImprovedDQN as network_class
+            action_size = state_dict['fc4.weight'].shape[0]
+        else:
+            from dqn_model import DQN as network_class
+            action_size = state_dict['fc3.weight'].shape[0]
+        network = network_class(state_size, action_size)
+        network.load_state_dict(state_dict)
+
+    network.eval()
+    return network, int(state_size), int(action_size)
+
+def quantize_policy(network):
+    """
+    Post-training dynamic int8 quantization: Linear weights are stored as
+    int8 (one scale per output unit) and activations are quantized per
+    batch at run time, so no calibration data is needed.
+
+    The first Linear layer stays fp32. It sees the raw state, where
+    capacity (up to ~6000) and time (~24) share one activation scale with
+    the 0/1 visit flags, so quantizing its input erases the flags.
+    """
+    import torch
+    import torch.nn as nn
+    from torch.ao.quantization import per_channel_dynamic_qconfig, quantize_dynamic
+
+    linear_layers = [name for name, module in network.named_modules() if isinstance(module, nn.Linear)]
+    qconfig_spec = {name: per_channel_dynamic_qconfig for name in linear_layers[1:]}
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, still supported here
+        warnings.simplefilter('ignore')
+        return quantize_dynamic(network, qconfig_spec, dtype=torch.qint8)
+
+def policy_validation_states(state_size: int, action_size: int, validation_path: Optional[str] = None,
+                             n_states: int = 2048, seed: int = 0) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Fixed validation states for comparing a quantized policy with fp32.
+
+    Uses the 'states' array of an .npz file when given (e.g. the cached
+    validation set of eval_mse_checkpoints.py). Otherwise, for the
+    VRPDynamicEnv layout (state_size == 5 + action_size), states come from
+    random-action rollouts on seeded random instances; any other layout
+    falls back to uniform random states.
+
+    Returns:
+        (states, valid-action masks or None)
+    """
+    vrp_layout = state_size == 5 + action_size
+    if validation_path:
+        with np.load(validation_path) as data:
+            states = data['states'].astype(np.float32)[:n_states]
+    elif vrp_layout:
+        from env.vrp_env import VRPDynamicEnv
+        from model.attention_policy import random_instance
+
+        rng = np.random.default_rng(seed)
+        states = []
+        while len(states) < n_states:
+            env = VRPDynamicEnv(random_instance(action_size - 1, rng), n_vehicles=action_size)
+            state, done = env.reset(), False
+            while not done and len(states) < n_states:
+                states.append(state)
+                mask = env.action_masks()
+                if not mask.any():
+                    break
+                state, _, done, _ = env.step(int(rng.choice(np.flatnonzero(mask))))
+        states = np.array(states, dtype=np.float32)
+    else:
+        states = np.random.default_rng(seed).random((n_states, state_size), dtype=np.float32)
+
+    if states.shape[1] != state_size:
+        raise ValueError(f"Validation states have size {states.shape[1]}, policy expects {state_size}")
+    masks = states[:, 5:] > 0.5 if vrp_layout else None
+    return states, masks
+
+def compare_policies(reference, candidate, states: np.ndarray, masks: Optional[np.ndarray] = None) -> Dict:
+    """Action agreement and Q-value error of candidate vs reference on fixed states."""
+    import torch
+
+    with torch.inference_mode():
+        expected = reference(torch.from_numpy(states)).numpy()
+        actual = candidate(torch.from_numpy(states)).numpy()
+
+    result = {
+        'states': int(len(states)),
+        'action_agreement': float(np.mean(expected.argmax(1) == actual.argmax(1))),
+        'max_abs_error': float(np.abs(expected - actual).max()),
+        'mean_abs_error': float(np.abs(expected - actual).mean())
+    }
+    if masks is not None:
+        valid = masks.any(1)
+        masked_expected = np.where(masks, expected, -np.inf)[valid].argmax(1)
+        masked_actual = np.where(masks, actual, -np.inf)[valid].argmax(1)
+        result['masked_action_agreement'] = float(np.mean(masked_expected == masked_actual))
+    return result
+
+def benchmark_latency(module, state_size: int, batch_size: int = 1, repeats: int = 200) -> float:
+    """Median forward-pass latency in milliseconds."""
+    import torch
+
+    states = torch.rand(batch_size, state_size)
+    timings = []
+    with torch.inference_mode():
+        for _ in range(10):
+            module(states)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            module(states)
+            timings.append(time.perf_counter() - start)
+    return 1000.0 * float(np.median(timings))
+
+def serialized_size(module) -> int:
+    """Bytes of the module's state dict as saved by torch.save."""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+def quantization_report(network, state_size: int, action_size: int,
+                        validation_path: Optional[str] = None) -> Tuple[object, Dict]:
+    """
+    Quantize a policy network and measure what it costs and saves.
+
+    Returns:
+        (quantized network, report with accuracy, latency and size)
+    """
+    quantized = quantize_policy(network)
+    states, masks = policy_validation_states(state_size, action_size, validation_path)
+
+    report = {'accuracy': compare_policies(network, quantized, states, masks)}
+    for name, module in (('fp32', network), ('int8', quantized)):
+        report[name] = {
+            'latency_ms_batch_1': benchmark_latency(module, state_size, 1),
+            'latency_ms_batch_64': benchmark_latency(module, state_size, 64, repeats=50),
+            'size_bytes': serialized_size(module)
+        }
+    report['speedup_batch_1'] = report['fp32']['latency_ms_batch_1'] / report['int8']['latency_ms_batch_1']
+    report['speedup_batch_64'] = report['fp32']['latency_ms_batch_64'] / report['int8']['latency_ms_batch_64']
+    report['size_ratio'] = report['int8']['size_bytes'] / report['fp32']['size_bytes']
+    return quantized, report
+
+def export_policy(weights_path: str, output_path: str, onnx_path: Optional[str] = None,
+                  quantize: bool = False, validation_path: Optional[str] = None,
+                  min_agreement: float = 0.99) -> Dict:
+    """
+    Export a trained policy to TorchScript (and optionally ONNX).
+
+    The TorchScript file embeds state/action sizes as metadata so the
+    inference worker can validate requests without the training code.
+    With quantize=True the TorchScript model is dynamically int8-quantized,
+    after checking that it picks the same (valid) action as the fp32
+    policy on at least min_agreement of the validation states; the
+    accuracy/latency/size report is stored in the metadata. The ONNX
+    export stays fp32.
+
+    Returns:
+        Policy metadata
+    """
+    import torch
+
+    network, state_size, action_size = load_policy_network(weights_path)
+    metadata = {
+        'state_size': state_size,
+        'action_size': action_size,
+        'source': os.path.basename(weights_path),
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quantized': quantize
+    }
+
+    scripted_network = network
+    if quantize:
+        scripted_network, report = quantization_report(network, state_size, action_size, validation_path)
+        accuracy = report['accuracy']
+        agreement = accuracy.get('masked_action_agreement', accuracy['action_agreement'])
+        if agreement < min_agreement:
+            raise ValueError(f"Quantized policy agrees with fp32 on {agreement:.1%} of validation states "
+                             f"(required {min_agreement:.1%}); export the fp32 policy instead")
+        metadata['quantization'] = report
+
+    example = torch.zeros(1, state_size)
+    with torch.inference_mode():
+        scripted = torch.jit.trace(scripted_network, example)
+    scripted = torch.jit.freeze(scripted.eval())
+    torch.jit.save(scripted, output_path, _extra_files={POLICY_METADATA_FILE: json.dumps(metadata)})
+
+    if onnx_path:
+        torch.onnx.export(
+            network, example, onnx_path,
+            input_names=['state'], output_names=['q_values'],
+            dynamic_axes={'state': {0: 'batch'}, 'q_values': {0: 'batch'}}
+        )
+
+    return metadata
+
+class PolicyWorker:
+    """
+    Loads an exported policy once and serves Q-values to concurrent callers.
+
+    Requests are queued and a background thread runs them as one batched
+    forward pass: it collects requests until max_batch_size is reached, all
+    active decoding sessions have a request waiting, or max_wait_ms has
+    passed since the first one arrived. A lone caller is therefore never
+    delayed, while concurrent route requests share forward passes.
+    """
+
+    def __init__(self, model_path: str, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 num_threads: Optional[int] = None):
+        """
+        Initialize worker.
+
+        Args:
+            model_path: TorchScript (.pt) or ONNX (.onnx) file from export_policy
+            max_batch_size: Maximum number of requests per forward pass
+            max_wait_ms: Maximum time to wait for more requests to batch
+            num_threads: Intra-op CPU threads for inference (default: library default)
+        """
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        if model_path.endswith('.onnx'):
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+            self._session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+            model_input = self._session.get_inputs()[0]
+            self._input_name = model_input.name
+            self.state_size = int(model_input.shape[1])
+            self.action_size = int(self._session.get_outputs()[0].shape[1])
+            self._forward = lambda states: self._session.run(None, {self._input_name: states})[0]
+        else:
+            import torch
+
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            extra_files = {POLICY_METADATA_FILE: ''}
+            self._module = torch.jit.load(model_path, map_location='cpu', _extra_files=extra_files)
+            self._module.eval()
+            metadata = json.loads(extra_files[POLICY_METADATA_FILE] or '{}')
+            self.state_size = metadata['state_size']
+            self.action_size = metadata['action_size']
+
+            def forward(states):
+                with torch.inference_mode():
+                    return self._module(torch.from_numpy(states)).numpy()
+            self._forward = forward
+
+        self._batch = np.zeros((max_batch_size, self.state_size), dtype=np.float32)
+        self._requests = queue.Queue()
+        self._active_sessions = 0
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.requests = 0
+
+        self._thread = threading.Thread(target=self._run, name='policy-worker', daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def session(self):
+        """Mark a caller that will send a sequence of requests (e.g. one route decode)."""
+        with self._lock:
+            self._active_sessions += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._active_sessions -= 1
+
+    def submit(self, state: np.ndarray) -> Future:
+        """Queue one state; the future resolves to its Q-values."""
+        future = Future()
+        self._requests.put((np.asarray(state, dtype=np.float32), future))
+        return future
+
+    def q_values(self, state: np.ndarray) -> np.ndarray:
+        """Q-values for one state (blocks until its batch has run)."""
+        return self.submit(state).result()
+
+    def q_values_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Q-values for a batch of states in one forward pass on the calling
+        thread (for callers that already batch, e.g. beam search).
+        """
+        return self._forward(np.ascontiguousarray(states, dtype=np.float32))
+
+    def _collect(self, first) -> List:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if len(batch) >= max(self._active_sessions, 1) and self._requests.empty():
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                break
+
+            batch = self._collect(first)
+            size = len(batch)
+            for i, (state, _) in enumerate(batch):
+                self._batch[i] = state
+
+            try:
+                q_values = self._forward(self._batch[:size])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future) in enumerate(batch):
+                future.set_result(q_values[i].copy())
+
+            self.batches += 1
+            self.requests += size
+
+    def stats(self) -> Dict:
+        return {
+            'model_path': self.model_path,
+            'state_size': self.state_size,
+            'action_size': self.action_size,
+            'batches': self.batches,
+            'requests': self.requests,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0
+        }
+
+    def close(self):
+        self._requests.put(None)
+        self._thread.join(timeout=1)
+
+def decode_route(worker: PolicyWorker, customers_df: pd.DataFrame, n_vehicles: int = 1,
+                 max_capacity: float = 6000, mode: str = 'greedy', width: int = 16,
+                 time_budget_ms: Optional[float] = None) -> Dict:
+    """
+    DQN route for one instance.
+
+    Greedy decoding repeatedly picks the valid stop with the highest
+    Q-value, one state per request (micro-batched with other callers).
+    mode 'sample' (best-of-K) and 'beam' expand width partial routes per
+    step with one batched forward pass and return the best complete route
+    found within time_budget_ms (see route_search.search_routes).
+
+    The policy sees the same observation as in training (VRPDynamicEnv,
+    row 0 = depot), so it needs len(customers_df) == action_size.
+
+    Returns:
+        Stop sequence per vehicle (row indices, depot excluded), totals and
+        an error message if the episode ended on a constraint
+    """
+    from env.vrp_env import VRPDynamicEnv
+
+    if len(customers_df) != worker.action_size:
+        raise ValueError(f"Policy expects {worker.action_size} locations (depot + "
+                         f"{worker.action_size - 1} stops), got {len(customers_df)}")
+
+    env = VRPDynamicEnv(customers_df, n_vehicles=n_vehicles, max_capacity=max_capacity)
+    if mode != 'greedy':
+        from route_search import search_routes
+
+        return search_routes(worker.q_values_batch, env, mode, width=width, time_budget_ms=time_budget_ms)
+
+    state = env.reset()
+    routes = [[]]
+    info = {}
+
+    with worker.session():
+        while True:
+            mask = env.action_masks()
+            if not mask.any():
+                info = dict(info, error='No feasible stop left')
+                break
+
+            q_values = worker.q_values(state)
+            action = int(np.argmax(np.where(mask, q_values, -np.inf)))
+
+            state, _, done, info = env.step(action)
+            while len(routes) < info['vehicles_used']:
+                routes.append([])
+            routes[-1].append(action)
+
+            if done:
+                break
+
+    return {
+        'routes': routes,
+        'total_distance': info.get('total_distance', 0.0),
+        'total_time': info.get('total_time', 0.0),
+        'visited_customers': info.get('visited_customers', 0),
+        'error': info.get('error')
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Export DQN VRP policy for serving')
+    parser.add_argument('weights', help='Trained weights (.weights.h5 or .pth)')
+    parser.add_argument('output', help='TorchScript output path (.pt)')
+    parser.add_argument('--onnx', default=None, help='Also export ONNX to this path')
+    parser.add_argument('--quantize', action='store_true', help='Dynamic int8 quantization of the TorchScript policy')
+    parser.add_argument('--validation', default=None, help='.npz with a states array for the fp32/int8 accuracy check')
+    parser.add_argument('--min-agreement', type=float, default=0.99,
+                        help='Minimum fp32/int8 action agreement required to export the quantized policy')
+    args = parser.parse_args()
+
+    metadata = export_policy(args.weights, args.output, args.onnx, quantize=args.quantize,
+                             validation_path=args.validation, min_agreement=args.min_agreement)
+    print(f"✅ Policy exported: {args.output}")
+    if args.onnx:
+        print(f"✅ ONNX exported: {args.onnx}")
+    print(f"📊 State size: {metadata['state_size']}, Action size: {metadata['action_size']}")
+
+    if args.quantize:
+        report = metadata['quantization']
+        accuracy = report['accuracy']
+        print(f"\n🔢 Int8 vs fp32 on {accuracy['states']} validation states:")
+        print(f"   Action agreement: {accuracy['action_agreement']:.2%}"
+              + (f" (valid actions only: {accuracy['masked_action_agreement']:.2%})"
+                 if 'masked_action_agreement' in accuracy else ""))
+        print(f"   Q-value error: max {accuracy['max_abs_error']:.4f}, mean {accuracy['mean_abs_error']:.4f}")
+        for batch_size in (1, 64):
+            key = f'latency_ms_batch_{batch_size}'
+            print(f"   Latency batch {batch_size:2d}: {report['fp32'][key]:.3f} ms -> {report['int8'][key]:.3f} ms "
+                  f"({report[f'speedup_batch_{batch_size}']:.2f}x)")
+        print(f"   Size: {report['fp32']['size_bytes'] / 1024:.1f} KB -> {report['int8']['size_bytes'] / 1024:.1f} KB "
+              f"({report['size_ratio']:.0%})")
+
+if __name__ == "__main__":
+    main()
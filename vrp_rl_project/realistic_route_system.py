@@ -13,6 +13,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import math
 
+from eta_tracker import RouteETATracker
+
 @dataclass
 class RoadSegment:
     """Representasi segmen jalan"""
@@ -46,6 +48,7 @@ class RealisticRouteSystem:
         self.weather_conditions = self._load_weather_conditions()
         self.traffic_conditions = self._load_traffic_conditions()
         self.destinations = self._load_destinations()
+        self.eta_tracker = RouteETATracker()
         
     def _load_jakarta_roads(self) -> Dict[str, List[Dict]]:
         """Load database jalan Jakarta yang realistis"""
@@ -471,7 +474,7 @@ class RealisticRouteSystem:
         # Calculate route score
         route_score = self.calculate_route_score(route_segments, weather)
         
-        return RouteOption(
+        route_option = RouteOption(
             route_id=f"route_{destination}",
             destination=dest_info["name"],
             total_distance_km=total_distance,
@@ -482,6 +485,8 @@ class RealisticRouteSystem:
             road_segments=route_segments,
             polyline=polyline_points
         )
+        self._sync_route_eta(route_option)
+        return route_option
     
     def get_optimal_route(self, destination: str, weather: str = None) -> RouteOption:
         """Get optimal route considering traffic and weather"""
@@ -554,8 +559,39 @@ class RealisticRouteSystem:
         else:
             return 0.06  # Default curve factor - much larger!
     
+    def _sync_route_eta(self, route: RouteOption):
+        """Sinkronkan waktu segmen rute (baru dibuat) ke ETA tracker; hanya segmen yang berubah yang ditulis"""
+        segment_hours = [segment.estimated_time_minutes / 60 for segment in route.road_segments]
+        
+        if (not self.eta_tracker.has_vehicle(route.route_id)
+                or self.eta_tracker.get_state(route.route_id).total_segments != len(segment_hours)):
+            self.eta_tracker.register(route.route_id, segment_hours)
+        else:
+            self.eta_tracker.update_segment_times(route.route_id, segment_hours)
+    
+    def get_remaining_minutes(self, route: RouteOption) -> int:
+        """Sisa waktu tempuh rute (menit) sejak progres terakhir, O(1) dari ETA tracker"""
+        if not self.eta_tracker.has_vehicle(route.route_id):
+            self._sync_route_eta(route)
+        return int(round(self.eta_tracker.get_remaining_time(route.route_id) * 60))
+    
+    def update_route_progress(self, route_id: str, completed_segments: int, timestamp: datetime = None) -> Dict:
+        """
+        Catat progres kendaraan pada rute (jumlah segmen jalan yang sudah dilewati)
+        
+        Returns:
+            Status rute dari ETA tracker (progres, sisa waktu, perkiraan selesai)
+        
+        Raises:
+            KeyError: Rute belum pernah dibuat (generate_realistic_route)
+        """
+        self.eta_tracker.update_progress(route_id, completed_segments, timestamp)
+        return self.eta_tracker.get_status(route_id)
+    
     def format_route_for_api(self, route: RouteOption) -> Dict:
         """Format route for API response"""
+        remaining_minutes = self.get_remaining_minutes(route)
+        
         return {
             "id": route.route_id,
             "destination": route.destination,
@@ -568,7 +604,7 @@ class RealisticRouteSystem:
             "start_location": {"lat": -6.1702, "lng": 106.9417},
             "end_location": {"lat": route.road_segments[-1].end_coords[0], "lng": route.road_segments[-1].end_coords[1]},
             "status": "active",
-            "estimated_arrival": f"{route.total_time_minutes} minutes",
+            "estimated_arrival": f"{remaining_minutes} minutes",
             "road_segments": [
                 {
                     "road_name": segment.road_name,
@@ -11,18 +11,49 @@ from datetime import datetime
 import uvicorn
 
 from route_info_system import RouteInfoSystem
+from eta_tracker import RouteETATracker
 
 app = FastAPI(title="Route Information API", version="1.0.0")
 
 # Initialize route system
 route_system = RouteInfoSystem()
 
+# Per-vehicle route state for incremental ETA updates
+eta_tracker = RouteETATracker(route_system.traffic_conditions)
+
+# Default route for testing
+DEFAULT_ROUTE = [
+    [-6.2088, 106.8456],  # Customer 0
+    [-6.2146, 106.8451],  # Customer 2
+    [-6.1865, 106.8343],  # Customer 4
+    [-6.1751, 106.8650],  # Customer 1
+    [-6.2297, 106.7997],  # Customer 3
+    [-6.2088, 106.8456]   # Back to depot
+]
+
 class RouteRequest(BaseModel):
     vehicle_id: int
     route: List[List[float]]  # List of [lat, lng] coordinates
     weather: str = "sunny"
     start_time: Optional[str] = None
 
+class FleetVehicleRoute(BaseModel):
+    vehicle_id: int
+    route: List[List[float]]  # List of [lat, lng] coordinates
+
+class FleetRouteRequest(BaseModel):
+    vehicles: List[FleetVehicleRoute]
+    weather: str = "sunny"
+    start_time: Optional[str] = None
+
+class ProgressUpdate(BaseModel):
+    completed_segments: int
+    timestamp: Optional[str] = None
+
+class TrafficUpdate(BaseModel):
+    segment_index: int
+    traffic_condition: str
+
 class RouteResponse(BaseModel):
     vehicle_id: int
     total_distance: float
@@ -32,6 +63,54 @@ class RouteResponse(BaseModel):
     estimated_completion: str
     route_segments: List[Dict]
 
+def parse_time(value: Optional[str]) -> datetime:
+    """Parse "HH:MM" request time, falling back to now"""
+    if value:
+        try:
+            return datetime.strptime(value, "%H:%M")
+        except ValueError:
+            pass
+    return datetime.now()
+
+def register_route(route_info: Dict, weather: str):
+    """Store route state so later ETA refreshes are incremental"""
+    weather_factor = route_system._calculate_weather_impact(weather, [])["factor"]
+    eta_tracker.register_route_info(route_info, weather_factor)
+
+def format_route_status(vehicle_id: int) -> Dict:
+    """Format tracked route status for API response"""
+    status = eta_tracker.get_status(vehicle_id)
+    status["estimated_completion"] = status["estimated_completion"].strftime("%H:%M")
+    return status
+
+def format_route_info(route_info: Dict) -> Dict:
+    """Format route information from RouteInfoSystem for API response"""
+    
+    formatted_segments = []
+    for segment in route_info["route_segments"]:
+        formatted_segment = {
+            "from": segment["from"],
+            "to": segment["to"],
+            "distance": round(segment["distance"], 2),
+            "travel_time": round(segment["travel_time"], 2),
+            "traffic_condition": segment["traffic_condition"],
+            "weather_condition": segment["weather_condition"],
+            "adjusted_speed": round(segment["adjusted_speed"], 1),
+            "estimated_arrival": segment["estimated_arrival"].strftime("%H:%M"),
+            "road_segments": segment["road_segments"]  # Ensure this is included
+        }
+        formatted_segments.append(formatted_segment)
+    
+    return {
+        "vehicle_id": route_info["vehicle_id"],
+        "total_distance": round(route_info["total_distance"], 2),
+        "total_time": round(route_info["total_time"], 2),
+        "weather_condition": route_info["weather_condition"],
+        "start_time": route_info["start_time"].strftime("%H:%M"),
+        "estimated_completion": route_info["estimated_completion"].strftime("%H:%M"),
+        "route_segments": formatted_segments
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -41,48 +120,14 @@ async def root():
 async def get_route_info(vehicle_id: int, weather: str = "sunny"):
     """Get route information for a specific vehicle"""
     
-    # Default route for testing
-    default_route = [
-        [-6.2088, 106.8456],  # Customer 0
-        [-6.2146, 106.8451],  # Customer 2
-        [-6.1865, 106.8343],  # Customer 4
-        [-6.1751, 106.8650],  # Customer 1
-        [-6.2297, 106.7997],  # Customer 3
-        [-6.2088, 106.8456]   # Back to depot
-    ]
-    
     try:
         # Convert route to tuples
-        route_tuples = [(point[0], point[1]) for point in default_route]
+        route_tuples = [(point[0], point[1]) for point in DEFAULT_ROUTE]
         
         # Get route information
         route_info = route_system.get_vehicle_route_info(vehicle_id, route_tuples, weather)
         
-        # Ensure road_segments are properly included in response
-        formatted_segments = []
-        for segment in route_info["route_segments"]:
-            formatted_segment = {
-                "from": segment["from"],
-                "to": segment["to"],
-                "distance": round(segment["distance"], 2),
-                "travel_time": round(segment["travel_time"], 2),
-                "traffic_condition": segment["traffic_condition"],
-                "weather_condition": segment["weather_condition"],
-                "adjusted_speed": round(segment["adjusted_speed"], 1),
-                "estimated_arrival": segment["estimated_arrival"].strftime("%H:%M"),
-                "road_segments": segment["road_segments"]  # Ensure this is included
-            }
-            formatted_segments.append(formatted_segment)
-        
-        return {
-            "vehicle_id": route_info["vehicle_id"],
-            "total_distance": round(route_info["total_distance"], 2),
-            "total_time": round(route_info["total_time"], 2),
-            "weather_condition": route_info["weather_condition"],
-            "start_time": route_info["start_time"].strftime("%H:%M"),
-            "estimated_completion": route_info["estimated_completion"].strftime("%H:%M"),
-            "route_segments": formatted_segments
-        }
+        return format_route_info(route_info)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting route info: {str(e)}")
@@ -96,12 +141,7 @@ async def create_route_info(request: RouteRequest):
         route_tuples = [(point[0], point[1]) for point in request.route]
         
         # Parse start time
-        start_time = datetime.now()
-        if request.start_time:
-            try:
-                start_time = datetime.strptime(request.start_time, "%H:%M")
-            except ValueError:
-                start_time = datetime.now()
+        start_time = parse_time(request.start_time)
         
         # Get route information
         route_info = route_system.get_vehicle_route_info(
@@ -110,35 +150,38 @@ async def create_route_info(request: RouteRequest):
             request.weather, 
             start_time
         )
+        register_route(route_info, request.weather)
         
-        # Format segments with road information
-        formatted_segments = []
-        for segment in route_info["route_segments"]:
-            formatted_segment = {
-                "from": segment["from"],
-                "to": segment["to"],
-                "distance": round(segment["distance"], 2),
-                "travel_time": round(segment["travel_time"], 2),
-                "traffic_condition": segment["traffic_condition"],
-                "weather_condition": segment["weather_condition"],
-                "adjusted_speed": round(segment["adjusted_speed"], 1),
-                "estimated_arrival": segment["estimated_arrival"].strftime("%H:%M"),
-                "road_segments": segment["road_segments"]  # Ensure this is included
-            }
-            formatted_segments.append(formatted_segment)
+        return format_route_info(route_info)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating route info: {str(e)}")
+
+@app.post("/api/fleet-route-info")
+async def create_fleet_route_info(request: FleetRouteRequest):
+    """Create route information for all vehicles of a fleet in one call"""
+    
+    try:
+        fleet_routes = {
+            vehicle.vehicle_id: [(point[0], point[1]) for point in vehicle.route]
+            for vehicle in request.vehicles
+        }
+        
+        # Parse start time
+        start_time = parse_time(request.start_time)
+        
+        fleet_info = route_system.get_fleet_route_info(fleet_routes, request.weather, start_time)
+        for route_info in fleet_info.values():
+            register_route(route_info, request.weather)
         
         return {
-            "vehicle_id": route_info["vehicle_id"],
-            "total_distance": round(route_info["total_distance"], 2),
-            "total_time": round(route_info["total_time"], 2),
-            "weather_condition": route_info["weather_condition"],
-            "start_time": route_info["start_time"].strftime("%H:%M"),
-            "estimated_completion": route_info["estimated_completion"].strftime("%H:%M"),
-            "route_segments": formatted_segments
+            "weather_condition": request.weather,
+            "total_vehicles": len(fleet_info),
+            "vehicles": [format_route_info(route_info) for route_info in fleet_info.values()]
         }
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating route info: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating fleet route info: {str(e)}")
 
 @app.get("/api/weather-conditions")
 async def get_weather_conditions():
@@ -183,28 +226,51 @@ async def get_route_status(vehicle_id: int):
     """Get current route status for a vehicle"""
     
     try:
-        # Get route info
-        route_info = await get_route_info(vehicle_id, "sunny")
+        # Register the default route on first request; afterwards the
+        # status comes from the tracked state without recomputing the route
+        if not eta_tracker.has_vehicle(vehicle_id):
+            route_tuples = [(point[0], point[1]) for point in DEFAULT_ROUTE]
+            route_info = route_system.get_vehicle_route_info(vehicle_id, route_tuples, "sunny")
+            register_route(route_info, "sunny")
         
-        # Calculate status
-        total_segments = len(route_info["route_segments"])
-        completed_segments = sum(1 for segment in route_info["route_segments"] 
-                               if "completed" in segment and segment["completed"])
-        
-        progress = (completed_segments / total_segments) * 100 if total_segments > 0 else 0
-        
-        return {
-            "vehicle_id": vehicle_id,
-            "progress": round(progress, 1),
-            "completed_segments": completed_segments,
-            "total_segments": total_segments,
-            "status": "In Progress" if progress < 100 else "Completed",
-            "estimated_completion": route_info["estimated_completion"]
-        }
+        return format_route_status(vehicle_id)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting route status: {str(e)}")
 
+@app.post("/api/route-progress/{vehicle_id}")
+async def update_route_progress(vehicle_id: int, update: ProgressUpdate):
+    """Report that a vehicle has completed some segments of its route"""
+    
+    if not eta_tracker.has_vehicle(vehicle_id):
+        raise HTTPException(status_code=404, detail="Vehicle route not registered")
+    
+    try:
+        eta_tracker.update_progress(vehicle_id, update.completed_segments, parse_time(update.timestamp))
+        return format_route_status(vehicle_id)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating route progress: {str(e)}")
+
+@app.post("/api/route-traffic/{vehicle_id}")
+async def update_route_traffic(vehicle_id: int, update: TrafficUpdate):
+    """Update traffic condition of one segment and refresh the ETA"""
+    
+    if not eta_tracker.has_vehicle(vehicle_id):
+        raise HTTPException(status_code=404, detail="Vehicle route not registered")
+    if update.traffic_condition not in route_system.traffic_conditions:
+        raise HTTPException(status_code=400, detail="Unknown traffic condition")
+    total_segments = eta_tracker.get_state(vehicle_id).total_segments
+    if not 0 <= update.segment_index < total_segments:
+        raise HTTPException(status_code=400, detail=f"segment_index must be between 0 and {total_segments - 1}")
+    
+    try:
+        eta_tracker.update_segment_traffic(vehicle_id, update.segment_index, update.traffic_condition)
+        return format_route_status(vehicle_id)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating route traffic: {str(e)}")
+
 @app.get("/api/traffic-update")
 async def get_traffic_update():
     """Get real-time traffic update"""
@@ -9,6 +9,12 @@ import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
+import numpy as np
+
+# Urutan level dipakai sebagai kode integer pada perhitungan batch armada
+TRAFFIC_LEVELS = ["low", "medium", "high", "very_high"]
+AREA_NAMES = ["Jakarta Pusat", "Jakarta Selatan", "Jakarta Timur", "Jakarta Barat"]
+
 class RouteInfoSystem:
     """Sistem informasi rute dengan nama jalan dan kondisi dinamis"""
     
@@ -124,6 +130,11 @@ class RouteInfoSystem:
         start_area = self._get_area_from_coordinates(start)
         end_area = self._get_area_from_coordinates(end)
         
+        return self._get_road_segments_for_areas(start_area, end_area)
+    
+    def _get_road_segments_for_areas(self, start_area: str, end_area: str) -> List[Dict]:
+        """Get road segments between two Jakarta areas"""
+        
         # Get appropriate roads for the route
         road_segments = []
         
@@ -192,6 +203,16 @@ class RouteInfoSystem:
         else:
             return "Jakarta Pusat"  # Default
     
+    def _get_area_codes(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Vectorized version of _get_area_from_coordinates (index into AREA_NAMES)"""
+        conditions = [
+            (-6.21 <= lat) & (lat <= -6.18) & (106.80 <= lon) & (lon <= 106.85),
+            (-6.22 <= lat) & (lat <= -6.18) & (106.83 <= lon) & (lon <= 106.87),
+            (-6.23 <= lat) & (lat <= -6.20) & (106.79 <= lon) & (lon <= 106.82),
+            (-6.17 <= lat) & (lat <= -6.15) & (106.86 <= lon) & (lon <= 106.87),
+        ]
+        return np.select(conditions, [0, 1, 2, 3], default=0)
+    
     def _calculate_traffic_impact(self, road_segments: List[Dict], time: datetime) -> Dict:
         """Calculate traffic impact based on time and road segments"""
         
@@ -322,6 +343,122 @@ class RouteInfoSystem:
             "route_segments": route_info
         }
 
+    def get_fleet_route_info(self, fleet_routes: Dict[int, List[Tuple[float, float]]],
+                             weather: str = "sunny", start_time: datetime = None) -> Dict[int, Dict]:
+        """Get complete route information for a whole fleet in one call
+        
+        Equivalent to calling get_vehicle_route_info for every vehicle, but
+        distances, traffic/weather factors and arrival times for all legs of
+        all vehicles are computed with array operations.
+        """
+        
+        if start_time is None:
+            start_time = datetime.now()
+        
+        vehicle_ids = list(fleet_routes.keys())
+        routes = [np.asarray(fleet_routes[v], dtype=float).reshape(-1, 2) for v in vehicle_ids]
+        leg_counts = np.array([max(len(r) - 1, 0) for r in routes], dtype=int)
+        
+        if leg_counts.sum() == 0:
+            return {v: self.get_vehicle_route_info(v, fleet_routes[v], weather, start_time)
+                    for v in vehicle_ids}
+        
+        starts = np.concatenate([r[:-1] for r in routes if len(r) > 1])
+        ends = np.concatenate([r[1:] for r in routes if len(r) > 1])
+        
+        # Jarak haversine untuk semua leg sekaligus
+        lat1, lon1, lat2, lon2 = np.radians([starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]])
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        distances = 6371 * 2 * np.arcsin(np.sqrt(a))
+        
+        # Segmen jalan per leg berdasarkan area asal/tujuan
+        start_areas = self._get_area_codes(starts[:, 0], starts[:, 1])
+        end_areas = self._get_area_codes(ends[:, 0], ends[:, 1])
+        road_segments = [
+            self._get_road_segments_for_areas(AREA_NAMES[s], AREA_NAMES[e])
+            for s, e in zip(start_areas, end_areas)
+        ]
+        road_traffic = np.empty(len(road_segments), dtype=int)
+        for i, segments in enumerate(road_segments):
+            levels = [segment["traffic_level"] for segment in segments]
+            road_traffic[i] = TRAFFIC_LEVELS.index(max(levels, key=levels.count))
+        
+        speeds = np.array([self.traffic_conditions[level]["speed"] for level in TRAFFIC_LEVELS], dtype=float)
+        weather_info = self._calculate_weather_impact(weather, [])
+        weather_factor = weather_info["factor"]
+        base_speed = 30  # km/h
+        
+        # Offset jam mulai per kendaraan, untuk cumsum tersegmentasi
+        first_leg = np.concatenate([[0], np.cumsum(leg_counts)[:-1]])
+        first_leg_index = np.minimum(first_leg, len(distances) - 1)
+        start_seconds = (start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+                         + start_time.microsecond / 1e6)
+        
+        # Traffic tergantung jam keberangkatan tiap leg, dan jam keberangkatan
+        # tergantung waktu tempuh leg sebelumnya. Iterasi titik tetap: setiap
+        # iterasi memastikan minimal satu leg lagi benar, biasanya stabil
+        # setelah 1-2 iterasi.
+        departure_offset = np.zeros(len(distances))
+        traffic_codes = None
+        for _ in range(int(leg_counts.max())):
+            hours = np.floor((start_seconds + departure_offset * 3600) / 3600) % 24
+            base_traffic = np.where(((7 <= hours) & (hours <= 9)) | ((17 <= hours) & (hours <= 19)), 2,
+                                    np.where((10 <= hours) & (hours <= 16), 1, 0))
+            new_codes = np.where((base_traffic == 2) & (road_traffic == 2), 3,
+                                 np.maximum(base_traffic, road_traffic))
+            if traffic_codes is not None and np.array_equal(new_codes, traffic_codes):
+                break
+            traffic_codes = new_codes
+            
+            traffic_factors = speeds[traffic_codes] / 40
+            adjusted_speeds = base_speed * traffic_factors * weather_factor
+            travel_times = distances / adjusted_speeds
+            cumulative = np.cumsum(travel_times)
+            vehicle_base = np.repeat(cumulative[first_leg_index] - travel_times[first_leg_index], leg_counts)
+            departure_offset = cumulative - travel_times - vehicle_base
+        
+        arrival_offset = departure_offset + travel_times
+        
+        fleet_info = {}
+        for v, vehicle_id in enumerate(vehicle_ids):
+            n_legs = leg_counts[v]
+            route_info = []
+            for k in range(n_legs):
+                i = first_leg[v] + k
+                condition = TRAFFIC_LEVELS[traffic_codes[i]]
+                traffic_impact = {
+                    "condition": condition,
+                    "description": self.traffic_conditions[condition]["description"],
+                    "speed": self.traffic_conditions[condition]["speed"],
+                    "factor": float(traffic_factors[i])
+                }
+                route_info.append({
+                    "from": f"Customer {k}" if k < n_legs - 1 else "Depot",
+                    "to": f"Customer {k + 1}" if k < n_legs - 1 else "Depot",
+                    "distance": float(distances[i]),
+                    "travel_time": float(travel_times[i]),
+                    "road_segments": road_segments[i],
+                    "traffic_condition": condition,
+                    "weather_condition": weather,
+                    "adjusted_speed": float(adjusted_speeds[i]),
+                    "estimated_arrival": start_time + timedelta(hours=float(arrival_offset[i])),
+                    "route_details": self._generate_route_details(road_segments[i], traffic_impact, weather_info)
+                })
+            
+            legs = slice(first_leg[v], first_leg[v] + n_legs)
+            total_time = float(travel_times[legs].sum())
+            fleet_info[vehicle_id] = {
+                "vehicle_id": vehicle_id,
+                "total_distance": float(distances[legs].sum()),
+                "total_time": total_time,
+                "weather_condition": weather,
+                "start_time": start_time,
+                "estimated_completion": start_time + timedelta(hours=total_time),
+                "route_segments": route_info
+            }
+        
+        return fleet_info
+
 def main():
     """Test the route information system"""
     
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Decoding rute DQN saat inference: greedy, best-of-K sampling dan beam search
+Banyak rute parsial dikembangkan bersamaan dengan satu forward pass per langkah.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from env.vrp_env import VRPDynamicEnv
+
+DECODING_MODES = ('greedy', 'sample', 'beam')
+
+class RouteBatch:
+    """
+    A batch of partial routes on one VRPDynamicEnv instance.
+
+    Mirrors VRPDynamicEnv.step (vehicle switch on capacity, soft time
+    windows, reward) on (B, ...) arrays, so many partial routes advance
+    with one vectorized step and can be reordered or duplicated with
+    take() during beam search. Only valid actions (action_masks) are
+    expected.
+    """
+
+    def __init__(self, env: VRPDynamicEnv, size: int):
+        self.env = env
+        self.size = size
+        n = env.n_customers
+
+        self.location = np.zeros(size, dtype=np.int64)
+        self.vehicle = np.zeros(size, dtype=np.int64)
+        self.capacity = np.full(size, float(env.max_capacity))
+        self.time = np.full(size, env.start_time)
+        self.visited = np.zeros((size, n), dtype=bool)
+        self.visited[:, 0] = True
+        self.total_distance = np.zeros(size)
+        self.total_time = np.zeros(size)
+        self.violations = np.zeros(size, dtype=np.int64)
+        self.reward = np.zeros(size)
+        self.done = np.zeros(size, dtype=bool)
+        self.stuck = np.zeros(size, dtype=bool)
+        self.actions = np.zeros((size, n - 1), dtype=np.int64)
+        self.action_vehicle = np.zeros((size, n - 1), dtype=np.int64)
+        self.length = np.zeros(size, dtype=np.int64)
+
+    def take(self, index: np.ndarray) -> 'RouteBatch':
+        """Rows selected (possibly repeated) by index, as a new batch."""
+        batch = RouteBatch.__new__(RouteBatch)
+        batch.env = self.env
+        batch.size = len(index)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                setattr(batch, name, value[index].copy())
+        return batch
+
+    def observations(self) -> np.ndarray:
+        """VRPDynamicEnv observations, shape (B, 5 + n)."""
+        observations = np.empty((self.size, 5 + self.env.n_customers), dtype=np.float32)
+        observations[:, 0] = self.location
+        observations[:, 1] = self.capacity
+        observations[:, 2] = self.time
+        observations[:, 3] = self.env.weather_factor
+        observations[:, 4] = self.env.traffic_factor
+        observations[:, 5:] = ~self.visited
+        return observations
+
+    def action_masks(self) -> np.ndarray:
+        """VRPDynamicEnv.action_masks per row (all False for finished rows)."""
+        env = self.env
+        capacity = np.where(self.vehicle + 1 < env.n_vehicles, float(env.max_capacity), self.capacity)
+        masks = ~self.visited & (env.demand[None, :] <= capacity[:, None])
+        masks[self.done] = False
+        return masks
+
+    def step(self, actions: np.ndarray):
+        """Advance the unfinished rows by one (valid) action each."""
+        env = self.env
+        rows = np.flatnonzero(~self.done)
+        actions = np.asarray(actions)[rows]
+        speed_factor = env.weather_factor * env.traffic_factor / env.speed
+        demand = env.demand[actions]
+
+        # Next vehicle when the stop does not fit
+        switch = demand > self.capacity[rows]
+        return_distance = np.where(switch, env.distance_matrix[self.location[rows], 0], 0.0)
+        self.vehicle[rows] += switch
+        location = np.where(switch, 0, self.location[rows])
+        capacity = np.where(switch, float(env.max_capacity), self.capacity[rows])
+        current_time = np.where(switch, env.start_time, self.time[rows])
+
+        leg_distance = env.distance_matrix[location, actions]
+        travel_time = leg_distance * speed_factor
+        arrival = current_time + travel_time
+        waiting_time = np.maximum(env.time_window_start[actions] - arrival, 0.0)
+        arrival += waiting_time
+        lateness = np.maximum(arrival - env.time_window_end[actions], 0.0)
+        service_time = env.service_time[actions]
+
+        self.location[rows] = actions
+        self.capacity[rows] = capacity - demand
+        self.time[rows] = arrival + service_time
+        self.total_distance[rows] += return_distance + leg_distance
+        self.total_time[rows] += return_distance * speed_factor + travel_time + waiting_time + service_time
+        self.violations[rows] += lateness > 0
+        self.visited[rows, actions] = True
+        self.actions[rows, self.length[rows]] = actions
+        self.action_vehicle[rows, self.length[rows]] = self.vehicle[rows]
+        self.length[rows] += 1
+
+        done = self.length[rows] == env.n_customers - 1
+        self.reward[rows] += (-(return_distance + leg_distance) * env.distance_penalty + env.service_bonus
+                              - lateness * env.lateness_penalty + np.where(done, env.completion_bonus, 0.0))
+        self.done[rows] = done
+
+    def finish_stuck(self, masks: np.ndarray):
+        """End unfinished rows without any valid action (no vehicle left for the remaining demand)."""
+        stuck = ~self.done & ~masks.any(axis=1)
+        self.stuck |= stuck
+        self.done |= stuck
+
+    def result(self, row: int) -> Dict:
+        """Routes per vehicle and totals of one finished row."""
+        length = self.length[row]
+        actions = self.actions[row, :length]
+        vehicles = self.action_vehicle[row, :length]
+        routes = [actions[vehicles == vehicle].tolist() for vehicle in range(int(vehicles.max(initial=0)) + 1)]
+        error = None
+        if self.stuck[row]:
+            error = 'No feasible stop left'
+        elif self.violations[row] > 0:
+            error = 'Time window violated'
+        return {
+            'actions': actions.tolist(),
+            'routes': routes,
+            'total_reward': float(self.reward[row]),
+            'total_distance': float(self.total_distance[row]),
+            'total_time': float(self.total_time[row]),
+            'visited_customers': int(length),
+            'time_window_violations': int(self.violations[row]),
+            'error': error
+        }
+
+def _best_row(batch: RouteBatch) -> int:
+    """Longest route (complete ones first), then the highest reward."""
+    return int(np.lexsort((batch.reward, batch.length))[-1])
+
+def _masked(q_values: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    return np.where(masks, q_values, -np.inf)
+
+def _rollout(q_function: Callable, batch: RouteBatch, rng: Optional[np.random.Generator] = None,
+             temperature: float = 1.0, greedy_rows: int = 0) -> int:
+    """
+    Run every row to the end, one forward pass per step over the
+    unfinished rows. With rng, rows from greedy_rows on sample their
+    action from the valid ones; temperature is relative to the spread of
+    each state's valid Q-values, so it does not depend on the Q scale.
+
+    Returns:
+        Forward passes
+    """
+    passes = 0
+    while not batch.done.all():
+        masks = batch.action_masks()
+        batch.finish_stuck(masks)
+        active = np.flatnonzero(~batch.done)
+        if len(active) == 0:
+            break
+        q_values = _masked(q_function(batch.observations()[active]), masks[active])
+        passes += 1
+        actions = np.zeros(batch.size, dtype=np.int64)
+        actions[active] = np.argmax(q_values, axis=1)
+
+        sampled = active >= greedy_rows
+        if rng is not None and sampled.any():
+            # Gumbel-max sample of softmax(Q / (temperature * spread of the valid Q-values))
+            logits = q_values[sampled]
+            valid = np.isfinite(logits)
+            count = valid.sum(axis=1, keepdims=True)
+            mean = np.where(valid, logits, 0.0).sum(axis=1, keepdims=True) / count
+            spread = np.sqrt(np.where(valid, (logits - mean) ** 2, 0.0).sum(axis=1, keepdims=True) / count)
+            logits = (logits - logits.max(axis=1, keepdims=True)) / (max(temperature, 1e-6) * np.maximum(spread, 1e-6))
+            gumbel = -np.log(-np.log(rng.uniform(1e-12, 1.0, size=logits.shape)))
+            actions[active[sampled]] = np.argmax(logits + gumbel, axis=1)
+
+        batch.step(actions)
+    return passes
+
+def sample_routes(q_function: Callable, env: VRPDynamicEnv, samples: int = 16, temperature: float = 1.0,
+                  time_budget: Optional[float] = None, seed: Optional[int] = None) -> Dict:
+    """
+    Best-of-K sampling: K routes decoded in parallel, sampling each stop
+    from a softmax over the valid Q-values (see _rollout for temperature).
+
+    The first row of the first round is the greedy route, so the result is
+    never worse than greedy decoding. Further rounds of K samples run while
+    time_budget (seconds) allows.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    best, candidates, passes, rounds = None, 0, 0, 0
+
+    while True:
+        batch = RouteBatch(env, samples)
+        passes += _rollout(q_function, batch, rng, temperature, greedy_rows=1 if rounds == 0 else 0)
+        candidate = batch.result(_best_row(batch))
+        if best is None or (candidate['visited_customers'], candidate['total_reward']) > \
+                (best['visited_customers'], best['total_reward']):
+            best = candidate
+        candidates += samples
+        rounds += 1
+
+        elapsed = time.perf_counter() - start
+        # Next round only if it is expected to fit in the budget
+        if time_budget is None or elapsed + elapsed / rounds > time_budget:
+            break
+
+    best.update(candidates=candidates, forward_passes=passes)
+    return best
+
+def beam_search(q_function: Callable, env: VRPDynamicEnv, width: int = 16,
+                time_budget: Optional[float] = None) -> Dict:
+    """
+    Beam search over partial routes.
+
+    Candidates (route, next stop) are scored with the reward collected so
+    far plus Q(state, stop), the agent's estimate of the rest; the best
+    width candidates are kept per step, all expanded with one forward pass.
+    When time_budget (seconds) runs out, the remaining beams are completed
+    greedily.
+    """
+    start = time.perf_counter()
+    n = env.n_customers
+    batch = RouteBatch(env, 1)
+    passes = 0
+
+    while not batch.done.all():
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            passes += _rollout(q_function, batch)
+            break
+
+        masks = batch.action_masks()
+        batch.finish_stuck(masks)
+        if batch.done.all():
+            break
+        q_values = q_function(batch.observations())
+        passes += 1
+
+        # Finished beams stay as one candidate (action -1)
+        scores = np.where(masks, batch.reward[:, None] + q_values, -np.inf)
+        finished = np.flatnonzero(batch.done)
+        flat = scores.ravel()
+        k = min(width, int(np.isfinite(flat).sum()))
+        top = np.argpartition(-flat, k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+
+        rows = np.concatenate([finished, top // n]).astype(np.int64)
+        actions = np.concatenate([np.zeros(len(finished), dtype=np.int64), top % n])
+        batch = batch.take(rows)
+        batch.step(actions)
+
+    best = batch.result(_best_row(batch))
+    best.update(candidates=batch.size, forward_passes=passes)
+    return best
+
+def search_routes(q_function: Callable, env: VRPDynamicEnv, mode: str = 'beam', width: int = 16,
+                  time_budget_ms: Optional[float] = None, temperature: float = 1.0,
+                  seed: Optional[int] = None) -> Dict:
+    """
+    Decode the best complete route for env with a Q-network.
+
+    Args:
+        q_function: Batched Q-values, (B, state_size) float32 -> (B, action_size)
+        env: Instance (its current weather/traffic factors are used)
+        mode: 'greedy', 'sample' (best-of-K) or 'beam'
+        width: Samples per round (sample) or beam width (beam), at least 1
+        time_budget_ms: Latency budget; extra sampling rounds stop, and beams
+            are completed greedily, when it runs out (None: no limit)
+        temperature: Softmax temperature for sampling
+        seed: Sampling seed
+
+    Returns:
+        actions (visiting order), routes per vehicle, total_reward,
+        total_distance, total_time, visited_customers, error, plus mode,
+        candidates, forward_passes and elapsed_ms
+    """
+    if width < 1:
+        raise ValueError(f"width must be at least 1, got {width}")
+    start = time.perf_counter()
+    time_budget = time_budget_ms / 1000.0 if time_budget_ms else None
+
+    if mode == 'greedy':
+        batch = RouteBatch(env, 1)
+        passes = _rollout(q_function, batch)
+        result = batch.result(0)
+        result.update(candidates=1, forward_passes=passes)
+    elif mode == 'sample':
+        result = sample_routes(q_function, env, width, temperature, time_budget, seed)
+    elif mode == 'beam':
+        result = beam_search(q_function, env, width, time_budget)
+    else:
+        raise ValueError(f"Unknown decoding mode {mode}, expected one of {DECODING_MODES}")
+
+    result.update(mode=mode, elapsed_ms=(time.perf_counter() - start) * 1000.0)
+    return result
@@ -10,6 +10,9 @@ import torch
 from dqn_model import DQNAgent, VRPEnvironment
 from pt_sanghiang_data import PTSanghiangDataProcessor
 from backend_api import get_weather_data
+from telemetry import TrainingTelemetry
+from model.transition_store import open_writer
+from utils import load_config
 import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
@@ -144,7 +147,18 @@ def simple_training_s1():
     print(f"   ✅ Action size: {action_size}")
     print()
     
-    agent = DQNAgent(state_size, action_size, num_destinations=len(destinations))
+    # Advanced DQN variants dari config.yaml
+    config = load_config()
+    advanced = config.get('advanced_dqn', {})
+    agent = DQNAgent(
+        state_size,
+        action_size,
+        num_destinations=len(destinations),
+        double_dqn=advanced.get('double_dqn', False),
+        dueling_dqn=advanced.get('dueling_dqn', False),
+        n_step=advanced.get('n_step_learning', 1),
+        transition_writer=open_writer(config, state_size, action_size, prefix='sanghiang_s1')
+    )
     
     # 5. Training Parameters (Sesuai S1 Skripsi)
     print("⚙️ 5. Training Parameters...")
@@ -170,6 +184,12 @@ def simple_training_s1():
         'epsilon': []
     }
     
+    # Telemetry per 10 episode: steps/s, waktu inference/env/sample/update, loss
+    telemetry = TrainingTelemetry(
+        'telemetry_s1.jsonl', interval=10,
+        metadata={'episodes': episodes, 'max_steps': max_steps, 'batch_size': batch_size}
+    )
+    
     for episode in range(episodes):
         state = env.reset()
         total_reward = 0
@@ -188,17 +208,23 @@ def simple_training_s1():
                 break
             
             # Choose action
-            action = agent.act(state, valid_actions)
+            with telemetry.timer('inference'):
+                action = agent.act(state, valid_actions)
             
             # Take action
-            next_state, reward, done = env.step(action)
+            with telemetry.timer('env'):
+                next_state, reward, done = env.step(action)
             
             # Store experience
             agent.remember(state, action, reward, next_state, done)
             
             # Train agent
+            loss = None
             if len(agent.memory) > batch_size:
-                agent.replay(batch_size)
+                loss = agent.replay(batch_size)
+            else:
+                agent.replay_timings['sample'] = agent.replay_timings['update'] = 0.0
+            telemetry.step(loss, agent)
             
             state = next_state
             total_reward += reward
@@ -218,6 +244,12 @@ def simple_training_s1():
         training_results['total_distance'].append(total_distance)
         training_results['utilization'].append(utilization)
         training_results['epsilon'].append(agent.epsilon)
+        telemetry.end_episode(
+            episode, epsilon=agent.epsilon, steps=steps,
+            total_reward=total_reward,
+            total_distance=total_distance,
+            utilization=utilization
+        )
         
         # Print progress
         if episode % 50 == 0 or episode == episodes - 1:
@@ -227,6 +259,8 @@ def simple_training_s1():
                   f"Distance: {total_distance:6.2f} | Utilization: {utilization:5.1f}% | "
                   f"Epsilon: {agent.epsilon:.3f}")
     
+    telemetry.close(final_epsilon=agent.epsilon)
+    
     print("\n✅ Training Completed!")
     print()
     
@@ -235,6 +269,8 @@ def simple_training_s1():
     
     # Save model
     model_path = "dqn_s1_skripsi_model.pth"
+    if agent.transition_writer is not None:
+        agent.transition_writer.flush()
     agent.save(model_path)
     print(f"   ✅ Model saved: {model_path}")
     
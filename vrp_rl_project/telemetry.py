@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Training Telemetry untuk DQN VRP
+Menulis ringkasan per interval (JSONL) tentang kemana waktu training habis
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+class _Timer:
+    """Reusable context manager that adds elapsed time to one telemetry bucket."""
+
+    __slots__ = ('telemetry', 'name', 'start')
+
+    def __init__(self, telemetry: 'TrainingTelemetry', name: str):
+        self.telemetry = telemetry
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.times[self.name] += time.perf_counter() - self.start
+        return False
+
+class TrainingTelemetry:
+    """
+    Per-interval telemetry stream for a training loop.
+
+    The loop wraps action selection and env.step in timers, reports every
+    replay() call with step() (sample/update time come from the agent's
+    replay_timings) and closes each episode with end_episode(). Every
+    `interval` episodes one JSON line is appended with environment
+    steps/s, seconds spent per phase (inference, env, sample, update and
+    the unaccounted rest), mean loss, epsilon and episode metrics.
+
+    Example record:
+        {"event": "interval", "episode": 9, "env_steps": 1500,
+         "steps_per_sec": 412.3, "time": {"inference": 0.8, ...},
+         "loss": 12.4, "epsilon": 0.86, "total_reward": {...}, ...}
+    """
+
+    phases = ('inference', 'env', 'sample', 'update')
+
+    def __init__(self, path: str, interval: int = 10, run: Optional[str] = None,
+                 metadata: Optional[Dict] = None, append: bool = False):
+        """
+        Initialize telemetry.
+
+        Args:
+            path: JSONL output file (overwritten unless append)
+            interval: Episodes per record
+            run: Run name stored in every record
+            metadata: Extra fields for the opening 'start' record (e.g. config)
+            append: Append to an existing file (resumed training)
+        """
+        self.path = path
+        self.interval = max(int(interval), 1)
+        self.run = run or os.path.splitext(os.path.basename(path))[0]
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if append else 'w')
+
+        self._timers = {name: _Timer(self, name) for name in self.phases}
+        self.total_steps = 0
+        self.total_episodes = 0
+        self.epsilon = None
+        self._start_time = time.perf_counter()
+        self._reset_interval()
+
+        self._write({'event': 'start', 'time_utc': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                     **(metadata or {})})
+
+    def _reset_interval(self):
+        self.times = {name: 0.0 for name in self.phases}
+        self.steps = 0
+        self.updates = 0
+        self.losses = []
+        self.episode_metrics = {}
+        self._interval_start = time.perf_counter()
+
+    def _write(self, record: Dict):
+        record = {'run': self.run, **record}
+        self._file.write(json.dumps(record, default=float) + '\n')
+        self._file.flush()
+
+    def timer(self, name: str) -> _Timer:
+        """Context manager timing one phase ('inference', 'env', 'sample' or 'update')."""
+        return self._timers[name]
+
+    def step(self, loss: Optional[float] = None, agent=None):
+        """
+        Count one environment step and the replay call that followed it.
+
+        Args:
+            loss: Loss returned by replay() (None/0.0 when no update ran)
+            agent: Agent whose replay_timings hold the last sample/update time
+        """
+        self.steps += 1
+        self.total_steps += 1
+
+        timings = getattr(agent, 'replay_timings', None)
+        if timings:
+            self.times['sample'] += timings['sample']
+            self.times['update'] += timings['update']
+            if timings['update'] > 0:
+                self.updates += 1
+                if loss is not None:
+                    self.losses.append(float(loss))
+        elif loss:
+            self.updates += 1
+            self.losses.append(float(loss))
+
+    def end_episode(self, episode: int, epsilon: Optional[float] = None, **metrics):
+        """Record episode metrics; writes a record every `interval` episodes."""
+        self.total_episodes += 1
+        for name, value in metrics.items():
+            self.episode_metrics.setdefault(name, []).append(float(value))
+        self.epsilon = epsilon
+
+        if self.total_episodes % self.interval == 0:
+            self.flush(episode)
+
+    def flush(self, episode: Optional[int] = None):
+        """Write the record for the current interval (no-op when it is empty)."""
+        if self.steps == 0 and not self.episode_metrics:
+            return
+
+        wall = time.perf_counter() - self._interval_start
+        accounted = sum(self.times.values())
+        record = {
+            'event': 'interval',
+            'episode': episode,
+            'episodes': self.total_episodes,
+            'env_steps': self.total_steps,
+            'interval_steps': self.steps,
+            'updates': self.updates,
+            'wall_time': wall,
+            'elapsed': time.perf_counter() - self._start_time,
+            'steps_per_sec': self.steps / wall if wall > 0 else 0.0,
+            'updates_per_sec': self.updates / wall if wall > 0 else 0.0,
+            'time': dict(self.times, other=max(wall - accounted, 0.0)),
+            'time_per_step_ms': {name: 1000.0 * value / max(self.steps, 1) for name, value in self.times.items()},
+            'loss': float(np.mean(self.losses)) if self.losses else None,
+            'epsilon': self.epsilon
+        }
+        for name, values in self.episode_metrics.items():
+            record[name] = {'mean': float(np.mean(values)), 'min': float(np.min(values)),
+                            'max': float(np.max(values)), 'last': values[-1]}
+
+        self._write(record)
+        self._reset_interval()
+
+    def close(self, **summary):
+        """Flush the last partial interval and write an 'end' record."""
+        self.flush()
+        elapsed = time.perf_counter() - self._start_time
+        self._write({'event': 'end', 'episodes': self.total_episodes, 'env_steps': self.total_steps,
+                     'elapsed': elapsed, 'steps_per_sec': self.total_steps / elapsed if elapsed > 0 else 0.0,
+                     **summary})
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self._file.closed:
+            self.close()
+        return False
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script untuk benchmark runner: parser CVRPLIB dan Solomon, lookup
+best-known, pencarian file instance dan scoring rute
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from benchmark import SOLVERS, _solve_task, find_instances, load_instance, score_routes
+
+# Depot is node 3, so parsing has to move it to row 0
+CVRPLIB_INSTANCE = """NAME : T-n5-k2
+COMMENT : (Test instance, Optimal value: 30)
+TYPE : CVRP
+DIMENSION : 5
+EDGE_WEIGHT_TYPE : EUC_2D
+CAPACITY : 10
+NODE_COORD_SECTION
+ 1 0 0
+ 2 3 4
+ 3 10 10
+ 4 0 7
+ 5 6 1
+DEMAND_SECTION
+1 4
+2 3
+3 0
+4 6
+5 5
+DEPOT_SECTION
+ 3
+ -1
+EOF
+"""
+
+EXPLICIT_INSTANCE = """NAME : E-n4-k2
+TYPE : CVRP
+DIMENSION : 4
+EDGE_WEIGHT_TYPE : EXPLICIT
+EDGE_WEIGHT_FORMAT : LOWER_ROW
+CAPACITY : 5
+EDGE_WEIGHT_SECTION
+ 7
+ 8 2
+ 9 4 6
+DEMAND_SECTION
+1 0
+2 2
+3 3
+4 4
+DEPOT_SECTION
+ 1
+ -1
+EOF
+"""
+
+# Customers out of order (2 before 1)
+SOLOMON_INSTANCE = """S4
+
+VEHICLE
+NUMBER     CAPACITY
+  3         20
+
+CUSTOMER
+CUST NO.  XCOORD.   YCOORD.    DEMAND   READY TIME  DUE DATE   SERVICE   TIME
+
+    0      0         0          0          0        100          0
+    2      3         4          5          0         20          2
+    1      0         10         8          5         30          1
+    3      6         8          7         40         60          3
+"""
+
+def _write(directory: str, name: str, text: str) -> str:
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def test_parse_cvrplib():
+    """Depot moved to row 0, demands/capacity read, EUC_2D distances rounded"""
+    with tempfile.TemporaryDirectory() as directory:
+        instance = load_instance(_write(directory, 'T-n5-k2.vrp', CVRPLIB_INSTANCE))
+        assert instance['name'] == 'T-n5-k2' and instance['format'] == 'cvrplib'
+        assert instance['x'].tolist() == [10, 0, 3, 0, 6] and instance['y'].tolist() == [10, 0, 4, 7, 1]
+        assert instance['demand'].tolist() == [0, 4, 3, 6, 5]
+        assert instance['capacity'] == 10 and instance['vehicles'] == 2
+        assert instance['time_window_start'] is None
+        # sqrt(200) = 14.14 -> 14, sqrt(85) = 9.22 -> 9, 3-4-5 triangle
+        distances = instance['distances']
+        assert (distances[0, 1], distances[0, 2], distances[1, 2]) == (14, 9, 5)
+        assert np.array_equal(distances, distances.T)
+        assert instance['best_known'] == 30
+
+        explicit = load_instance(_write(directory, 'E-n4-k2.vrp', EXPLICIT_INSTANCE))
+        assert explicit['distances'].tolist() == [[0, 7, 8, 9], [7, 0, 2, 4], [8, 2, 0, 6], [9, 4, 6, 0]]
+        assert explicit['best_known'] is None
+
+def test_parse_solomon():
+    """Rows sorted by customer number, time windows and service times kept, distances unrounded"""
+    with tempfile.TemporaryDirectory() as directory:
+        instance = load_instance(_write(directory, 'S4.txt', SOLOMON_INSTANCE))
+        assert instance['name'] == 'S4' and instance['format'] == 'solomon'
+        assert instance['x'].tolist() == [0, 0, 3, 6] and instance['y'].tolist() == [0, 10, 4, 8]
+        assert instance['demand'].tolist() == [0, 8, 5, 7]
+        assert instance['capacity'] == 20 and instance['vehicles'] == 3
+        assert instance['time_window_start'].tolist() == [0, 5, 0, 40]
+        assert instance['time_window_end'].tolist() == [100, 30, 20, 60]
+        assert instance['service_time'].tolist() == [0, 1, 2, 3]
+        assert np.isclose(instance['distances'][1, 2], np.sqrt(45))
+        assert instance['best_known'] is None
+
+def test_best_known_lookup():
+    """A sibling .sol file overrides the COMMENT value, best_known.csv overrides both"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(directory, 'T-n5-k2.vrp', CVRPLIB_INSTANCE)
+        _write(directory, 'T-n5-k2.sol', "Route #1: 1 2\nRoute #2: 3 4\nCost 31\n")
+        assert load_instance(path)['best_known'] == 31
+        solomon_path = _write(directory, 'S4.txt', SOLOMON_INSTANCE)
+        _write(directory, 'best_known.csv', "instance,best_known\nT-n5-k2,29.5\nS4,35.5\n")
+        assert load_instance(path)['best_known'] == 29.5
+        assert load_instance(solomon_path)['best_known'] == 35.5
+
+def test_find_instances():
+    """.vrp files and Solomon .txt files are found recursively; other text files are not"""
+    with tempfile.TemporaryDirectory() as directory:
+        expected = [_write(directory, 'T-n5-k2.vrp', CVRPLIB_INSTANCE),
+                    _write(directory, os.path.join('solomon', 'S4.txt'), SOLOMON_INSTANCE)]
+        _write(directory, 'README.txt', "Instances downloaded from CVRPLIB\n")
+        _write(directory, os.path.join('solomon', 'notes.txt'), "VEHICLE routing notes\n")
+        _write(directory, 'T-n5-k2.sol', "Cost 31\n")
+        assert find_instances(directory) == sorted(expected)
+        assert find_instances(directory, pattern='S*') == [expected[1]]
+
+def test_score_routes():
+    """Closed-route cost, gap and every feasibility counter"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(directory, 'S4.txt', SOLOMON_INSTANCE)
+        _write(directory, 'best_known.csv', "instance,best_known\nS4,35.5\n")
+        instance = load_instance(path)
+
+        # 0-2-3-0 = 5 + 5 + 10, 0-1-0 = 20; customer 3 waits until it opens at 40
+        result = score_routes(instance, [[2, 3], [1]])
+        assert result['cost'] == 40.0 and result['vehicles'] == 2
+        assert (result['missing_customers'], result['duplicate_visits'],
+                result['capacity_violations'], result['time_window_violations']) == (0, 0, 0, 0)
+        assert np.isclose(result['gap_percent'], (40.0 - 35.5) / 35.5 * 100)
+
+        # Customer 2 is reached at 48, after its due date 20
+        assert score_routes(instance, [[1, 3, 2]])['time_window_violations'] == 1
+        result = score_routes(instance, [[2, 2], [1], []])
+        assert (result['missing_customers'], result['duplicate_visits'], result['vehicles']) == (1, 1, 2)
+
+        cvrp = load_instance(_write(directory, 'T-n5-k2.vrp', CVRPLIB_INSTANCE))
+        result = score_routes(cvrp, [[1, 2, 3, 4]])
+        assert result['capacity_violations'] == 1 and result['time_window_violations'] == 0
+
+def test_time_windows_only_for_time_window_solvers():
+    """Solomon instances are solved by nearest_neighbor_tw and reported unsupported by the others"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(directory, 'S4.txt', SOLOMON_INSTANCE)
+        instance = load_instance(path)
+        routes = SOLVERS['nearest_neighbor_tw'](instance, None)
+        assert score_routes(instance, routes)['time_window_violations'] == 0
+
+        assert _solve_task('nearest_neighbor_tw', path, None)['status'] == 'ok'
+        assert _solve_task('savings', path, None)['status'] == 'unsupported'
+        cvrp_path = _write(directory, 'T-n5-k2.vrp', CVRPLIB_INSTANCE)
+        for solver in ('savings', 'nearest_neighbor_tw'):
+            assert _solve_task(solver, cvrp_path, None)['status'] == 'ok'
+
+if __name__ == "__main__":
+    print("🧪 Testing benchmark runner...")
+    for test in (test_parse_cvrplib, test_parse_solomon, test_best_known_lookup, test_find_instances,
+                 test_score_routes, test_time_windows_only_for_time_window_solvers):
+        test()
+        print(f"   ✅ {test.__name__}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script untuk baseline heuristik: validitas rute (setiap customer tepat
+sekali, kapasitas terpenuhi) dan konvensi jarak VRPDynamicEnv (open last)
+"""
+
+import numpy as np
+import pandas as pd
+
+from conftest import random_customers
+from env.vrp_env import VRPDynamicEnv
+from heuristics import (BASELINES, distance_matrix, improve_routes, nearest_neighbor_routes, order_routes,
+                        route_lengths, run_baselines, savings_routes, solution_distance, sweep_routes, two_opt)
+
+CAPACITY = 2000.0
+
+def _assert_valid(routes, demand: np.ndarray, capacity: float, name: str):
+    visited = [customer for route in routes for customer in route]
+    assert sorted(visited) == list(range(1, len(demand))), f"{name}: customers not visited exactly once"
+    for route in routes:
+        assert route, f"{name}: empty route"
+        assert demand[route].sum() <= capacity + 1e-9, f"{name}: route {route} exceeds capacity"
+
+def test_routes_visit_each_customer_once_within_capacity():
+    """savings_routes, sweep_routes, nearest neighbor and 2-opt give valid solutions"""
+    for n_customers, seed in ((1, 0), (2, 1), (7, 2), (25, 3), (60, 4)):
+        df = random_customers(n_customers, seed)
+        distances = distance_matrix(df)
+        demand = df['demand'].to_numpy()
+
+        solutions = {
+            'nearest_neighbor': nearest_neighbor_routes(distances, demand, CAPACITY),
+            'savings': savings_routes(distances, demand, CAPACITY),
+            'sweep': sweep_routes(df, distances, demand, CAPACITY),
+            'sweep_closed': sweep_routes(df, distances, demand, CAPACITY, open_last=False),
+        }
+        solutions['savings_2opt'] = improve_routes(solutions['savings'], distances)
+        for name, routes in solutions.items():
+            _assert_valid(routes, demand, CAPACITY, f'{name} (n={n_customers})')
+
+        for name, result in run_baselines(df, CAPACITY).items():
+            _assert_valid(result['routes'], demand, CAPACITY, f'run_baselines {name} (n={n_customers})')
+            assert np.isclose(result['distance_km'], solution_distance(result['routes'], distances))
+        assert set(run_baselines(df, CAPACITY)) == set(BASELINES)
+
+def test_two_opt_keeps_customers_and_does_not_lengthen():
+    """2-opt returns a permutation of its route that is no longer (closed or open)"""
+    df = random_customers(30, 5)
+    distances = distance_matrix(df)
+    route = list(np.random.default_rng(0).permutation(np.arange(1, 31)))
+
+    closed = two_opt(route, distances)
+    assert sorted(closed) == sorted(route)
+    assert route_lengths([closed], distances)[0] <= route_lengths([route], distances)[0] + 1e-9
+
+    def open_length(tour):
+        path = np.concatenate(([0], tour))
+        return distances[path[:-1], path[1:]].sum()
+
+    opened = two_opt(route, distances, open_end=True)
+    assert sorted(opened) == sorted(route)
+    assert open_length(opened) <= open_length(route) + 1e-9
+    # Optimizing the open path is never worse than reusing the closed tour
+    assert open_length(opened) <= open_length(closed) + 1e-9
+
+    # Short routes are returned unchanged
+    assert two_opt([3, 1], distances) == [3, 1]
+
+def test_infeasible_demand_rejected():
+    """A customer heavier than the vehicle capacity cannot be routed"""
+    df = random_customers(5, 6)
+    df.loc[3, 'demand'] = CAPACITY + 1
+    distances = distance_matrix(df)
+    demand = df['demand'].to_numpy()
+    for solver in (lambda: savings_routes(distances, demand, CAPACITY),
+                   lambda: sweep_routes(df, distances, demand, CAPACITY),
+                   lambda: nearest_neighbor_routes(distances, demand, CAPACITY)):
+        try:
+            solver()
+        except ValueError:
+            continue
+        raise AssertionError("Demand above capacity should raise ValueError")
+
+def test_solution_distance_open_last():
+    """Closed routes minus the longest return leg, the route driven last"""
+    # Depot 0, customers 1..3 on a line: d(i, j) = |x_i - x_j|
+    x = np.array([0.0, 1.0, 2.0, 5.0])
+    distances = np.abs(x[:, None] - x[None, :])
+    routes = [[3], [1, 2]]
+    assert route_lengths(routes, distances).tolist() == [10.0, 4.0]
+    # Route [3] has the longest return leg (5), so it is driven last
+    assert solution_distance(routes, distances) == 14.0 - 5.0
+    assert order_routes(routes, distances) == [[1, 2], [3]]
+    assert solution_distance([[2, 1]], distances) == 2.0 + 1.0
+    assert solution_distance([[], []], distances) == 0.0
+
+def test_solution_distance_matches_environment():
+    """Driving order_routes in VRPDynamicEnv gives the same total distance"""
+    # Each route fills a vehicle exactly, so the environment switches
+    # vehicles at the same points as the routes
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'latitude': -6.2 + rng.uniform(-0.3, 0.3, 7),
+        'longitude': 106.8 + rng.uniform(-0.3, 0.3, 7),
+        'demand': [0.0, 600.0, 400.0, 300.0, 700.0, 500.0, 500.0]
+    })
+    distances = distance_matrix(df)
+    routes = order_routes([[1, 2], [3, 4], [5, 6]], distances)
+
+    env = VRPDynamicEnv(df, n_vehicles=3, max_capacity=1000.0)
+    env.reset()
+    for customer in [customer for route in routes for customer in route]:
+        _, _, done, info = env.step(customer)
+    assert done and info['vehicles_used'] == 3
+    assert np.isclose(info['total_distance'], solution_distance(routes, distances))
+    assert info['total_distance'] < route_lengths(routes, distances).sum()
+
+if __name__ == "__main__":
+    print("🧪 Testing baseline heuristics...")
+    for test in (test_routes_visit_each_customer_once_within_capacity,
+                 test_two_opt_keeps_customers_and_does_not_lengthen,
+                 test_infeasible_demand_rejected,
+                 test_solution_distance_open_last,
+                 test_solution_distance_matches_environment):
+        test()
+        print(f"   ✅ {test.__name__}")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script untuk hyperparameter sweep runner (manual_hyperparameter_tuner.py):
+rung budgets, urutan promosi ASHA vs SHA, resume dari SweepStore dan TPESampler.
+Training tidak dijalankan; job diselesaikan langsung dengan skor buatan.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manual_hyperparameter_tuner import SweepRunner, SweepStore, TPESampler, rung_budgets
+
+SPACE = {'model.learning_rate': {'type': 'uniform', 'low': 0.0, 'high': 1.0}}
+
+def _runner(sweep_dir: str, scheduler: str, num_trials: int = 27, workers: int = 1, **settings) -> SweepRunner:
+    # Customers are copied into the sweep directory on first use
+    customers_path = os.path.join(sweep_dir, 'customers.csv')
+    if not os.path.exists(customers_path):
+        with open(customers_path, 'w') as f:
+            f.write('latitude,longitude,demand\n')
+    settings = dict({'search': 'random', 'num_trials': num_trials, 'scheduler': scheduler, 'min_episodes': 1,
+                     'max_episodes': 9, 'reduction_factor': 3, 'space': SPACE}, **settings)
+    return SweepRunner(sweep_dir, settings, workers=workers)
+
+def _start(runner: SweepRunner, trial_id: int, rung: int):
+    """SweepRunner._submit bookkeeping without the process pool."""
+    runner.store.append({'event': 'job', 'trial': trial_id, 'rung': rung})
+    runner.trials[trial_id]['target_rung'] = rung
+    runner.running[trial_id] = (None, rung)
+
+def _finish(runner: SweepRunner, trial_id: int, fail: bool = False):
+    _, rung = runner.running.pop(trial_id)
+    if fail:
+        runner.store.append({'event': 'failed', 'trial': trial_id, 'rung': rung, 'error': 'RuntimeError: boom'})
+        runner.trials[trial_id]['error'] = 'RuntimeError: boom'
+        return
+    # Score = the sampled parameter, so the ranking is known in advance
+    score = runner.trials[trial_id]['params']['model.learning_rate']
+    event = {'event': 'result', 'trial': trial_id, 'rung': rung, 'episodes': runner.rungs[rung],
+             'metrics': {'total_reward': score}, 'epsilon': 0.5, 'seconds': 0.0}
+    runner.store.append(event)
+    runner.trials[trial_id]['results'][rung] = event
+
+def _simulate(runner: SweepRunner, max_jobs: int = None, fail=()):
+    """Run the scheduling loop; the oldest running job finishes first. Returns the (trial, rung) order."""
+    order = []
+    while max_jobs is None or len(order) < max_jobs:
+        while len(runner.running) < runner.workers and (max_jobs is None or len(order) < max_jobs):
+            job = runner._next_job()
+            if job is None:
+                break
+            _start(runner, *job)
+            order.append(job)
+        if not runner.running:
+            break
+        trial_id = next(iter(runner.running))
+        _finish(runner, trial_id, fail=(trial_id, runner.running[trial_id][1]) in fail)
+    return order
+
+def test_rung_budgets():
+    """Budgets grow by eta and always end at max_episodes"""
+    assert rung_budgets(1, 9, 3) == [1, 3, 9]
+    assert rung_budgets(25, 225, 3) == [25, 75, 225]
+    assert rung_budgets(10, 100, 3) == [10, 30, 90, 100]
+    assert rung_budgets(4, 10, 2) == [4, 8, 10]
+    assert rung_budgets(5, 5, 3) == [5]
+
+def test_sha_promotes_full_rungs():
+    """SHA: every rung finishes before anything is promoted out of it, for any worker count"""
+    for workers in (1, 2, 4):
+        with tempfile.TemporaryDirectory() as directory:
+            runner = _runner(directory, 'sha', workers=workers)
+            order = _simulate(runner)
+            rungs = [rung for _, rung in order]
+            assert rungs == [0] * 27 + [1] * 9 + [2] * 3, (workers, order)
+
+            # The top 1/eta of each rung is promoted
+            scores = {trial_id: trial['params']['model.learning_rate'] for trial_id, trial in runner.trials.items()}
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            assert {trial_id for trial_id, rung in order if rung == 1} == set(ranked[:9])
+            assert {trial_id for trial_id, rung in order if rung == 2} == set(ranked[:3])
+
+def test_sha_counts_failed_trials():
+    """Failed trials settle their rung, so SHA does not wait for them forever"""
+    with tempfile.TemporaryDirectory() as directory:
+        runner = _runner(directory, 'sha', num_trials=9)
+        order = _simulate(runner, fail={(0, 0)})
+        # 8 results at rung 0 -> 2 promotions, 2 results at rung 1 -> none to rung 2
+        assert [rung for _, rung in order] == [0] * 9 + [1, 1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        runner = _runner(directory, 'sha')
+        # Random search parameters depend only on the seed and trial id
+        best = max(range(27), key=lambda trial_id: runner._new_params(trial_id)['model.learning_rate'])
+        order = _simulate(runner, fail={(best, 1)})
+        # 8 results and one failure close rung 1 -> 8 // 3 promotions to rung 2
+        assert [rung for _, rung in order] == [0] * 27 + [1] * 9 + [2] * 2
+        assert (best, 2) not in order
+
+def test_asha_promotes_before_rung_fills():
+    """ASHA promotes as soon as a trial is in the top 1/eta of the results so far"""
+    with tempfile.TemporaryDirectory() as directory:
+        runner = _runner(directory, 'asha')
+        order = _simulate(runner)
+        first_promotion = next(index for index, (_, rung) in enumerate(order) if rung == 1)
+        assert first_promotion < 27
+        assert sum(rung == 0 for _, rung in order) == 27
+        assert sum(rung == 2 for _, rung in order) >= 3
+
+def test_sweep_store_resume():
+    """Replaying trials.jsonl restores trials; interrupted jobs run first, failed trials are not retried"""
+    with tempfile.TemporaryDirectory() as directory:
+        runner = _runner(directory, 'sha', num_trials=6, workers=2)
+        order = _simulate(runner, max_jobs=4, fail={(1, 0)})
+        # Trial 3 was still running when the sweep stopped
+        assert order == [(0, 0), (1, 0), (2, 0), (3, 0)] and list(runner.running) == [3]
+
+        trials = SweepStore(directory).trials()
+        assert sorted(trials) == [0, 1, 2, 3]
+        assert trials[1]['error'] == 'RuntimeError: boom' and trials[1]['results'] == {}
+        assert trials[3]['target_rung'] == 0 and trials[3]['results'] == {}
+        assert trials[0]['params'] == runner.trials[0]['params']
+        assert trials[0]['results'][0]['metrics'] == runner.trials[0]['results'][0]['metrics']
+
+        # Stored settings win over the ones passed on resume
+        resumed = _runner(directory, 'asha', num_trials=6, workers=2, reduction_factor=2)
+        assert resumed.settings['scheduler'] == 'sha' and resumed.eta == 3
+        assert resumed._next_job() == (3, 0)
+        order = _simulate(resumed)
+        assert order[0] == (3, 0)
+        assert all(trial_id != 1 for trial_id, _ in order)
+        assert sorted(resumed.trials) == list(range(6))
+        # 5 results at rung 0 -> one promotion to rung 1, none to rung 2
+        assert [rung for _, rung in order].count(1) == 1 and [rung for _, rung in order].count(2) == 0
+
+def test_tpe_sampler():
+    """Random until n_startup scores, then suggestions follow the good region"""
+    space = {'x': {'type': 'uniform', 'low': 0.0, 'high': 10.0},
+             'lr': {'type': 'loguniform', 'low': 1e-4, 'high': 1e-1},
+             'units': {'type': 'int', 'low': 16, 'high': 256},
+             'layers': {'type': 'choice', 'values': [[64], [128, 64], [256, 128]]}}
+    sampler = TPESampler(n_startup=5)
+    rng = np.random.default_rng(0)
+
+    # Good trials: high x, [128, 64]
+    observations = []
+    for i in range(40):
+        x = float(rng.uniform(0, 10))
+        layers = space['layers']['values'][i % 3]
+        observations.append(({'x': x, 'lr': 1e-3, 'units': 64, 'layers': layers},
+                             x + (5.0 if layers == [128, 64] else 0.0)))
+
+    # Too few observations: plain random sampling
+    assert sampler.suggest(space, observations[:4], np.random.default_rng(1)) == \
+        sampler.suggest(space, [], np.random.default_rng(1))
+
+    suggestions = [sampler.suggest(space, observations, np.random.default_rng(seed)) for seed in range(50)]
+    for params in suggestions:
+        assert 0.0 <= params['x'] <= 10.0 and 1e-4 <= params['lr'] <= 1e-1
+        assert isinstance(params['units'], int) and 16 <= params['units'] <= 256
+        assert params['layers'] in space['layers']['values']
+    assert np.mean([params['x'] for params in suggestions]) > 7.0
+    assert sum(params['layers'] == [128, 64] for params in suggestions) > 35
+
+if __name__ == "__main__":
+    print("🧪 Testing hyperparameter sweep runner...")
+    for test in (test_rung_budgets, test_sha_promotes_full_rungs, test_sha_counts_failed_trials,
+                 test_asha_promotes_before_rung_fills, test_sweep_store_resume, test_tpe_sampler):
+        test()
+        print(f"   ✅ {test.__name__}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test script untuk replay buffer DQN: sum tree, prioritized replay,
+n-step returns dan snapshot save/load
+"""
+
+import tempfile
+
+import numpy as np
+
+from model.replay_buffer import NStepBuffer, PrioritizedReplayBuffer, ReplayBuffer, SumTree
+
+def _fill(buffer, n, state_size=3):
+    for i in range(n):
+        state = np.full(state_size, i, dtype=np.float32)
+        buffer.add(state, i % 4, float(i), state + 1, i % 7 == 6)
+
+def test_sum_tree_find_proportions():
+    """Leaves are found in proportion to their priority"""
+    # Non power-of-two capacity: padded leaves must never be returned
+    tree = SumTree(5)
+    priorities = np.array([1.0, 2.0, 3.0, 4.0, 0.0])
+    tree.update(np.arange(5), priorities)
+    assert tree.total() == 10.0
+
+    # Evenly spaced prefix sums hit each leaf exactly p_i / total of the time
+    values = (np.arange(1000) + 0.5) * tree.total() / 1000
+    counts = np.bincount(tree.find(values), minlength=tree.tree_capacity)
+    assert counts.tolist()[:5] == [100, 200, 300, 400, 0]
+    assert counts[5:].sum() == 0
+
+    # Range boundaries belong to the next leaf
+    assert tree.find([0.0, 1.0, 3.0, 6.0, 9.999]).tolist() == [0, 1, 2, 3, 3]
+
+    # Updating one leaf refreshes the sums on its path
+    tree.update(np.array([0]), np.array([6.0]))
+    assert tree.total() == 15.0
+    assert tree.find([5.9, 6.0]).tolist() == [0, 1]
+
+def test_prioritized_sampling_proportions():
+    """PER draws indices proportionally to priority ** alpha"""
+    buffer = PrioritizedReplayBuffer(8, seed=0, alpha=0.5)
+    _fill(buffer, 4)
+    buffer.update_priorities(np.arange(4), np.array([1.0, 4.0, 9.0, 16.0]) - buffer.epsilon)
+
+    counts = np.zeros(4)
+    for _ in range(500):
+        counts += np.bincount(buffer.sample_indices(32), minlength=4)
+    expected = np.array([1.0, 2.0, 3.0, 4.0]) / 10.0
+    assert np.allclose(counts / counts.sum(), expected, atol=0.01)
+    assert counts.sum() == 500 * 32
+
+def test_importance_weights_normalised():
+    """IS weights are (N * P(i)) ** -beta scaled so the largest is 1"""
+    buffer = PrioritizedReplayBuffer(8, seed=0, alpha=1.0, beta=0.4, beta_steps=3)
+    _fill(buffer, 4)
+    buffer.update_priorities(np.arange(4), np.array([1.0, 2.0, 3.0, 4.0]) - buffer.epsilon)
+
+    indices = np.array([0, 1, 2, 3, 3])
+    weights = buffer.importance_weights(indices)
+    probabilities = np.array([1.0, 2.0, 3.0, 4.0, 4.0]) / 10.0
+    expected = (4 * probabilities) ** -0.4
+    assert weights.dtype == np.float32
+    assert np.allclose(weights, expected / expected.max())
+    assert weights.max() == 1.0
+    # Lowest priority gets the largest correction
+    assert weights.argmax() == 0
+
+    # beta anneals to 1 over beta_steps calls and stays there
+    for _ in range(5):
+        buffer.importance_weights(indices)
+    assert buffer.beta == 1.0
+    weights = buffer.importance_weights(indices)
+    assert np.allclose(weights, probabilities.min() / probabilities)
+
+def test_n_step_returns_across_done():
+    """n-step returns are cut at episode end, shorter tails are flushed"""
+    gamma = 0.5
+    n_step = NStepBuffer(3, gamma)
+    states = [np.array([float(i)]) for i in range(6)]
+    rewards = [1.0, 2.0, 4.0, 8.0, 16.0]
+
+    emitted = []
+    for t in range(5):
+        emitted.extend(n_step.push(states[t], t, rewards[t], states[t + 1], t == 4))
+    assert len(n_step) == 0
+    assert [transition[1] for transition in emitted] == [0, 1, 2, 3, 4]
+
+    # Full windows bootstrap from the state 3 steps later
+    assert emitted[0][2] == 1.0 + 0.5 * 2.0 + 0.25 * 4.0
+    assert emitted[1][2] == 2.0 + 0.5 * 4.0 + 0.25 * 8.0
+    assert not emitted[0][4] and np.array_equal(emitted[0][3], states[3])
+    # Windows reaching the end: shorter return, terminal next state, done
+    assert emitted[2][2] == 4.0 + 0.5 * 8.0 + 0.25 * 16.0
+    assert emitted[3][2] == 8.0 + 0.5 * 16.0
+    assert emitted[4][2] == 16.0
+    for transition in emitted[2:]:
+        assert transition[4] and np.array_equal(transition[3], states[5])
+
+def test_n_step_truncation_drops_pending():
+    """An episode cut off without done does not leak into the next one"""
+    n_step = NStepBuffer(3, 0.9)
+    emitted = n_step.push(np.array([0.0]), 0, 1.0, np.array([1.0]), False)
+    emitted += n_step.push(np.array([1.0]), 1, 1.0, np.array([2.0]), False)
+    assert emitted == [] and len(n_step) == 2
+
+    # New episode starts from a state that does not continue the last one
+    emitted = n_step.push(np.array([10.0]), 5, 3.0, np.array([11.0]), True)
+    assert len(emitted) == 1
+    state, action, n_step_return, next_state, done = emitted[0]
+    assert action == 5 and n_step_return == 3.0 and done
+    assert np.array_equal(state, [10.0]) and np.array_equal(next_state, [11.0])
+
+    # In-place updates of the caller's arrays do not change pending states
+    state = np.array([0.0])
+    next_state = np.array([1.0])
+    n_step.push(state, 0, 1.0, next_state, False)
+    state[:] = next_state
+    next_state += 1
+    emitted = n_step.push(state, 1, 1.0, next_state, True)
+    assert [transition[0][0] for transition in emitted] == [0.0, 1.0]
+
+    # n_step=1 passes transitions through unchanged
+    single = NStepBuffer(1, 0.9)
+    assert single.push(np.array([0.0]), 2, 1.5, np.array([1.0]), False)[0][1:3] == (2, 1.5)
+
+def _assert_same_buffer(restored, buffer):
+    assert (restored.position, restored.size) == (buffer.position, buffer.size)
+    for name in ('states', 'actions', 'rewards', 'next_states', 'dones'):
+        assert np.array_equal(getattr(restored, name)[:buffer.size], getattr(buffer, name)[:buffer.size])
+    # Sampling RNG is restored, so both draw the same batches
+    for a, b in zip(restored.sample(16), buffer.sample(16)):
+        assert np.array_equal(a, b)
+
+def test_replay_buffer_save_load():
+    """Snapshots round-trip for partially filled and full (memory-mapped) buffers"""
+    with tempfile.TemporaryDirectory() as directory:
+        partial = ReplayBuffer(16, seed=1)
+        _fill(partial, 10)
+        partial.save(directory)
+        restored = ReplayBuffer(16)
+        restored.load(directory)
+        _assert_same_buffer(restored, partial)
+        # Partial buffers keep growing after a restore
+        _fill(restored, 3)
+        assert len(restored) == 13
+
+    with tempfile.TemporaryDirectory() as directory:
+        full = ReplayBuffer(16, seed=2)
+        _fill(full, 20)
+        full.save(directory)
+        restored = ReplayBuffer(16)
+        restored.load(directory)
+        assert isinstance(restored.states, np.memmap)
+        _assert_same_buffer(restored, full)
+
+        # Copy-on-write: new transitions do not touch the snapshot, and
+        # saving back into the loaded directory is allowed
+        _fill(restored, 2)
+        assert np.load(f'{directory}/actions.npy')[full.position] == full.actions[full.position]
+        restored.save(directory)
+        # save() releases the mapping, so the snapshot files are free to be
+        # replaced or removed (required on Windows)
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones'):
+            assert not isinstance(getattr(restored, name), np.memmap)
+        again = ReplayBuffer(16)
+        again.load(directory, mmap_mode=None)
+        _assert_same_buffer(again, restored)
+
+def test_prioritized_save_load():
+    """Priorities, max priority and annealed beta survive a snapshot"""
+    with tempfile.TemporaryDirectory() as directory:
+        buffer = PrioritizedReplayBuffer(8, seed=3, alpha=0.7, beta=0.5)
+        _fill(buffer, 6)
+        buffer.update_priorities(np.arange(6), np.linspace(0.5, 3.0, 6))
+        buffer.importance_weights(np.arange(6))
+        buffer.save(directory)
+
+        restored = PrioritizedReplayBuffer(8)
+        restored.load(directory)
+        assert np.array_equal(restored.tree.tree, buffer.tree.tree)
+        assert (restored.alpha, restored.beta, restored.max_priority) == \
+            (buffer.alpha, buffer.beta, buffer.max_priority)
+        assert np.array_equal(restored.sample_indices(8), buffer.sample_indices(8))
+
+        # Mismatched capacity is rejected
+        try:
+            PrioritizedReplayBuffer(4).load(directory)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Loading into a smaller buffer should fail")
+
+def main():
+    """Run all replay buffer tests"""
+    print("🧪 Testing replay buffers...")
+    for test in (test_sum_tree_find_proportions, test_prioritized_sampling_proportions,
+                 test_importance_weights_normalised, test_n_step_returns_across_done,
+                 test_n_step_truncation_drops_pending, test_replay_buffer_save_load,
+                 test_prioritized_save_load):
+        test()
+        print(f"   ✅ {test.__name__}")
+
+if __name__ == "__main__":
+    main()
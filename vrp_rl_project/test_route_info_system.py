@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script untuk RouteInfoSystem: get_fleet_route_info harus sama dengan
+get_vehicle_route_info per kendaraan (jarak, ETA dan field per segmen)
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from route_info_system import RouteInfoSystem
+
+# Points inside each area box of _get_area_from_coordinates, plus one outside all of them
+AREA_POINTS = [(-6.195, 106.81), (-6.20, 106.86), (-6.225, 106.80), (-6.16, 106.865), (-6.30, 106.70)]
+
+def _random_fleet(rng: np.random.Generator):
+    """Vehicles with 0-6 stops, closed at the depot (some routes empty or a single point)."""
+    depot = (-6.2088, 106.8456)
+    fleet = {}
+    for vehicle_id in range(int(rng.integers(1, 6))):
+        n_stops = int(rng.integers(0, 7))
+        stops = [tuple(np.add(AREA_POINTS[rng.integers(len(AREA_POINTS))], rng.uniform(-0.004, 0.004, 2)))
+                 for _ in range(n_stops)]
+        fleet[vehicle_id * 10 + 1] = [depot] + stops + [depot] if n_stops else [depot][:int(rng.integers(0, 2))]
+    return fleet
+
+def _assert_same_route(actual, expected):
+    assert set(actual) == set(expected)
+    for key in ('vehicle_id', 'weather_condition', 'start_time'):
+        assert actual[key] == expected[key], key
+    assert np.isclose(actual['total_distance'], expected['total_distance'])
+    assert np.isclose(actual['total_time'], expected['total_time'])
+    # The per-vehicle path accumulates timedeltas rounded to microseconds
+    tolerance = timedelta(milliseconds=1)
+    assert abs(actual['estimated_completion'] - expected['estimated_completion']) < tolerance
+
+    assert len(actual['route_segments']) == len(expected['route_segments'])
+    for leg, reference in zip(actual['route_segments'], expected['route_segments']):
+        assert set(leg) == set(reference)
+        for key in ('from', 'to', 'road_segments', 'traffic_condition', 'weather_condition'):
+            assert leg[key] == reference[key], key
+        for key in ('distance', 'travel_time', 'adjusted_speed'):
+            assert np.isclose(leg[key], reference[key]), key
+        assert abs(leg['estimated_arrival'] - reference['estimated_arrival']) < tolerance
+        assert len(leg['route_details']) == len(reference['route_details'])
+        for detail, reference_detail in zip(leg['route_details'], reference['route_details']):
+            assert detail.keys() == reference_detail.keys()
+            assert np.isclose(detail.pop('estimated_time'), reference_detail.pop('estimated_time'))
+            assert detail == reference_detail
+
+def test_fleet_route_info_matches_per_vehicle():
+    """Vectorized fleet legs equal get_vehicle_route_info, also across rush-hour boundaries"""
+    system = RouteInfoSystem()
+    rng = np.random.default_rng(0)
+    for trial in range(12):
+        fleet = _random_fleet(rng)
+        weather = list(system.weather_conditions)[trial % 4]
+        # Slow weather and starts close to 07:00, 10:00, 17:00 and 20:00 make legs change traffic period
+        start_time = datetime(2024, 5, 6, int(rng.choice([6, 9, 16, 19, 23])), int(rng.integers(0, 60)))
+
+        # Default road segments are random: both paths draw them in the same order
+        random.seed(trial)
+        expected = {vehicle_id: system.get_vehicle_route_info(vehicle_id, route, weather, start_time)
+                    for vehicle_id, route in fleet.items()}
+        random.seed(trial)
+        actual = system.get_fleet_route_info(fleet, weather, start_time)
+
+        assert list(actual) == list(expected)
+        for vehicle_id in fleet:
+            _assert_same_route(actual[vehicle_id], expected[vehicle_id])
+
+if __name__ == "__main__":
+    print("🧪 Testing fleet route info...")
+    test_fleet_route_info_matches_per_vehicle()
+    print("   ✅ test_fleet_route_info_matches_per_vehicle")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script untuk route search: RouteBatch harus sama persis dengan
+VRPDynamicEnv.step untuk urutan aksi valid acak (kapasitas, time window,
+cuaca/lalu lintas)
+"""
+
+import numpy as np
+
+from conftest import random_customers
+from env.vrp_env import VRPDynamicEnv
+from route_search import DECODING_MODES, RouteBatch, search_routes
+
+def _environment(n_customers: int, n_vehicles: int, seed: int) -> VRPDynamicEnv:
+    """random_customers with time windows, under non-default weather/traffic conditions."""
+    env = VRPDynamicEnv(random_customers(n_customers, seed, time_windows=True), n_vehicles=n_vehicles,
+                        max_capacity=2000.0)
+    rng = np.random.default_rng(seed)
+    env.set_conditions(weather_factor=rng.uniform(0.8, 1.5), traffic_factor=rng.uniform(0.8, 1.5))
+    return env
+
+def _check_against_env(n_customers: int, n_vehicles: int, seed: int, size: int = 8):
+    """Step a RouteBatch and one env per row with the same random valid actions."""
+    rng = np.random.default_rng(seed)
+    template = _environment(n_customers, n_vehicles, seed)
+    envs = [_environment(n_customers, n_vehicles, seed) for _ in range(size)]
+    states = np.stack([env.reset() for env in envs])
+    batch = RouteBatch(template, size)
+    rewards = np.zeros(size)
+    finished = np.zeros(size, dtype=bool)
+    infos = [None] * size
+
+    for _ in range(n_customers):
+        masks = batch.action_masks()
+        for row, env in enumerate(envs):
+            expected = env.action_masks() if not finished[row] else np.zeros_like(masks[row])
+            assert np.array_equal(masks[row], expected), f"row {row}: masks differ"
+        assert np.array_equal(batch.observations(), states)
+
+        batch.finish_stuck(masks)
+        finished |= batch.done
+        if finished.all():
+            break
+
+        actions = np.zeros(size, dtype=np.int64)
+        for row in np.flatnonzero(~finished):
+            actions[row] = rng.choice(np.flatnonzero(masks[row]))
+            states[row], reward, done, infos[row] = envs[row].step(actions[row])
+            assert 'error' not in infos[row] or infos[row]['error'] == 'Time window violated'
+            rewards[row] += reward
+            finished[row] = done
+        batch.step(actions)
+        assert np.array_equal(batch.done, finished)
+
+    assert np.array_equal(batch.observations(), states)
+    assert np.allclose(batch.reward, rewards)
+    for row, info in enumerate(infos):
+        result = batch.result(row)
+        assert np.isclose(result['total_distance'], info['total_distance'])
+        assert np.isclose(result['total_time'], info['total_time'])
+        assert result['visited_customers'] == info['visited_customers']
+        assert result['time_window_violations'] == info['time_window_violations']
+        assert len(result['routes']) == info['vehicles_used']
+        assert sorted(result['actions']) == sorted(envs[row].visited_customers - {0})
+        assert result['error'] == ('No feasible stop left' if batch.stuck[row]
+                                   else info.get('error'))
+
+def test_route_batch_matches_environment():
+    """Masks, observations, rewards and totals follow VRPDynamicEnv.step"""
+    for n_customers, n_vehicles, seed in ((1, 1, 0), (6, 2, 1), (12, 4, 2), (20, 5, 3)):
+        _check_against_env(n_customers, n_vehicles, seed)
+
+def test_route_batch_stuck_rows():
+    """Too few vehicles: rows end without a valid action, like the env's all-False mask"""
+    _check_against_env(15, 2, 4)
+
+def test_route_batch_take():
+    """take() copies rows, so duplicated beams advance independently"""
+    env = _environment(8, 2, 5)
+    batch = RouteBatch(env, 1)
+    batch.step(np.array([3]))
+    copies = batch.take(np.array([0, 0]))
+    copies.step(np.array([1, 2]))
+    assert copies.location.tolist() == [1, 2]
+    assert batch.location.tolist() == [3]
+    assert copies.visited[0, 1] and not copies.visited[1, 1] and not batch.visited[0, 1]
+
+def test_search_routes_rejects_bad_arguments():
+    """width below 1 and unknown modes raise ValueError"""
+    env = _environment(5, 2, 6)
+    q_function = lambda states: np.zeros((len(states), env.n_customers), dtype=np.float32)
+    for kwargs in ({'mode': 'beam', 'width': 0}, {'mode': 'sample', 'width': -1}, {'mode': 'exhaustive'}):
+        try:
+            search_routes(q_function, env, **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"search_routes({kwargs}) should raise ValueError")
+
+    for mode in DECODING_MODES:
+        result = search_routes(q_function, env, mode, width=1, seed=0)
+        assert result['visited_customers'] == 5, mode
+
+if __name__ == "__main__":
+    print("🧪 Testing route search...")
+    for test in (test_route_batch_matches_environment,
+                 test_route_batch_stuck_rows,
+                 test_route_batch_take,
+                 test_search_routes_rejects_bad_arguments):
+        test()
+        print(f"   ✅ {test.__name__}")
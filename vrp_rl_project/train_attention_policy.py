@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Training Attention Policy untuk VRP (encoder-decoder dengan pointer)
+Satu model untuk instance dengan jumlah stop berapa pun (4 sampai 1000+), berjalan di CPU.
+
+Usage:
+    python train_attention_policy.py --train
+    python train_attention_policy.py --evaluate --sizes 4 50 200 1000
+"""
+
+import argparse
+import math
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import torch
+
+from utils import load_config
+from env.vrp_env import VRPDynamicEnv
+from model.attention_policy import AttentionPolicy, AttentionPolicyTrainer, random_instance, rollout, solve
+
+MODEL_PATH = 'model/attention_policy.pt'
+
+def make_env(customers_df: pd.DataFrame, max_capacity: float) -> VRPDynamicEnv:
+    """
+    Environment with enough vehicles for the total demand. Vehicles are
+    filled one after another, so about 25% spare capacity is added for the
+    load left unused when a vehicle returns early.
+    """
+    n_vehicles = int(math.ceil(1.25 * customers_df['demand'].sum() / max_capacity)) + 1
+    return VRPDynamicEnv(customers_df, n_vehicles=n_vehicles, max_capacity=max_capacity)
+
+def validation_envs(sizes: List[int], per_size: int, max_capacity: float, seed: int = 1234) -> Dict[int, List[VRPDynamicEnv]]:
+    rng = np.random.default_rng(seed)
+    return {
+        size: [make_env(random_instance(size, rng, max_capacity), max_capacity) for _ in range(per_size)]
+        for size in sizes
+    }
+
+@torch.no_grad()
+def evaluate(policy: AttentionPolicy, envs_by_size: Dict[int, List[VRPDynamicEnv]]) -> Dict[int, Dict]:
+    policy.eval()
+    results = {}
+    for size, envs in envs_by_size.items():
+        start = time.perf_counter()
+        result = rollout(policy, envs, greedy=True)
+        results[size] = {
+            'total_reward': float(result['total_reward'].mean()),
+            'total_distance': float(result['total_distance'].mean()),
+            'completed': float(np.mean([error is None or error == 'Time window violated'
+                                        for error in result['errors']])),
+            'ms_per_instance': 1000 * (time.perf_counter() - start) / len(envs)
+        }
+    return results
+
+def train_attention_policy(config: Dict) -> AttentionPolicy:
+    """
+    Train the attention policy on random instances of mixed size.
+
+    Args:
+        config: Configuration dictionary (attention + environment sections)
+
+    Returns:
+        Trained policy
+    """
+    settings = config.get('attention', {})
+    max_capacity = config['environment']['max_capacity']
+    rng = np.random.default_rng(settings.get('seed', 0))
+    torch.manual_seed(settings.get('seed', 0))
+
+    policy = AttentionPolicy(
+        embedding_dim=settings.get('embedding_dim', 128),
+        n_heads=settings.get('n_heads', 8),
+        n_layers=settings.get('n_layers', 3),
+        feed_forward_dim=settings.get('feed_forward_dim', 512),
+        tanh_clipping=settings.get('tanh_clipping', 10.0)
+    )
+    trainer = AttentionPolicyTrainer(policy, learning_rate=settings.get('learning_rate', 1e-4),
+                                     max_grad_norm=settings.get('max_grad_norm', 1.0))
+
+    epochs = settings.get('epochs', 50)
+    steps_per_epoch = settings.get('steps_per_epoch', 50)
+    batch_size = settings.get('batch_size', 64)
+    min_customers = settings.get('min_customers', 4)
+    max_customers = settings.get('max_customers', 50)
+    validation = validation_envs(settings.get('validation_sizes', [10, 50]), 16, max_capacity)
+
+    print(f"🧠 Attention policy: {sum(p.numel() for p in policy.parameters()):,} parameters")
+    print(f"📊 Epochs: {epochs} x {steps_per_epoch} batches of {batch_size}, "
+          f"{min_customers}-{max_customers} customers per instance")
+    print("=" * 60)
+
+    best_reward = -float('inf')
+    for epoch in range(epochs):
+        start = time.time()
+        stats = []
+        for _ in range(steps_per_epoch):
+            # One size per batch (no padding), a different size every batch
+            size = int(rng.integers(min_customers, max_customers + 1))
+            envs = [make_env(random_instance(size, rng, max_capacity), max_capacity) for _ in range(batch_size)]
+            stats.append(trainer.train_batch(envs))
+
+        results = evaluate(policy, validation)
+        mean_reward = float(np.mean([r['total_reward'] for r in results.values()]))
+        if mean_reward > best_reward:
+            best_reward = mean_reward
+            policy.save(MODEL_PATH)
+
+        print(f"Epoch {epoch:3d} | Loss: {np.mean([s['loss'] for s in stats]):8.3f} | "
+              f"Greedy reward: {np.mean([s['greedy_reward'] for s in stats]):8.2f} | "
+              f"Validation: " + ", ".join(f"n={size}: {r['total_distance']:.1f} km" for size, r in results.items()) +
+              f" | {time.time() - start:.0f}s")
+
+    print(f"\n✅ Training selesai, model terbaik disimpan: {MODEL_PATH}")
+    return AttentionPolicy.load(MODEL_PATH)
+
+def main():
+    parser = argparse.ArgumentParser(description='Attention/pointer policy for VRP')
+    parser.add_argument('--train', action='store_true', help='Train the attention policy')
+    parser.add_argument('--evaluate', action='store_true', help='Evaluate on random instances of several sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 20, 50, 100, 200, 1000],
+                        help='Instance sizes (customers) for --evaluate')
+    parser.add_argument('--epochs', type=int, default=None, help='Override attention.epochs')
+    args = parser.parse_args()
+
+    config = load_config()
+    if args.epochs:
+        config.setdefault('attention', {})['epochs'] = args.epochs
+
+    if args.train:
+        policy = train_attention_policy(config)
+    elif os.path.exists(MODEL_PATH):
+        policy = AttentionPolicy.load(MODEL_PATH)
+    else:
+        print(f"⚠️ Model {MODEL_PATH} tidak ditemukan, menggunakan model random")
+        policy = AttentionPolicy()
+
+    if args.evaluate:
+        max_capacity = config['environment']['max_capacity']
+        print("\n📊 Greedy evaluation:")
+        for size, result in evaluate(policy, validation_envs(args.sizes, 4, max_capacity)).items():
+            print(f"   {size:5d} customers | Distance: {result['total_distance']:9.1f} km | "
+                  f"Reward: {result['total_reward']:10.1f} | Completed: {result['completed']:.0%} | "
+                  f"{result['ms_per_instance']:.0f} ms/instance")
+
+        # Data real PT. Sanghiang (depot + 4 destinasi), jika ada
+        if os.path.exists('data/real_shipments.csv'):
+            customers_df = pd.read_csv('data/real_shipments.csv')
+            route = solve(policy, customers_df, n_vehicles=1, max_capacity=max_capacity)
+            print(f"\n📍 Data real: route {route['routes']}, {route['total_distance']:.2f} km")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Offline training DQN VRP dari transition store di disk (data/transitions)
+Dataset diisi oleh training online dengan offline_data.enabled: true, dari run mana pun.
+
+Usage:
+    python train_offline.py --list
+    python train_offline.py --dataset dqn_s55_a50 --epochs 10
+"""
+
+import argparse
+import copy
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils import load_config
+from model.dqn_model import DQNAgent
+from model.checkpoint_registry import CheckpointRegistry, load_into_agent
+from model.transition_store import DEFAULT_STORE_ROOT, TransitionDataset
+
+def offline_agent(config: Dict, state_size: int, action_size: int) -> DQNAgent:
+    """
+    Agent for learning from stored transitions.
+
+    The store holds raw 1-step transitions sampled uniformly, so n-step
+    returns and prioritized replay are turned off, as is writing to the
+    store itself.
+    """
+    config = copy.deepcopy(config)
+    config.setdefault('advanced_dqn', {}).update(n_step_learning=1, prioritized_replay=False)
+    config.setdefault('offline_data', {})['enabled'] = False
+    return DQNAgent(state_size=state_size, action_size=action_size, config=config)
+
+def train_offline(dataset: TransitionDataset, config: Dict, epochs: int,
+                  init_weights: Optional[str] = None, run: str = 'dqn_offline') -> DQNAgent:
+    """
+    Train a DQN agent on minibatches streamed from a transition dataset.
+
+    Args:
+        dataset: Transition dataset
+        config: Configuration dictionary (model + offline_data sections)
+        epochs: Passes over the dataset
+        init_weights: Checkpoint to start from (optional)
+        run: Checkpoint run name in the registry
+
+    Returns:
+        Trained agent
+    """
+    settings = config.get('offline_data', {})
+    state_size = dataset.state_shape[0]
+    action_size = dataset.spec['action_size']
+    agent = offline_agent(config, state_size, action_size)
+    if init_weights:
+        load_into_agent(agent, init_weights)
+        agent.update_target_model()
+        print(f"Loaded initial weights: {init_weights}")
+
+    target_update_steps = settings.get('target_update_steps', 500)
+    window_chunks = settings.get('window_chunks', 4)
+    registry = CheckpointRegistry()
+    updates = 0
+
+    print(f"📦 Dataset: {dataset.directory} ({len(dataset):,} transitions, {len(dataset.chunks)} chunks)")
+    print(f"📊 Epochs: {epochs}, batch size: {agent.batch_size}")
+    print("=" * 60)
+
+    for epoch in range(epochs):
+        start = time.time()
+        losses = []
+        for states, actions, rewards, next_states, dones in dataset.iter_batches(
+                agent.batch_size, seed=epoch, window_chunks=window_chunks):
+            loss, _ = agent.learn_batch(states, actions, rewards, next_states, dones)
+            losses.append(loss)
+            updates += 1
+            if updates % target_update_steps == 0:
+                agent.update_target_model()
+
+        checkpoint_path = f'model/checkpoints/{run}_episode_{epoch}.weights.h5'
+        agent.save(checkpoint_path)
+        registry.register(
+            checkpoint_path, config=config, run=run,
+            state_size=state_size, action_size=action_size,
+            episode=epoch, step=updates,
+            metrics={'loss': float(np.mean(losses)) if losses else None,
+                     'dataset_transitions': len(dataset)}
+        )
+
+        elapsed = time.time() - start
+        print(f"Epoch {epoch:3d} | Loss: {np.mean(losses) if losses else float('nan'):10.4f} | "
+              f"Updates: {len(losses):6d} | {len(losses) * agent.batch_size / max(elapsed, 1e-9):8.0f} transitions/s")
+
+        # Picks up chunks written by runs still in progress
+        dataset.refresh()
+
+    return agent
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline DQN training from the transition store')
+    parser.add_argument('--list', action='store_true', help='List stored datasets')
+    parser.add_argument('--dataset', default=None, help='Dataset name under offline_data.root (or a directory)')
+    parser.add_argument('--epochs', type=int, default=None, help='Override offline_data.epochs')
+    parser.add_argument('--init', default=None, help='Checkpoint to start from')
+    args = parser.parse_args()
+
+    config = load_config()
+    root = config.get('offline_data', {}).get('root', DEFAULT_STORE_ROOT)
+
+    if args.list or not args.dataset:
+        names = sorted(os.listdir(root)) if os.path.isdir(root) else []
+        if not names:
+            print(f"⚠️ Belum ada dataset di {root} (training dengan offline_data.enabled: true)")
+        for name in names:
+            try:
+                dataset = TransitionDataset(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            print(f"   {name:30s} {len(dataset):12,} transitions  {len(dataset.chunks):5d} chunks  "
+                  f"state {dataset.state_shape}, {dataset.spec.get('action_size')} actions")
+        return
+
+    directory = args.dataset if os.path.isdir(args.dataset) else os.path.join(root, args.dataset)
+    dataset = TransitionDataset(directory)
+    epochs = args.epochs or config.get('offline_data', {}).get('epochs', 10)
+    agent = train_offline(dataset, config, epochs, init_weights=args.init)
+
+    agent.save('model/dqn_offline.weights.h5')
+    CheckpointRegistry().register(
+        'model/dqn_offline.weights.h5', config=config, run='dqn_offline',
+        state_size=agent.state_size, action_size=agent.action_size, episode=epochs,
+        metrics={'dataset_transitions': len(dataset)}
+    )
+    print("\n✅ Offline training selesai: model/dqn_offline.weights.h5")
+
+if __name__ == "__main__":
+    main()
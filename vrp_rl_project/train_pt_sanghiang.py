@@ -8,6 +8,8 @@ import torch
 from dqn_model import DQNAgent, VRPEnvironment
 from pt_sanghiang_data import PTSanghiangDataProcessor
 from backend_api import get_weather_data
+from model.transition_store import open_writer
+from utils import load_config
 import matplotlib.pyplot as plt
 
 def train_dqn_pt_sanghiang():
@@ -66,7 +68,17 @@ def train_dqn_pt_sanghiang():
     print(f"🧠 State size: {state_size}")
     print(f"🎯 Action size: {action_size}")
     
-    agent = DQNAgent(state_size, action_size)
+    # Advanced DQN variants dari config.yaml
+    config = load_config()
+    advanced = config.get('advanced_dqn', {})
+    agent = DQNAgent(
+        state_size,
+        action_size,
+        double_dqn=advanced.get('double_dqn', False),
+        dueling_dqn=advanced.get('dueling_dqn', False),
+        n_step=advanced.get('n_step_learning', 1),
+        transition_writer=open_writer(config, state_size, action_size, prefix='sanghiang')
+    )
     
     # Training parameters
     episodes = 1000
@@ -140,6 +152,8 @@ def train_dqn_pt_sanghiang():
     
     # Save model
     model_path = "dqn_pt_sanghiang_model.pth"
+    if agent.transition_writer is not None:
+        agent.transition_writer.flush()
     agent.save(model_path)
     print(f"💾 Model saved to: {model_path}")
     
@@ -5,6 +5,7 @@ Menggantikan training dengan data simulasi 50 customer.
 """
 
 import argparse
+import functools
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
@@ -15,11 +16,19 @@ import os
 from utils import load_config, save_results, plot_route
 from env.vrp_env import VRPDynamicEnv
 from model.dqn_model import DQNAgent
+from model.checkpoint_registry import CheckpointRegistry, load_into_agent
+from distributed_training import train_distributed
+from telemetry import TrainingTelemetry
+from validation import PeriodicValidation
 
 def train_model_real_data(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) -> Dict:
     """
     Train DQN agent dengan data real (4 destinasi).
     
+    Evaluasi greedy periodik (training.evaluation_interval) berjalan di
+    thread terpisah; training berhenti lebih awal bila tidak membaik
+    selama training.early_stopping_patience episode.
+    
     Args:
         env: VRP environment dengan data real
         agent: DQN agent
@@ -31,6 +40,13 @@ def train_model_real_data(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) ->
     episodes = config['training']['episodes']
     max_steps = config['training']['max_steps']
     save_interval = config['training']['save_interval']
+    registry = CheckpointRegistry()
+    validation = PeriodicValidation(env, agent, config, run='dqn_real', registry=registry)
+    total_steps = 0
+    telemetry = TrainingTelemetry(
+        'data/telemetry/train_real.jsonl', interval=config['training'].get('telemetry_interval', 10),
+        metadata={'episodes': episodes, 'max_steps': max_steps, 'batch_size': agent.batch_size}
+    )
     
     results = {
         'episode': [],
@@ -57,19 +73,23 @@ def train_model_real_data(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) ->
                            if i not in env.visited_customers]
             
             # Choose action
-            action = agent.act(state, valid_actions)
+            with telemetry.timer('inference'):
+                action = agent.act(state, valid_actions)
             
             # Take action
-            next_state, reward, done, info = env.step(action)
+            with telemetry.timer('env'):
+                next_state, reward, done, info = env.step(action)
             
             # Store experience
             agent.remember(state, action, reward, next_state, done)
             
             # Train agent
             loss = agent.replay()
+            telemetry.step(loss, agent)
             
             state = next_state
             total_reward += reward
+            total_steps += 1
             
             if done:
                 break
@@ -85,10 +105,26 @@ def train_model_real_data(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) ->
         results['total_time'].append(info.get('total_time', 0))
         results['visited_customers'].append(info.get('visited_customers', 0))
         results['epsilon'].append(agent.epsilon)
+        telemetry.end_episode(
+            episode, epsilon=agent.epsilon, steps=step + 1,
+            total_reward=total_reward,
+            total_distance=info.get('total_distance', 0),
+            total_time=info.get('total_time', 0),
+            visited_customers=info.get('visited_customers', 0)
+        )
         
         # Save model
         if episode % save_interval == 0:
-            agent.save(f'model/checkpoints/dqn_real_episode_{episode}.weights.h5')
+            checkpoint_path = f'model/checkpoints/dqn_real_episode_{episode}.weights.h5'
+            agent.save(checkpoint_path)
+            registry.register(
+                checkpoint_path, config=config,
+                state_size=agent.state_size, action_size=agent.action_size,
+                episode=episode, step=total_steps,
+                metrics={'total_reward': total_reward,
+                         'total_distance': info.get('total_distance', 0),
+                         'visited_customers': info.get('visited_customers', 0)}
+            )
         
         # Print progress
         if episode % 50 == 0 or episode == episodes - 1:
@@ -97,6 +133,17 @@ def train_model_real_data(env: VRPDynamicEnv, agent: DQNAgent, config: Dict) ->
                   f"Time: {info.get('total_time', 0):5.2f} jam | "
                   f"Visited: {info.get('visited_customers', 0):2d}/4 | "
                   f"Epsilon: {agent.epsilon:.3f}")
+        
+        # Validasi dan early stopping
+        if validation.end_episode(episode):
+            print(f"⏹️ Early stopping di episode {episode}: tidak ada perbaikan validasi sejak "
+                  f"episode {validation.early_stopping.best_episode}")
+            break
+    
+    validation.close()
+    telemetry.close(final_epsilon=agent.epsilon)
+    if agent.transition_writer is not None:
+        agent.transition_writer.flush()
     
     return results
 
@@ -227,6 +274,10 @@ def main():
                        help='Evaluate the model dengan data real')
     parser.add_argument('--episodes', type=int, default=1000,
                        help='Number of training episodes')
+    parser.add_argument('--distributed', action='store_true',
+                       help='Training dengan beberapa proses actor dan satu learner')
+    parser.add_argument('--actors', type=int, default=None,
+                       help='Jumlah proses actor untuk --distributed')
     args = parser.parse_args()
     
     # Load configuration
@@ -248,14 +299,30 @@ def main():
         
         # Create environment and agent
         env = VRPDynamicEnv(customers_df, n_vehicles=1)  # 1 kendaraan untuk 4 destinasi
-        agent = DQNAgent(
-            state_size=env.observation_space.shape[0],  # 9 dimensi
-            action_size=env.action_space.n,             # 4 aksi (destinasi)
-            config=config
-        )
         
-        # Train model
-        results = train_model_real_data(env, agent, config)
+        if args.distributed:
+            # Actor membuat env/agent sendiri dari factory ini
+            env_factory = functools.partial(VRPDynamicEnv, customers_df, n_vehicles=1)
+            agent_factory = functools.partial(
+                DQNAgent,
+                state_size=env.observation_space.shape[0],
+                action_size=env.action_space.n,
+                config=config
+            )
+            agent, results = train_distributed(
+                env_factory, agent_factory, config,
+                num_actors=args.actors,
+                checkpoint_pattern='model/checkpoints/dqn_real_episode_{episode}.weights.h5'
+            )
+        else:
+            agent = DQNAgent(
+                state_size=env.observation_space.shape[0],  # 9 dimensi
+                action_size=env.action_space.n,             # 4 aksi (destinasi)
+                config=config
+            )
+            
+            # Train model
+            results = train_model_real_data(env, agent, config)
         
         # Save results
         save_results(results, 'training_results_real.csv')
@@ -263,6 +330,14 @@ def main():
         
         # Save final model
         agent.save('model/dqn_real_final.weights.h5')
+        CheckpointRegistry().register(
+            'model/dqn_real_final.weights.h5', config=config, run='dqn_real',
+            state_size=agent.state_size, action_size=agent.action_size,
+            episode=len(results['episode']),
+            metrics={'total_reward': results['total_reward'][-1],
+                     'total_distance': results['total_distance'][-1],
+                     'visited_customers': results['visited_customers'][-1]}
+        )
         print(f"\n✅ Training selesai!")
         print(f"💾 Model disimpan: model/dqn_real_final.weights.h5")
     
@@ -276,10 +351,13 @@ def main():
             config=config
         )
         
-        # Load trained model
-        model_path = 'model/dqn_real_final.weights.h5'
+        # Load trained model (checkpoint terbaru dari registry, atau model final)
+        registry = CheckpointRegistry()
+        registry.scan()
+        checkpoint = registry.latest('dqn_real', state_size=agent.state_size, action_size=agent.action_size)
+        model_path = checkpoint['path'] if checkpoint else 'model/dqn_real_final.weights.h5'
         if os.path.exists(model_path):
-            agent.load(model_path)
+            load_into_agent(agent, model_path)
             print(f"✅ Loaded model: {model_path}")
         else:
             print(f"⚠️ Model {model_path} tidak ditemukan, menggunakan model random")
@@ -67,7 +67,7 @@ def generate_simulated_data(n_customers: int = 50,
         'demand': np.random.uniform(10, 100, n_customers),
         'time_window_start': np.random.uniform(0, 12, n_customers),
         'time_window_end': np.random.uniform(13, 24, n_customers),
-        'service_time': np.random.uniform(5, 30, n_customers)
+        'service_time': np.random.uniform(5, 30, n_customers) / 60  # 5-30 menit, dalam jam
     }
     
     df = pd.DataFrame(data)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Validasi periodik untuk training DQN VRP
+Evaluasi greedy pada validation set tetap (di thread terpisah, tanpa menahan learner)
+dan early stopping saat metrik validasi tidak membaik lagi.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from env.vrp_env import VRPDynamicEnv
+
+def validation_envs(env: VRPDynamicEnv, n_instances: int = 8, seed: int = 0) -> List[VRPDynamicEnv]:
+    """
+    Fixed validation set for a training environment.
+
+    The DQN state has no coordinates, so the validation instances are the
+    training instance under different weather/traffic conditions: the first
+    one with normal conditions, the others with seeded random factors.
+
+    Args:
+        env: Training environment
+        n_instances: Number of validation environments
+        seed: Seed for the conditions
+
+    Returns:
+        Validation environments
+    """
+    rng = np.random.default_rng(seed)
+    envs = []
+    for i in range(max(int(n_instances), 1)):
+        validation_env = VRPDynamicEnv(env.customers_df, n_vehicles=env.n_vehicles,
+                                       max_capacity=env.max_capacity, speed=env.speed)
+        if i > 0:
+            validation_env.set_conditions(weather_factor=float(rng.uniform(1.0, 1.5)),
+                                          traffic_factor=float(rng.uniform(0.8, 1.6)))
+        envs.append(validation_env)
+    return envs
+
+def greedy_rollouts(model, envs: List[VRPDynamicEnv], max_steps: Optional[int] = None) -> Dict[str, float]:
+    """
+    Greedy episode on every environment, one batched forward pass per step.
+
+    Actions are restricted to VRPDynamicEnv.action_masks (unvisited
+    customers that fit the current vehicle or the next one); an episode
+    ends early when no customer fits any more.
+
+    Returns:
+        Mean total_reward, total_distance, total_time and visited_customers
+    """
+    n = len(envs)
+    max_steps = max_steps or 2 * max(env.n_customers for env in envs)
+    states = np.stack([env.reset() for env in envs]).astype(np.float32)
+    rewards = np.zeros(n)
+    infos: List[Dict] = [{} for _ in envs]
+    active = np.ones(n, dtype=bool)
+
+    for _ in range(max_steps):
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            break
+        masks = np.stack([envs[i].action_masks() for i in index])
+        # No vehicle left for the remaining demand
+        stuck = ~masks.any(axis=1)
+        active[index[stuck]] = False
+        index, masks = index[~stuck], masks[~stuck]
+        if len(index) == 0:
+            break
+        q_values = model(states[index], training=False).numpy()
+        actions = np.argmax(np.where(masks, q_values, -np.inf), axis=1)
+        for i, action in zip(index, actions):
+            state, reward, done, infos[i] = envs[i].step(int(action))
+            states[i] = state
+            rewards[i] += reward
+            active[i] = not done
+
+    return {
+        'total_reward': float(rewards.mean()),
+        'total_distance': float(np.mean([info.get('total_distance', 0) for info in infos])),
+        'total_time': float(np.mean([info.get('total_time', 0) for info in infos])),
+        'visited_customers': float(np.mean([info.get('visited_customers', 0) for info in infos]))
+    }
+
+class AsyncEvaluator:
+    def __init__(self, agent, envs: List[VRPDynamicEnv]):
+        """
+        Greedy evaluation in a background thread.
+
+        submit() hands over a copy of the current weights and returns
+        immediately; the evaluation runs on a separate network so the
+        learner keeps training. When an evaluation is requested while the
+        previous one has not started yet, only the newest one is kept.
+
+        Args:
+            agent: Keras DQNAgent (its architecture is copied)
+            envs: Validation environments (used only by the worker thread)
+        """
+        self.model = agent._build_model()
+        self.envs = envs
+        self.skipped = 0
+
+        self._pending = None
+        self._results = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='validation-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, episode: int, weights: List[np.ndarray]):
+        """Queue an evaluation of weights taken after episode."""
+        with self._condition:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = (episode, weights)
+            self._condition.notify()
+
+    def poll(self) -> List[Dict]:
+        """Finished evaluations since the last call (oldest first)."""
+        with self._condition:
+            results, self._results = self._results, []
+        return results
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                (episode, weights), self._pending = self._pending, None
+
+            start = time.perf_counter()
+            try:
+                self.model.set_weights(weights)
+                result = greedy_rollouts(self.model, self.envs)
+            except Exception as e:
+                result = {'error': f'{type(e).__name__}: {e}'}
+            result.update(episode=episode, weights=weights, seconds=time.perf_counter() - start)
+
+            with self._condition:
+                self._results.append(result)
+
+    def close(self, wait: bool = True) -> List[Dict]:
+        """
+        Stop the worker.
+
+        Args:
+            wait: Finish the queued evaluation first (otherwise it is dropped)
+
+        Returns:
+            Evaluations finished but not yet polled
+        """
+        with self._condition:
+            if not wait:
+                self._pending = None
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        return self.poll()
+
+class EarlyStopping:
+    def __init__(self, patience: Optional[int], mode: str = 'max', min_delta: float = 0.0):
+        """
+        Stop when the validation metric has not improved for patience episodes.
+
+        Args:
+            patience: Episodes without improvement before stopping (None: never stop)
+            mode: 'max' or 'min'
+            min_delta: Minimum change that counts as an improvement
+        """
+        self.patience = patience
+        self.sign = 1.0 if mode == 'max' else -1.0
+        self.min_delta = min_delta
+        self.best_value = None
+        self.best_episode = None
+        self.last_episode = None
+
+    def update(self, episode: int, value: float) -> bool:
+        """Record a validation result; returns True when it is a new best."""
+        self.last_episode = episode
+        if self.best_value is None or self.sign * (value - self.best_value) > self.min_delta:
+            self.best_value = value
+            self.best_episode = episode
+            return True
+        return False
+
+    @property
+    def should_stop(self) -> bool:
+        if self.patience is None or self.best_episode is None:
+            return False
+        return self.last_episode - self.best_episode >= self.patience
+
+class PeriodicValidation:
+    def __init__(self, env: VRPDynamicEnv, agent, config: Dict, run: str = 'dqn', registry=None):
+        """
+        Evaluation-interval and early-stopping hook for the training loops.
+
+        Reads training.evaluation_interval (episodes between evaluations,
+        0/None disables validation), training.early_stopping_patience
+        (episodes without a better mean greedy validation reward) and
+        training.validation_instances. The best weights are written to
+        model/checkpoints/<run>_best.weights.h5 by close().
+
+        Args:
+            env: Training environment (validation set is derived from it)
+            agent: Keras DQNAgent being trained
+            config: Configuration dictionary
+            run: Checkpoint run name; the best checkpoint is registered as <run>_best
+            registry: CheckpointRegistry for the best checkpoint (optional)
+        """
+        settings = config.get('training', {})
+        self.interval = settings.get('evaluation_interval') or 0
+        self.agent = agent
+        self.config = config
+        self.run = run
+        self.registry = registry
+        self.early_stopping = EarlyStopping(settings.get('early_stopping_patience'))
+        self.best_path = f'model/checkpoints/{run}_best.weights.h5'
+        self.best_weights = None
+        self.best_result = None
+        self.history: List[Dict] = []
+
+        self.evaluator = None
+        if self.interval:
+            envs = validation_envs(env, settings.get('validation_instances', 8),
+                                   seed=settings.get('validation_seed', 0))
+            self.evaluator = AsyncEvaluator(agent, envs)
+
+    @property
+    def enabled(self) -> bool:
+        return self.evaluator is not None
+
+    def _record(self, result: Dict):
+        if 'error' in result:
+            print(f"⚠️ Validation after episode {result['episode']} failed: {result['error']}")
+            return
+        weights = result.pop('weights')
+        self.history.append(result)
+        improved = self.early_stopping.update(result['episode'], result['total_reward'])
+        if improved:
+            self.best_weights = weights
+            self.best_result = result
+        print(f"Validation (episode {result['episode']}): reward {result['total_reward']:.2f}, "
+              f"distance {result['total_distance']:.2f} km, visited {result['visited_customers']:.1f}"
+              + (" (best)" if improved else f" (best {self.early_stopping.best_value:.2f} "
+                                             f"at episode {self.early_stopping.best_episode})"))
+
+    def end_episode(self, episode: int) -> bool:
+        """
+        Call after every episode: submits an evaluation every interval
+        episodes and records finished ones.
+
+        Returns:
+            True when training should stop early
+        """
+        if not self.enabled:
+            return False
+        if (episode + 1) % self.interval == 0:
+            self.evaluator.submit(episode, self.agent.model.get_weights())
+        for result in self.evaluator.poll():
+            self._record(result)
+        return self.early_stopping.should_stop
+
+    def state(self) -> Dict:
+        """Picklable state for training snapshots."""
+        return {'history': self.history, 'best_weights': self.best_weights, 'best_result': self.best_result,
+                'best_value': self.early_stopping.best_value, 'best_episode': self.early_stopping.best_episode,
+                'last_episode': self.early_stopping.last_episode}
+
+    def load_state(self, state: Optional[Dict]):
+        if not state:
+            return
+        self.history = state['history']
+        self.best_weights = state['best_weights']
+        self.best_result = state['best_result']
+        self.early_stopping.best_value = state['best_value']
+        self.early_stopping.best_episode = state['best_episode']
+        self.early_stopping.last_episode = state['last_episode']
+
+    def close(self, wait: bool = True) -> Optional[str]:
+        """
+        Wait for the running evaluation (wait=False drops queued ones) and
+        save the best weights.
+
+        Returns:
+            Path of the best checkpoint, or None without validation results
+        """
+        if not self.enabled:
+            return None
+        for result in self.evaluator.close(wait):
+            self._record(result)
+        if self.best_weights is None:
+            return None
+
+        # The evaluator's network is idle now
+        self.evaluator.model.set_weights(self.best_weights)
+        self.evaluator.model.save_weights(self.best_path)
+        if self.registry is not None:
+            self.registry.register(
+                self.best_path, config=self.config, run=f'{self.run}_best',
+                state_size=self.agent.state_size, action_size=self.agent.action_size,
+                episode=self.best_result['episode'],
+                metrics={f'validation_{key}': self.best_result[key]
+                         for key in ('total_reward', 'total_distance', 'visited_customers')}
+            )
+        print(f"💾 Best validation model (episode {self.best_result['episode']}): {self.best_path}")
+        return self.best_path
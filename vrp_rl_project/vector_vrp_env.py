@@ -0,0 +1,243 @@
+import numpy as np
+from gym import spaces
+from gym.vector.utils import batch_space
+from typing import Dict, List, Tuple, Union
+import pandas as pd
+
+# Depot coordinate yang sama dengan FixedVRPEnvironment
+DEPOT_LATITUDE = -6.2088
+DEPOT_LONGITUDE = 106.8456
+
+class VectorVRPEnvironment:
+    """
+    Vectorized VRP environment that steps B independent instances at once.
+
+    Every instance follows FixedVRPEnvironment: same observation layout,
+    reward, capacity check and termination. Positions, capacities, visited
+    masks and rewards live in (B, ...) NumPy arrays, so one step() call
+    advances all instances without a Python loop.
+
+    The interface follows gym's vector environments: num_envs,
+    single_observation_space / single_action_space, batched spaces, and
+    automatic reset of finished instances (their last observation is in
+    infos['final_observation'] where infos['_final_observation'] is True).
+    step() keeps the repo's (obs, reward, done, info) convention.
+    """
+
+    def __init__(self, customers: Union[pd.DataFrame, List[pd.DataFrame]], num_envs: int = None,
+                 max_capacity: float = 6000, auto_reset: bool = True, transition_writer=None):
+        """
+        Initialize vectorized environment.
+
+        Args:
+            customers: One customers DataFrame shared by all instances, or
+                one DataFrame per instance (all with the same number of rows)
+            num_envs: Number of instances (required when customers is a
+                single DataFrame)
+            max_capacity: Vehicle capacity per instance
+            auto_reset: Reset finished instances inside step()
+            transition_writer: Optional TransitionWriter; every step of every
+                instance is recorded with add_batch (terminal observation as
+                next state, also with auto_reset)
+        """
+        if isinstance(customers, pd.DataFrame):
+            if num_envs is None:
+                raise ValueError("num_envs is required when a single customers DataFrame is given")
+            customers = [customers] * num_envs
+        if num_envs is not None and len(customers) != num_envs:
+            raise ValueError(f"Expected {num_envs} customer DataFrames, got {len(customers)}")
+
+        self.num_envs = len(customers)
+        self.n_customers = len(customers[0])
+        if any(len(df) != self.n_customers for df in customers):
+            raise ValueError("All instances must have the same number of customers")
+
+        self.max_capacity = max_capacity
+        self.auto_reset = auto_reset
+        self.transition_writer = transition_writer
+
+        latitude = np.stack([df['latitude'].to_numpy(dtype=np.float64) for df in customers])
+        longitude = np.stack([df['longitude'].to_numpy(dtype=np.float64) for df in customers])
+        self.demand = np.stack([df['demand'].to_numpy(dtype=np.float64) for df in customers])
+        self.service_time = np.stack([df['service_time'].to_numpy(dtype=np.float64) for df in customers])
+
+        # Jarak (km) antar customer dan dari depot, dihitung sekali
+        self.distance_matrix = np.sqrt(
+            (latitude[:, :, None] - latitude[:, None, :]) ** 2 +
+            (longitude[:, :, None] - longitude[:, None, :]) ** 2
+        ) * 111
+        self.depot_distance = np.sqrt(
+            (latitude - DEPOT_LATITUDE) ** 2 + (longitude - DEPOT_LONGITUDE) ** 2
+        ) * 111
+
+        # Spaces (same as FixedVRPEnvironment, plus batched versions)
+        self.single_action_space = spaces.Discrete(self.n_customers)
+        self.single_observation_space = spaces.Box(
+            low=np.array([0, 0, 0, 0, 0] + [0] * self.n_customers),
+            high=np.array([self.n_customers, self.max_capacity, 24, 2, 2] + [1] * self.n_customers),
+            dtype=np.float32
+        )
+        self.action_space = spaces.MultiDiscrete(np.full(self.num_envs, self.n_customers))
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+
+        # Per-instance state
+        self._rows = np.arange(self.num_envs)
+        self.current_location = np.zeros(self.num_envs, dtype=np.int64)
+        self.remaining_capacity = np.zeros(self.num_envs, dtype=np.float64)
+        self.current_time = np.zeros(self.num_envs, dtype=np.float64)
+        self.visited = np.zeros((self.num_envs, self.n_customers), dtype=bool)
+        self.visited_count = np.zeros(self.num_envs, dtype=np.int64)
+        self.total_distance = np.zeros(self.num_envs, dtype=np.float64)
+        self.total_time = np.zeros(self.num_envs, dtype=np.float64)
+
+        # Observation buffer, updated in place
+        self._observations = np.zeros((self.num_envs, 5 + self.n_customers), dtype=np.float32)
+
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """Reset all instances and return the batched observation."""
+        self._reset_instances(np.ones(self.num_envs, dtype=bool))
+        return self._observations.copy()
+
+    def _reset_instances(self, mask: np.ndarray):
+        """Reset the instances selected by a boolean mask."""
+        self.current_location[mask] = 0  # Start at depot
+        self.remaining_capacity[mask] = self.max_capacity
+        self.current_time[mask] = 0
+        self.visited[mask] = False
+        self.visited_count[mask] = 0
+        self.total_distance[mask] = 0
+        self.total_time[mask] = 0
+
+        self._observations[mask, 0] = 0
+        self._observations[mask, 1] = self.max_capacity
+        self._observations[mask, 2] = 0
+        self._observations[mask, 3] = 1.0  # Weather impact (simple)
+        self._observations[mask, 4] = 1.0  # Traffic impact (simple)
+        self._observations[mask, 5:] = 1.0
+
+    def action_masks(self) -> np.ndarray:
+        """
+        Valid actions per instance: unvisited customers whose demand fits.
+
+        Returns:
+            Boolean array of shape (num_envs, n_customers)
+        """
+        return ~self.visited & (self.demand <= self.remaining_capacity[:, None])
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """
+        Take one step in every instance.
+
+        Args:
+            actions: Customer index per instance, shape (num_envs,)
+
+        Returns:
+            observations, rewards, dones, infos (dict of per-instance arrays)
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = self._rows
+        if self.transition_writer is not None:
+            states = self._observations.copy()
+
+        # Invalid actions end the episode with a penalty, state unchanged
+        already_visited = self.visited[rows, actions]
+        demand = self.demand[rows, actions]
+        capacity_exceeded = ~already_visited & (demand > self.remaining_capacity)
+        valid = ~(already_visited | capacity_exceeded)
+
+        # Location 0 is treated as the depot, as in FixedVRPEnvironment
+        distance = np.where(
+            self.current_location == 0,
+            self.depot_distance[rows, actions],
+            self.distance_matrix[rows, self.current_location, actions]
+        )
+        distance = np.where(valid, distance, 0.0)
+        travel_time = distance / 50  # Assuming 50 km/h
+
+        valid_rows = rows[valid]
+        valid_actions = actions[valid]
+        self.current_location[valid] = valid_actions
+        self.remaining_capacity[valid] -= demand[valid]
+        self.current_time[valid] += travel_time[valid] + self.service_time[valid_rows, valid_actions]
+        self.visited[valid_rows, valid_actions] = True
+        self.visited_count[valid] += 1
+        self.total_distance += distance
+        self.total_time += travel_time
+
+        self._observations[valid, 0] = valid_actions
+        self._observations[valid, 1] = self.remaining_capacity[valid]
+        self._observations[valid, 2] = self.current_time[valid]
+        self._observations[valid_rows, 5 + valid_actions] = 0.0
+
+        # Reward: same simple function as FixedVRPEnvironment
+        completed = self.visited_count == self.n_customers
+        rewards = -distance * 0.01 + self.visited_count * 10 + np.where(completed, 50, 0)
+        rewards = np.where(valid, rewards, -1000.0)
+        dones = ~valid | completed
+
+        error = np.full(self.num_envs, None, dtype=object)
+        error[already_visited] = 'Customer already visited'
+        error[capacity_exceeded] = 'Capacity exceeded'
+
+        infos = {
+            'total_distance': self.total_distance.copy(),
+            'total_time': self.total_time.copy(),
+            'visited_customers': self.visited_count.copy(),
+            'error': error
+        }
+
+        if self.transition_writer is not None:
+            self.transition_writer.add_batch(states, actions, rewards, self._observations, dones)
+
+        if self.auto_reset and dones.any():
+            infos['final_observation'] = np.where(dones[:, None], self._observations, 0.0).astype(np.float32)
+            infos['_final_observation'] = dones.copy()
+            self._reset_instances(dones)
+
+        return self._observations.copy(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+def test_vector_environment():
+    """Test the vectorized environment against FixedVRPEnvironment."""
+    from fixed_vrp_env import FixedVRPEnvironment
+
+    print("🧪 Testing Vector VRP Environment...")
+
+    customers_data = {
+        'latitude': [-6.1702, -6.2383, -6.5950, -6.1783],
+        'longitude': [106.9417, 106.9756, 106.8167, 106.6319],
+        'demand': [1700, 500, 2000, 700],
+        'time_window_start': [0, 0, 0, 0],
+        'time_window_end': [24, 24, 24, 24],
+        'service_time': [1, 1, 1, 1]
+    }
+    customers_df = pd.DataFrame(customers_data)
+
+    num_envs = 8
+    vector_env = VectorVRPEnvironment(customers_df, num_envs=num_envs, auto_reset=False)
+    envs = [FixedVRPEnvironment(customers_df) for _ in range(num_envs)]
+
+    observations = vector_env.reset()
+    print(f"✅ Batched observation shape: {observations.shape}")
+
+    rng = np.random.default_rng(0)
+    orders = [rng.permutation(vector_env.n_customers) for _ in range(num_envs)]
+    for step in range(vector_env.n_customers):
+        actions = np.array([order[step] for order in orders])
+        observations, rewards, dones, infos = vector_env.step(actions)
+        for i, env in enumerate(envs):
+            state, reward, done, _ = env.step(int(actions[i]))
+            assert np.allclose(state, observations[i]), f"State mismatch in env {i}"
+            assert np.isclose(reward, rewards[i]) and done == dones[i], f"Reward mismatch in env {i}"
+
+    print(f"✅ All {num_envs} instances match FixedVRPEnvironment")
+    print(f"✅ Total distance per instance: {np.round(infos['total_distance'], 2)}")
+
+    return vector_env
+
+if __name__ == "__main__":
+    test_vector_environment()